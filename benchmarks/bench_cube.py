@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of writing & reading cube files."""
+
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from benchmarks.common import SPACINGS, load_grid
+
+
+class CubeIO(object):
+    """Time & memory of writing & reading cube files as a function of the grid size."""
+
+    params = [SPACINGS, [1, 4]]
+    param_names = ['spacing', 'num_datasets']
+    timeout = 600
+
+    def setup(self, spacing, num_datasets):
+        self.grid = load_grid('c4h4_ub3lyp_ccpvdz.fchk', spacing)
+        npoints = self.grid.points.shape[0]
+        if num_datasets == 1:
+            self.data = np.random.RandomState(0).rand(npoints)
+        else:
+            self.data = np.random.RandomState(0).rand(npoints, num_datasets)
+        self.tmpdir = tempfile.mkdtemp('chemtools_bench_cube')
+        self.fname = os.path.join(self.tmpdir, 'data.cube')
+        self.grid.generate_cube(self.fname, self.data)
+
+    def teardown(self, spacing, num_datasets):
+        shutil.rmtree(self.tmpdir)
+
+    def track_num_points(self, spacing, num_datasets):
+        return self.grid.points.shape[0]
+
+    def time_generate_cube(self, spacing, num_datasets):
+        self.grid.generate_cube(os.path.join(self.tmpdir, 'out.cube'), self.data)
+
+    def time_read_cube_data(self, spacing, num_datasets):
+        from chemtools.utils.cube import UniformGrid
+        UniformGrid.read_cube_data(self.fname)
+
+    def time_from_cube(self, spacing, num_datasets):
+        from chemtools.utils.cube import UniformGrid
+        UniformGrid.from_cube(self.fname)
+
+    def peakmem_read_cube_data(self, spacing, num_datasets):
+        from chemtools.utils.cube import UniformGrid
+        UniformGrid.read_cube_data(self.fname)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of importing chemtools & starting its command-line interface."""
+
+
+class ImportChemTools(object):
+    """Time of importing chemtools in a fresh interpreter, which is paid by every CLI call."""
+
+    def timeraw_import(self):
+        return "import chemtools"
+
+    def timeraw_import_cli_help(self):
+        return """
+import sys
+import chemtools.scripts.main
+sys.argv = ['chemtools', '--help']
+try:
+    chemtools.scripts.main.parse_args_chemtools()
+except SystemExit:
+    pass
+"""
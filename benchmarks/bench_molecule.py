@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the properties computed on cubic grids by `Molecule`."""
+
+
+from benchmarks.common import SPACINGS, load_molecule, load_grid
+
+
+class MoleculeCompute(object):
+    """Time & memory of `Molecule.compute_*` methods as a function of the grid size."""
+
+    params = [['ch4_uhf_ccpvdz.fchk', 'h2o_dimer_pbe_sto3g.fchk', 'c4h4_ub3lyp_ccpvdz.fchk'],
+              SPACINGS]
+    param_names = ['fname', 'spacing']
+    timeout = 600
+
+    def setup(self, fname, spacing):
+        self.molecule = load_molecule(fname)
+        self.points = load_grid(fname, spacing).points
+
+    def track_num_points(self, fname, spacing):
+        return self.points.shape[0]
+
+    def time_density(self, fname, spacing):
+        self.molecule.compute_density(self.points)
+
+    def time_gradient(self, fname, spacing):
+        self.molecule.compute_gradient(self.points)
+
+    def time_hessian(self, fname, spacing):
+        self.molecule.compute_hessian(self.points)
+
+    def time_laplacian(self, fname, spacing):
+        self.molecule.compute_laplacian(self.points)
+
+    def time_ked(self, fname, spacing):
+        self.molecule.compute_ked(self.points)
+
+    def time_homo(self, fname, spacing):
+        self.molecule.compute_molecular_orbital(self.points, 'a', self.molecule.mo.homo_index[0])
+
+    def peakmem_density(self, fname, spacing):
+        self.molecule.compute_density(self.points)
+
+    def peakmem_hessian(self, fname, spacing):
+        self.molecule.compute_hessian(self.points)
+
+
+class MoleculeESP(object):
+    """Time of `Molecule.compute_esp` (which is much more expensive) on coarse grids."""
+
+    params = [['ch4_uhf_ccpvdz.fchk', 'h2o_dimer_pbe_sto3g.fchk'], SPACINGS[:2]]
+    param_names = ['fname', 'spacing']
+    timeout = 600
+
+    def setup(self, fname, spacing):
+        self.molecule = load_molecule(fname)
+        self.points = load_grid(fname, spacing).points
+
+    def time_esp(self, fname, spacing):
+        self.molecule.compute_esp(self.points)
+
+
+class AtomicOrbitalsBackend(object):
+    """Time of the density matrix properties evaluated by the HORTON2 & NumPy backends."""
+
+    params = [['horton', 'numpy'], ['ch4_uhf_ccpvdz.fchk', 'c4h4_ub3lyp_ccpvdz.fchk'],
+              SPACINGS[:3]]
+    param_names = ['backend', 'fname', 'spacing']
+    timeout = 600
+
+    def setup(self, backend, fname, spacing):
+        from chemtools.wrappers.molecule import AtomicOrbitals
+        molecule = load_molecule(fname)
+        self.ao = AtomicOrbitals.from_molecule(molecule, backend)
+        self.dm = molecule.mo.compute_dm('ab')
+        self.points = load_grid(fname, spacing).points
+
+    def time_density(self, backend, fname, spacing):
+        self.ao.compute_density(self.dm, self.points)
+
+    def time_gradient(self, backend, fname, spacing):
+        self.ao.compute_gradient(self.dm, self.points)
+
+    def time_hessian(self, backend, fname, spacing):
+        self.ao.compute_hessian(self.dm, self.points)
+
+    def time_ked(self, backend, fname, spacing):
+        self.ao.compute_ked(self.dm, self.points)
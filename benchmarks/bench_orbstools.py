@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the orbital partitioning tools in `chemtools.orbstools`.
+
+The bundled NaClO4 matrices are used, so these benchmarks do not depend on HORTON.
+"""
+
+
+import numpy as np
+
+from benchmarks.common import load_array
+
+
+class OrbsTools(object):
+    """Time of the Mulliken, Lowdin, QUAMBO & QUAO analyses of NaClO4."""
+
+    params = ['full', 'cheap', 'off']
+    param_names = ['validation']
+
+    def setup(self, validation):
+        from chemtools.orbstools.validation import set_validation_level
+        self.coeff_ab_mo = load_array('naclo4_coeff_ab_mo')
+        self.olp_ab_ab = load_array('naclo4_olp_ab_ab')
+        self.olp_aao_ab = load_array('naclo4_olp_aao_ab')
+        self.olp_aao_aao = load_array('naclo4_olp_aao_aao')
+        self.occupations = load_array('naclo4_occupations')
+        self.indices_span = self.occupations > 0
+        self.ab_atom_indices = load_array('naclo4_ab_atom_indices')
+        self.num_atoms = int(np.max(self.ab_atom_indices)) + 1
+        set_validation_level(validation)
+
+    def teardown(self, validation):
+        from chemtools.orbstools.validation import set_validation_level
+        set_validation_level('full')
+
+    def time_mulliken_populations(self, validation):
+        from chemtools.orbstools.mulliken import mulliken_populations
+        mulliken_populations(self.coeff_ab_mo, self.occupations, self.olp_ab_ab, self.num_atoms,
+                             self.ab_atom_indices)
+
+    def time_lowdin_populations(self, validation):
+        from chemtools.orbstools.mulliken import lowdin_populations
+        lowdin_populations(self.coeff_ab_mo, self.occupations, self.olp_ab_ab, self.num_atoms,
+                           self.ab_atom_indices)
+
+    def time_mayer_bond_orders(self, validation):
+        from chemtools.orbstools.bondorder import mayer_bond_orders
+        mayer_bond_orders(self.coeff_ab_mo, self.occupations, self.olp_ab_ab, self.num_atoms,
+                          self.ab_atom_indices)
+
+    def time_quambo(self, validation):
+        from chemtools.orbstools.quasi import quambo
+        quambo(self.olp_ab_ab, self.olp_aao_ab, self.coeff_ab_mo, self.indices_span)
+
+    def time_quao(self, validation):
+        from chemtools.orbstools.quasi import quao
+        quao(self.olp_ab_ab, self.olp_aao_ab, self.olp_aao_aao, self.coeff_ab_mo,
+             self.indices_span)
+
+    def peakmem_quao(self, validation):
+        from chemtools.orbstools.quasi import quao
+        quao(self.olp_ab_ab, self.olp_aao_ab, self.olp_aao_aao, self.coeff_ab_mo,
+             self.indices_span)
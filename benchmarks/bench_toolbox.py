@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Benchmarks of the tools in `chemtools.toolbox`."""
+
+
+from benchmarks.common import SPACINGS, load_molecule, load_grid
+
+
+class Interactions(object):
+    """Time & memory of constructing `NCI`, `ELF` and `LOL` as a function of the grid size."""
+
+    params = [['h2o_dimer_pbe_sto3g.fchk', 'c4h4_ub3lyp_ccpvdz.fchk'], SPACINGS]
+    param_names = ['fname', 'spacing']
+    timeout = 600
+
+    def setup(self, fname, spacing):
+        self.molecule = load_molecule(fname)
+        self.grid = load_grid(fname, spacing)
+
+    def track_num_points(self, fname, spacing):
+        return self.grid.points.shape[0]
+
+    def time_nci(self, fname, spacing):
+        from chemtools.toolbox.interactions import NCI
+        NCI.from_molecule(self.molecule, grid=self.grid)
+
+    def time_elf(self, fname, spacing):
+        from chemtools.toolbox.interactions import ELF
+        ELF.from_molecule(self.molecule, grid=self.grid)
+
+    def time_lol(self, fname, spacing):
+        from chemtools.toolbox.interactions import LOL
+        LOL.from_molecule(self.molecule, grid=self.grid)
+
+    def peakmem_nci(self, fname, spacing):
+        from chemtools.toolbox.interactions import NCI
+        NCI.from_molecule(self.molecule, grid=self.grid)
+
+
+class SymmetricInteractions(object):
+    """Time of constructing `NCI` & `ELF` on the symmetry-unique points of the cubic grid."""
+
+    params = [['ch4_uhf_ccpvdz.fchk', 'c4h4_ub3lyp_ccpvdz.fchk'], SPACINGS]
+    param_names = ['fname', 'spacing']
+    timeout = 600
+
+    def setup(self, fname, spacing):
+        self.molecule = load_molecule(fname)
+        self.grid = load_grid(fname, spacing, symmetry=True)
+
+    def track_num_unique_points(self, fname, spacing):
+        return self.grid.unique_points.shape[0]
+
+    def time_nci(self, fname, spacing):
+        from chemtools.toolbox.interactions import NCI
+        NCI.from_molecule(self.molecule, grid=self.grid)
+
+    def time_elf(self, fname, spacing):
+        from chemtools.toolbox.interactions import ELF
+        ELF.from_molecule(self.molecule, grid=self.grid)
+
+    def time_symmetry_map(self, fname, spacing):
+        from chemtools.utils.cube import UniformGrid
+        grid = UniformGrid(self.grid.numbers, self.grid.pseudo_numbers, self.grid.coordinates,
+                           self.grid.origin, self.grid.axes, self.grid.shape,
+                           operations=self.grid.operations)
+        grid.unique_points
+
+
+class CriticalPointSearch(object):
+    """Time of the critical point search of `TopologicalTool` as a function of the seed points."""
+
+    params = [['ch4_uhf_ccpvdz.fchk', 'h2o_dimer_pbe_sto3g.fchk'], SPACINGS[:3]]
+    param_names = ['fname', 'spacing']
+    timeout = 1200
+
+    def setup(self, fname, spacing):
+        self.molecule = load_molecule(fname)
+        self.points = load_grid(fname, spacing, extension=0.1).points
+
+    def track_num_points(self, fname, spacing):
+        return self.points.shape[0]
+
+    def time_find_critical_points(self, fname, spacing):
+        from chemtools.toolbox.topology import TopologicalTool
+        TopologicalTool.from_molecule(self.molecule, points=self.points)
+
+    def peakmem_find_critical_points(self, fname, spacing):
+        from chemtools.toolbox.topology import TopologicalTool
+        TopologicalTool.from_molecule(self.molecule, points=self.points)
+
+
+class GlobalConceptual(object):
+    """Time of the global conceptual DFT models of water (finite difference approach)."""
+
+    params = ['linear', 'quadratic', 'exponential', 'rational']
+    param_names = ['model']
+
+    def setup(self, model):
+        self.molecules = [load_molecule('h2o_q+0_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q+1_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q-1_ub3lyp_ccpvtz.fchk')]
+
+    def time_from_molecule(self, model):
+        from chemtools.toolbox.conceptual import GlobalConceptualDFT
+        GlobalConceptualDFT.from_molecule(self.molecules, model)
+
+
+class LocalConceptual(object):
+    """Time & memory of the local conceptual DFT models of water as a function of the grid size."""
+
+    params = [['linear', 'quadratic'], SPACINGS]
+    param_names = ['model', 'spacing']
+    timeout = 600
+
+    def setup(self, model, spacing):
+        self.molecules = [load_molecule('h2o_q+0_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q+1_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q-1_ub3lyp_ccpvtz.fchk')]
+        self.points = load_grid('h2o_q+0_ub3lyp_ccpvtz.fchk', spacing).points
+
+    def track_num_points(self, model, spacing):
+        return self.points.shape[0]
+
+    def time_from_molecule(self, model, spacing):
+        from chemtools.toolbox.conceptual import LocalConceptualDFT
+        LocalConceptualDFT.from_molecule(self.molecules, model, self.points)
+
+    def peakmem_from_molecule(self, model, spacing):
+        from chemtools.toolbox.conceptual import LocalConceptualDFT
+        LocalConceptualDFT.from_molecule(self.molecules, model, self.points)
+
+
+class CondensedConceptual(object):
+    """Time of the condensed conceptual DFT models of water (FMR approach, Hirshfeld scheme)."""
+
+    params = ['linear', 'quadratic']
+    param_names = ['model']
+    timeout = 1200
+
+    def setup(self, model):
+        self.molecules = [load_molecule('h2o_q+0_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q+1_ub3lyp_ccpvtz.fchk'),
+                          load_molecule('h2o_q-1_ub3lyp_ccpvtz.fchk')]
+
+    def time_from_molecule(self, model):
+        from chemtools.toolbox.conceptual import CondensedConceptualDFT
+        CondensedConceptualDFT.from_molecule(self.molecules, model, 'FMR', 'h')
+
+
+class OrbitalPartitioning(object):
+    """Time of the population analyses of `MOTBasedTool` on the bundled wave-functions."""
+
+    params = [['ch4_uhf_ccpvdz.fchk', 'c4h4_ub3lyp_ccpvdz.fchk', 'c3h2o_q+0_ub3lyp_augccpvdz.fchk'],
+              ['mulliken', 'lowdin']]
+    param_names = ['fname', 'scheme']
+
+    def setup(self, fname, scheme):
+        from chemtools.toolbox.motbased import MOTBasedTool
+        self.tool = MOTBasedTool(load_molecule(fname))
+
+    def time_compute_charges(self, fname, scheme):
+        self.tool.compute_charges(scheme)
+
+    def time_compute_bond_orders(self, fname, scheme):
+        self.tool.compute_bond_orders({'mulliken': 'mayer', 'lowdin': 'wiberg'}[scheme])
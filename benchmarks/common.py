@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Shared helpers of the benchmarks (loading the bundled data)."""
+
+
+import numpy as np
+
+try:
+    from importlib_resources import path
+except ImportError:
+    from importlib.resources import path
+
+
+__all__ = ['SPACINGS', 'load_molecule', 'load_array', 'load_grid']
+
+
+# spacing of the cubic grids used for the scaling curves; halving the spacing gives ~8x points
+SPACINGS = [0.4, 0.3, 0.2, 0.15]
+
+# molecules & grids are loaded once per benchmark process
+_CACHE = {}
+
+
+def load_molecule(fname):
+    """Return the `Molecule` instance of a file in `chemtools.data`.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the wave-function file in `chemtools.data`.
+
+    """
+    key = ('molecule', fname)
+    if key not in _CACHE:
+        from chemtools.wrappers.molecule import Molecule
+        with path('chemtools.data', fname) as fpath:
+            _CACHE[key] = Molecule.from_file(str(fpath))
+    return _CACHE[key]
+
+
+def load_grid(fname, spacing, extension=3.0, symmetry=False):
+    """Return the `UniformGrid` instance of a molecule in `chemtools.data`.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the wave-function file in `chemtools.data`.
+    spacing : float
+        Increment between grid points along `x`, `y` and `z` direction.
+    extension : float, optional
+        The extension of the cube on each side of the molecule.
+    symmetry : bool, optional
+        Whether the point-group symmetry of the molecule is used by the grid.
+
+    """
+    key = ('grid', fname, spacing, extension, symmetry)
+    if key not in _CACHE:
+        from chemtools.utils.cube import UniformGrid
+        molecule = load_molecule(fname)
+        _CACHE[key] = UniformGrid.from_molecule(molecule, spacing=spacing, extension=extension,
+                                                symmetry=symmetry)
+    return _CACHE[key]
+
+
+def load_array(name):
+    """Return the numpy array stored in ``chemtools/data/<name>.npy``.
+
+    Parameters
+    ----------
+    name : str
+        Name of the array file (without the ``.npy`` extension) in `chemtools.data`.
+
+    """
+    with path('chemtools.data', name + '.npy') as fpath:
+        return np.load(str(fpath))
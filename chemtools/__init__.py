@@ -20,20 +20,78 @@
 # along with this program; if not, see <http://www.gnu.org/licenses/>
 #
 # --
-# pragma pylint: disable=wildcard-import
-"""The Main ChemTools Package."""
+"""The Main ChemTools Package.
 
+The public classes & functions of the subpackages are available as attributes of this package,
+e.g. ``chemtools.Molecule``. Subpackages (and their dependencies like HORTON, SciPy and
+Matplotlib) are only imported when one of their attributes is first accessed, so importing
+chemtools (e.g. for the command-line interface) is fast.
+"""
 
-from chemtools.wrappers import *
-from chemtools.toolbox import *
-from chemtools.conceptual import *
-from chemtools.denstools import *
-from chemtools.utils import *
-from chemtools.outputs import *
-import horton
 
+import os
+import sys
+import importlib
+
+from types import ModuleType
 
-horton.log.head_banner = ""
-horton.log.foot_banner = ""
 
 __version__ = '0.9.0'
+
+
+# public names of each subpackage that are available as attributes of chemtools
+_SUBPACKAGE_EXPORTS = {
+    'wrappers': ['Molecule', 'GaussianBasis', 'MolecularGrid', 'set_grid_cache', 'clear_grid_cache',
+                 'DensPart'],
+    'toolbox': ['GlobalConceptualDFT', 'LocalConceptualDFT', 'CondensedConceptualDFT',
+                'MOTBasedTool', 'KED', 'DFTBasedTool', 'DensityLocalTool', 'NCI', 'ELF', 'LOL',
+                'TopologicalTool', 'screen_conceptual_dft'],
+    'conceptual': ['LinearGlobalTool', 'LinearLocalTool', 'LinearCondensedTool',
+                   'QuadraticGlobalTool', 'QuadraticLocalTool', 'QuadraticCondensedTool',
+                   'ExponentialGlobalTool', 'RationalGlobalTool', 'CubicGlobalTool',
+                   'GeneralGlobalTool', 'MixedGlobalTool', 'MixedLocalTool',
+                   'MixedCondensedTool'],
+    'denstools': ['DensTool', 'DensGradTool', 'DensGradLapTool', 'DensGradLapKedTool'],
+    'utils': ['UniformGrid', 'UniformGridInterpolator', 'symmetry_operations', 'doc_inherit',
+              'mesh_plane'],
+    'outputs': ['print_vmd_script_nci', 'print_vmd_script_isosurface',
+                'print_vmd_script_multiple_cube', 'print_vmd_script_vector_field',
+                'plot_scatter', 'plot_density'],
+}
+
+_EXPORTS = dict((name, subpackage) for subpackage, names in _SUBPACKAGE_EXPORTS.items()
+                for name in names)
+
+
+def _is_submodule(name):
+    """Return True if the given name is a subpackage or module of chemtools."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    return os.path.isfile(os.path.join(path, '__init__.py')) or os.path.isfile(path + '.py')
+
+
+class _LazyPackage(ModuleType):
+    """Package whose subpackage attributes are imported on first access."""
+
+    def __getattr__(self, name):
+        if name in _EXPORTS:
+            value = getattr(importlib.import_module('chemtools.' + _EXPORTS[name]), name)
+        elif name == '__all__':
+            value = sorted(_EXPORTS)
+        elif not name.startswith('_') and _is_submodule(name):
+            # subpackages, e.g. chemtools.orbstools
+            value = importlib.import_module('chemtools.' + name)
+        else:
+            raise AttributeError("module 'chemtools' has no attribute '{0}'".format(name))
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(_EXPORTS))
+
+
+# replace this module by a lazy package (keeping a reference to the original module, whose
+# globals are cleared in Python 2 when it is garbage collected)
+_package = _LazyPackage(__name__, __doc__)
+_package.__dict__.update(sys.modules[__name__].__dict__)
+_package._module = sys.modules[__name__]
+sys.modules[__name__] = _package
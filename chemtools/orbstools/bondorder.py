@@ -0,0 +1,166 @@
+"""Bond order analysis."""
+import numpy as np
+from chemtools.orbstools.mulliken import _check_input
+from chemtools.orbstools.orthogonalization import power_symmetric
+
+
+def _atom_block_sums(matrix, num_atoms, ab_atom_indices):
+    """Return the sums of the atom-by-atom blocks of a matrix in atomic orbital basis.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(K, K)
+        Matrix whose rows and columns correspond to the atomic basis functions.
+    num_atoms : int
+        Number of atoms.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+
+    Returns
+    -------
+    block_sums : np.ndarray(A, A)
+        Sum of the entries of the matrix whose row and column belong to the given atoms.
+
+    """
+    # sort basis functions by atom (if needed), so that the blocks are contiguous
+    if np.any(np.diff(ab_atom_indices) < 0):
+        order = np.argsort(ab_atom_indices, kind="mergesort")
+        matrix = matrix[order][:, order]
+        ab_atom_indices = ab_atom_indices[order]
+    # segmented sums over the rows and then the columns of each atom
+    atoms, starts = np.unique(ab_atom_indices, return_index=True)
+    sums = np.add.reduceat(np.add.reduceat(matrix, starts, axis=0), starts, axis=1)
+    # atoms without basis functions have zero block sums
+    block_sums = np.zeros((num_atoms, num_atoms))
+    block_sums[atoms[:, None], atoms[None, :]] = sums
+    return block_sums
+
+
+def mayer_bond_orders(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices):
+    r"""Return the Mayer bond orders of the given spin molecular orbitals.
+
+    ..math::
+
+        B_{AB} = 2 \sum_{a \in A} \sum_{b \in B} (P^{\sigma} S)_{ab} (P^{\sigma} S)_{ba}
+
+    where :math:`P^{\sigma}_{ab} = \sum_i C_{ai} n_i C_{bi}` is the density matrix of the given
+    spin orbitals and :math:`S` is the overlap of the atomic orbitals. The bond orders of a
+    molecule are the sum of the bond orders of the alpha and beta orbitals. All bond orders are
+    obtained from one product of :math:`\mathcal{O}(K^2 M)` and the segmented sums of the
+    :math:`(K, K)` matrix over the basis functions of each atom.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis to molecular orbitals.
+        Rows correspond to the atomic basis.
+        Columns correspond to the molecular orbitals.
+        Data type must be float.
+        `K` is the number of atomic orbitals and `M` is the number of molecular orbitals.
+    occupations : np.ndarray(M,)
+        Occupation numbers of each spin molecular orbital, i.e. between 0 and 1.
+        Data type must be integers or floats.
+        `M` is the number of molecular orbitals.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+        Data type must be floats.
+        `K` is the number of atomic orbitals.
+    num_atoms : int
+        Number of atoms.
+        Must be an integer.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+        `K` is the number of atomic orbitals.
+
+    Returns
+    -------
+    bond_orders : np.ndarray(A, A)
+        Symmetric matrix of bond orders between each pair of atoms. The diagonal is set to zero.
+        The sum of each row is the valence of the atom (contributed by the given spin orbitals).
+        `A` is the number of atoms.
+
+    Raises
+    ------
+    TypeError
+        If the types of the inputs are not valid (see `orbstools.mulliken._check_input`).
+    ValueError
+        If the inputs are not consistent (see `orbstools.mulliken._check_input`).
+
+    """
+    _check_input(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices)
+    # density matrix times overlap
+    dens_olp = (coeff_ab_mo * occupations[None, :]).dot(olp_ab_ab.dot(coeff_ab_mo).T)
+    bond_orders = 2 * _atom_block_sums(dens_olp * dens_olp.T, num_atoms, ab_atom_indices)
+    bond_orders[np.diag_indices(num_atoms)] = 0
+    return bond_orders
+
+
+def wiberg_bond_orders(
+    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, olp_ab_ab_sqrt=None
+):
+    r"""Return the Wiberg bond orders of the given spin molecular orbitals in Lowdin basis.
+
+    ..math::
+
+        W_{AB} = 2 \sum_{a \in A} \sum_{b \in B} (S^{1/2} P^{\sigma} S^{1/2})_{ab}^2
+
+    where :math:`P^{\sigma}_{ab} = \sum_i C_{ai} n_i C_{bi}` is the density matrix of the given
+    spin orbitals and :math:`S^{1/2} P^{\sigma} S^{1/2}` is the density matrix in the
+    symmetrically orthogonalized (Lowdin) atomic orbitals. The bond orders of a molecule are the
+    sum of the bond orders of the alpha and beta orbitals.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis to molecular orbitals.
+        Rows correspond to the atomic basis.
+        Columns correspond to the molecular orbitals.
+        Data type must be float.
+        `K` is the number of atomic orbitals and `M` is the number of molecular orbitals.
+    occupations : np.ndarray(M,)
+        Occupation numbers of each spin molecular orbital, i.e. between 0 and 1.
+        Data type must be integers or floats.
+        `M` is the number of molecular orbitals.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+        Data type must be floats.
+        `K` is the number of atomic orbitals.
+    num_atoms : int
+        Number of atoms.
+        Must be an integer.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+        Data type must be integers.
+        `K` is the number of atomic orbitals.
+    olp_ab_ab_sqrt : np.ndarray(K, K), optional
+        Square root of the overlap matrix, :math:`S^{1/2}`, if it is already available (e.g. from
+        `AtomicOrbitals.compute_overlap_power`).
+        Default is computed from the eigendecomposition of `olp_ab_ab`.
+
+    Returns
+    -------
+    bond_orders : np.ndarray(A, A)
+        Symmetric matrix of bond orders between each pair of atoms. The diagonal is set to zero.
+        `A` is the number of atoms.
+
+    Raises
+    ------
+    TypeError
+        If the types of the inputs are not valid (see `orbstools.mulliken._check_input`).
+    ValueError
+        If the inputs are not consistent (see `orbstools.mulliken._check_input`).
+        If `olp_ab_ab_sqrt` does not have the same shape as `olp_ab_ab`.
+
+    """
+    _check_input(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices)
+    if olp_ab_ab_sqrt is None:
+        olp_ab_ab_sqrt = power_symmetric(olp_ab_ab, 0.5)
+    elif olp_ab_ab_sqrt.shape != olp_ab_ab.shape:
+        raise ValueError("`olp_ab_ab_sqrt` must have the same shape as `olp_ab_ab`.")
+    # density matrix in Lowdin basis
+    coeff_oab_mo = olp_ab_ab_sqrt.dot(coeff_ab_mo)
+    dens_oab = (coeff_oab_mo * occupations[None, :]).dot(coeff_oab_mo.T)
+    bond_orders = 2 * _atom_block_sums(dens_oab ** 2, num_atoms, ab_atom_indices)
+    bond_orders[np.diag_indices(num_atoms)] = 0
+    return bond_orders
@@ -1,9 +1,118 @@
 """Mulliken population analysis."""
 import numpy as np
+from scipy.sparse import issparse
+from chemtools.orbstools import validation
 from chemtools.orbstools.orthogonalization import power_symmetric
 from chemtools.orbstools.quasi import project
 
 
+def _check_input(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices):
+    """Check the molecular orbitals, overlap & atom indices given to the population analyses.
+
+    The checks are shared by the population (e.g. `mulliken_populations`) and bond order (see
+    `orbstools.bondorder`) analyses.
+
+    Parameters
+    ----------
+    coeff_ab_mo : np.ndarray(K, M)
+        Transformation matrix from the atomic basis to molecular orbitals.
+    occupations : np.ndarray(M,)
+        Occupation numbers of each molecular orbital.
+    olp_ab_ab : np.ndarray(K, K)
+        Overlap between atomic basis functions.
+    num_atoms : int
+        Number of atoms.
+    ab_atom_indices : np.ndarray(K,)
+        Index of the atom to which each atomic basis function belongs.
+
+    Raises
+    ------
+    TypeError
+        If `coeff_ab_mo` is not a two-dimensional numpy array of floats.
+        If `occupations` is not a one-dimensional numpy array of ints/floats.
+        If `olp_ab_ab` is not a two-dimensional numpy array of floats.
+        If `num_atoms` is not an integer.
+        If `ab_atom_indices` is not a a one-dimensional numpy array of ints.
+    ValueError
+        If `olp_ab_ab` is not square.
+        If the number of rows in `coeff_ab_mo` is not equal to the number of rows in `olp_ab_ab`.
+        If the number of columns in `coeff_ab_mo` is not equal to the number of entries in
+        `occupations`.
+        If `olp_ab_ab` is not symmetric or normalized, or if the molecular orbitals are not
+        normalized (checked according to the validation level, see `orbstools.validation`).
+        If `ab_atom_indices` does not have the same number of entries as there are atomic basis
+        functions.
+        If `ab_atom_indices` contains indices that are less than 0 or greater than or equal to the
+        number of atoms.
+
+    """
+    if not (
+        isinstance(coeff_ab_mo, np.ndarray) and coeff_ab_mo.ndim == 2 and coeff_ab_mo.dtype == float
+    ):
+        raise TypeError(
+            "Transformation matrix from atomic basis functions to molecular orbitals must be a "
+            "two-dimensional numpy array of floats."
+        )
+    if not (
+        isinstance(occupations, np.ndarray)
+        and occupations.ndim == 1
+        and occupations.dtype in [float, int]
+    ):
+        raise TypeError(
+            "Molecular orbital occupation numbers must be not a one-dimensional numpy array of "
+            "floats or ints."
+        )
+    if not (isinstance(olp_ab_ab, np.ndarray) and olp_ab_ab.ndim == 2 and olp_ab_ab.dtype == float):
+        raise TypeError(
+            "Overlap of the atomic basis functions must be a two-dimensional numpy array of floats."
+        )
+    if not isinstance(num_atoms, int):
+        raise TypeError("Number of atoms must be an integer.")
+    if not (
+        isinstance(ab_atom_indices, np.ndarray)
+        and ab_atom_indices.ndim == 1
+        and ab_atom_indices.dtype == int
+    ):
+        raise TypeError(
+            "Atom indices of each atomic basis function must be a one-dimensional numpy array of "
+            "integers with size equal to the number of atomic basis functions."
+        )
+
+    if not olp_ab_ab.shape[0] == olp_ab_ab.shape[1]:
+        raise ValueError("Overlap matrix is not square.")
+    if not coeff_ab_mo.shape[0] == olp_ab_ab.shape[0]:
+        raise ValueError(
+            "Number of atomic orbitals in the transformation matrix and overlap matrix are not "
+            "equal."
+        )
+    if not coeff_ab_mo.shape[1] == occupations.size:
+        raise ValueError(
+            "Number of molecular orbitals in the transformation matrix and occupations are not "
+            "equal."
+        )
+
+    if not validation.is_symmetric(olp_ab_ab):
+        raise ValueError("Overlap of the atomic basis functions must be symmetric.")
+    if not validation.is_close(np.diag(olp_ab_ab), 1):
+        raise ValueError("Overlap of the atomic basis functions must be normalized.")
+    if not validation.is_normalized(coeff_ab_mo, olp_ab_ab):
+        raise ValueError(
+            "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
+        )
+
+    # check basis mapping
+    if ab_atom_indices.size != olp_ab_ab.shape[0]:
+        raise ValueError(
+            "Number of indices in `ab_atom_indices` must be equal to the number of atomic basis "
+            "functions."
+        )
+    if not (np.all(ab_atom_indices >= 0) and np.all(ab_atom_indices < num_atoms)):
+        raise ValueError(
+            "Atom indices of each atomic basis function must be greater than or equal to zero and "
+            " less than the number of atoms"
+        )
+
+
 # FIXME: bad name (since providing atom_weights will result in the population not being Mulliken)
 def mulliken_populations(
     coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None
@@ -93,13 +202,17 @@ def mulliken_populations(
         Index of the atom to which each atomic basis function belongs.
         Data type must be integers.
         `K` is the number of atomic orbitals.
-    atom_weights : np.ndarray(A, K, K)
+    atom_weights : {np.ndarray(A, K, K), list of np.ndarray(K, K), list of scipy.sparse matrix}
         Weights of the atomic orbital pairs for the atoms. In other words, this weight controls the
         amount of electrons associated with an atomic orbital pair that will be attributed to an
         atom.
         `A` is the number of atoms and `K` is the number of atomic orbitals.
+        Weights can also be given as a list of `A` weight matrices, one for each atom, which can be
+        scipy sparse matrices when the weights of an atom are nonzero only for few orbital pairs.
         Default is the Mulliken partitioning scheme where two orbitals that belong to the given atom
-        is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0.
+        is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0. This
+        scheme is computed from the gross populations of the atomic orbitals without building the
+        weights.
 
     Returns
     -------
@@ -117,7 +230,7 @@ def mulliken_populations(
         If `num_atoms` is not an integer.
         If `ab_atom_indices` is not a a one-dimensional numpy array of ints.
         If `atom_weights` is not the default value (`None`) and is not a 3-dimensional numpy array
-        of ints/flotas.
+        of ints/flotas or a list of two-dimensional numpy arrays or scipy sparse matrices.
     ValueError
         If `olp_ab_ab` is not square.
         If the number of rows in `coeff_ab_mo` is not equal to the number of rows in
@@ -145,103 +258,37 @@ def mulliken_populations(
     If there are any occupation numbers of the molecular orbitals that is greater than 2.
     If the total population does not match the sum of the electrons provided by the `occupations`.
 
+    Notes
+    -----
+    The numerical properties of the inputs (symmetry & normalization of the overlap, the
+    molecular orbitals and the weights) are checked according to the validation level (see
+    `orbstools.validation`).
+
     """
     # pylint: disable=R0912,R0915
-    if not (
-        isinstance(coeff_ab_mo, np.ndarray) and coeff_ab_mo.ndim == 2 and coeff_ab_mo.dtype == float
-    ):
-        raise TypeError(
-            "Transformation matrix from atomic basis functions to molecular orbitals must be a "
-            "two-dimensional numpy array of floats."
-        )
-    if not (
-        isinstance(occupations, np.ndarray)
-        and occupations.ndim == 1
-        and occupations.dtype in [float, int]
-    ):
-        raise TypeError(
-            "Molecular orbital occupation numbers must be not a one-dimensional numpy array of "
-            "floats or ints."
-        )
-    if not (isinstance(olp_ab_ab, np.ndarray) and olp_ab_ab.ndim == 2 and olp_ab_ab.dtype == float):
-        raise TypeError(
-            "Overlap of the atomic basis functions must be a two-dimensional numpy array of floats."
-        )
-    if not isinstance(num_atoms, int):
-        raise TypeError("Number of atoms must be an integer.")
-    if not (
-        isinstance(ab_atom_indices, np.ndarray)
-        and ab_atom_indices.ndim == 1
-        and ab_atom_indices.dtype == int
-    ):
-        raise TypeError(
-            "Atom indices of each atomic basis function must be a one-dimensional numpy array of "
-            "integers with size equal to the number of atomic basis functions."
-        )
-
-    if not olp_ab_ab.shape[0] == olp_ab_ab.shape[1]:
-        raise ValueError("Overlap matrix is not square.")
-    if not coeff_ab_mo.shape[0] == olp_ab_ab.shape[0]:
-        raise ValueError(
-            "Number of atomic orbitals in the transformation matrix and overlap matrix are not "
-            "equal."
-        )
-    if not coeff_ab_mo.shape[1] == occupations.size:
-        raise ValueError(
-            "Number of molecular orbitals in the transformation matrix and occupations are not "
-            "equal."
-        )
-
-    if not np.allclose(olp_ab_ab, olp_ab_ab.T):
-        raise ValueError("Overlap of the atomic basis functions must be symmetric.")
-    if not np.allclose(np.diag(olp_ab_ab), 1):
-        raise ValueError("Overlap of the atomic basis functions must be normalized.")
-    if not np.allclose(np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)), 1):
-        raise ValueError(
-            "Molecular orbitals (and the corresponding transformation matrix) must be normalized."
-        )
-
+    _check_input(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices)
     if not np.all(occupations >= 0):
         raise ValueError("Occupation numbers must be greater than or equal to 0.")
     if np.any(occupations > 2):
         print("WARNING: Atleast one occupation number exceeds 2.")
 
-    # Check basis mapping
-    if ab_atom_indices.size != olp_ab_ab.shape[0]:
-        raise ValueError(
-            "Number of indices in `ab_atom_indices` must be equal to the number of atomic basis "
-            "functions."
-        )
-    if not (np.all(ab_atom_indices >= 0) and np.all(ab_atom_indices < num_atoms)):
-        raise ValueError(
-            "Atom indices of each atomic basis function must be greater than or equal to zero and "
-            " less than the number of atoms"
-        )
-
     if atom_weights is None:
-        num_ab = olp_ab_ab.shape[0]
-        # NOTE: creating this numpy array is quite memory intensive. Since nothing here will ever be
-        # a computational bottleneck, it will be smarter to use a for loop incorporating the next
-        # two parts (weights and density) together. However, we keep these two parts separated to
-        # make it easier to implement different weight paradigms.
-        atom_weights = np.zeros((num_atoms, num_ab, num_ab))
-        ab_atom_indices_separated = ab_atom_indices[None, :] == np.arange(num_atoms)[:, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, :, None]
-        atom_weights += (ab_atom_indices_separated.astype(float) * 0.5)[:, None, :]
+        # Mulliken weights, (delta_{jA} + delta_{kA}) / 2, only add up the gross populations of the
+        # atomic orbitals belonging to each atom, i.e. the diagonal of the product of the density
+        # and the overlap matrix. The density matrix is not built; memory scales with K*M.
+        gross_pops = np.sum(
+            (coeff_ab_mo * occupations[None, :]) * olp_ab_ab.dot(coeff_ab_mo), axis=1
+        )
+        output = np.bincount(ab_atom_indices, weights=gross_pops, minlength=num_atoms)
         # code above is equivalent to the following:
-        # atom_weights = {}
+        # output = np.zeros(num_atoms)
         # for i in range(num_atoms):
-        #     weights = np.zeros(num_ab)
-        #     weights[ab_atom_indices == i] = 0.5
-        #     atom_weights[i] = weights[:, None] + weights[None, :]
-    else:
-        if not (
-            isinstance(atom_weights, np.ndarray)
-            and atom_weights.ndim == 3
-            and atom_weights.dtype in [float, int]
-        ):
+        #     output[i] = np.sum(gross_pops[ab_atom_indices == i])
+    elif isinstance(atom_weights, np.ndarray):
+        if not (atom_weights.ndim == 3 and atom_weights.dtype in [float, int]):
             raise TypeError(
-                "Orbital weights for the atoms must be a 3-dimensional numpy array of ints/floats."
+                "Orbital weights for the atoms must be a 3-dimensional numpy array of ints/floats "
+                "or a list of two-dimensional numpy arrays or scipy sparse matrices."
             )
         if atom_weights.shape[0] != num_atoms:
             raise ValueError(
@@ -253,26 +300,71 @@ def mulliken_populations(
                 "Second and third dimension of the orbital weights for the atoms must be equal to "
                 "the number of atomic orbitals."
             )
-        if not np.allclose(atom_weights, np.swapaxes(atom_weights, 1, 2)):
+        if not all(validation.is_symmetric(weights) for weights in atom_weights):
             raise ValueError(
                 "Orbital weights for each atom must be symmetric, i.e. `atom_weights` must be "
                 "symmetric with respect to the interchange of the second and third indices."
             )
-        if not np.allclose(np.sum(atom_weights, axis=0), 1):
+        if validation.get_validation_level() != "off" and not np.allclose(
+            np.sum(atom_weights, axis=0), 1
+        ):
             raise ValueError(
                 "Orbital weights for the atoms must be normalized, i.e. sum over the first "
                 "dimension must result in 1's."
             )
-
-    # NOTE: the axis keyword used here for np.sum uses API introduced in numpy 1.7.0. This means
-    # that this function call will restrict the version of numpy used by this package.
-    density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
-    raw_pops = (olp_ab_ab * density.T)[None, :, :] * atom_weights
-    output = np.sum(raw_pops, axis=(1, 2))
-    # code above is equivalent to the following:
-    # output = np.zeros(num_atoms)
-    # for atom_ind, weights in atom_weights.items():
-    #     output[atom_ind] = np.sum(olp_ab_ab * density.T * weights)
+        # NOTE: the axis keyword used here for np.sum uses API introduced in numpy 1.7.0. This
+        # means that this function call will restrict the version of numpy used by this package.
+        density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
+        output = np.array([np.sum(olp_ab_ab * density.T * weights) for weights in atom_weights])
+    else:
+        # weights of each atom are given separately as dense arrays or sparse matrices, so the
+        # (A, K, K) array is never created
+        if not (
+            isinstance(atom_weights, (list, tuple))
+            and all(
+                (isinstance(weights, np.ndarray) and weights.dtype in [float, int])
+                or issparse(weights)
+                for weights in atom_weights
+            )
+        ):
+            raise TypeError(
+                "Orbital weights for the atoms must be a 3-dimensional numpy array of ints/floats "
+                "or a list of two-dimensional numpy arrays or scipy sparse matrices."
+            )
+        if len(atom_weights) != num_atoms:
+            raise ValueError(
+                "Number of orbital weights for the atoms must be equal to the number of atoms."
+            )
+        if any(weights.shape != olp_ab_ab.shape for weights in atom_weights):
+            raise ValueError(
+                "Orbital weights of each atom must have the shape of the overlap matrix of the "
+                "atomic orbitals."
+            )
+        total_weights = np.zeros(olp_ab_ab.shape)
+        for weights in atom_weights:
+            if issparse(weights):
+                if validation.get_validation_level() != "off" and (
+                    abs(weights - weights.T).max() > 1e-8
+                ):
+                    raise ValueError("Orbital weights for each atom must be symmetric.")
+                total_weights += weights.toarray()
+            else:
+                if not validation.is_symmetric(weights):
+                    raise ValueError("Orbital weights for each atom must be symmetric.")
+                total_weights += weights
+        if not validation.is_close(total_weights, 1):
+            raise ValueError(
+                "Orbital weights for the atoms must be normalized, i.e. sum over the atoms must "
+                "result in 1's."
+            )
+        density = (coeff_ab_mo * occupations[None, :]).dot(coeff_ab_mo.T)
+        raw_pops = olp_ab_ab * density.T
+        output = np.zeros(num_atoms)
+        for atom_ind, weights in enumerate(atom_weights):
+            if issparse(weights):
+                output[atom_ind] = weights.multiply(raw_pops).sum()
+            else:
+                output[atom_ind] = np.sum(raw_pops * weights)
 
     if not abs(np.sum(occupations) - np.sum(output)) < 1e-6:
         print("WARNING: Population does not match up with the number of electrons.")
@@ -288,6 +380,7 @@ def mulliken_populations_newbasis(
     coeff_ab_new,
     new_atom_indices,
     new_atom_weights=None,
+    olp_new_new_inv=None,
 ):
     r"""Return the Mulliken populations of the given system in a new basis set.
 
@@ -326,7 +419,7 @@ def mulliken_populations_newbasis(
         Index of the atom to which each of the new basis function belongs.
         Data type must be integers.
         `L` is the number of atomic orbitals.
-    new_atom_weights : np.ndarray(A, L, L)
+    new_atom_weights : {np.ndarray(A, L, L), list of np.ndarray(L, L), list of scipy.sparse matrix}
         Weights of the pair of new basis functions for the atoms. In other words, this weight
         controls the amount of electrons associated with an new basis function pair that will be
         attributed to an atom.
@@ -334,6 +427,9 @@ def mulliken_populations_newbasis(
         Default is the Mulliken partitioning scheme where two basis functions that belong to the
         given atom is 1, only one basis function that belong to the given atoms is 0.5, and no basis
         functions is 0.
+    olp_new_new_inv : np.ndarray(L, L), optional
+        (Pseudo-)inverse of the overlap of the new basis functions, if it is already available.
+        Default is computed from the eigendecomposition of the overlap of the new basis functions.
 
     Returns
     -------
@@ -349,7 +445,7 @@ def mulliken_populations_newbasis(
     """
     olp_new_new = coeff_ab_new.T.dot(olp_ab_ab).dot(coeff_ab_new)
     olp_new_mo = coeff_ab_new.T.dot(olp_ab_ab).dot(coeff_ab_mo)
-    coeff_new_mo = project(olp_new_new, olp_new_mo)
+    coeff_new_mo = project(olp_new_new, olp_new_mo, olp_one_one_inv=olp_new_new_inv)
     return mulliken_populations(
         coeff_new_mo,
         occupations,
@@ -361,7 +457,13 @@ def mulliken_populations_newbasis(
 
 
 def lowdin_populations(
-    coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, atom_weights=None
+    coeff_ab_mo,
+    occupations,
+    olp_ab_ab,
+    num_atoms,
+    ab_atom_indices,
+    atom_weights=None,
+    coeff_ab_oab=None,
 ):
     r"""Return the Lowdin populations of the given molecular orbitals in atomic orbital basis set.
 
@@ -396,13 +498,18 @@ def lowdin_populations(
         Index of the atom to which each atomic basis function belongs.
         Data type must be integers.
         `K` is the number of atomic orbitals.
-    atom_weights : np.ndarray(A, K, K)
+    atom_weights : {np.ndarray(A, K, K), list of np.ndarray(K, K), list of scipy.sparse matrix}
         Weights of the atomic orbital pairs for the atoms. In other words, this weight controls the
         amount of electrons associated with an atomic orbital pair that will be attributed to an
         atom.
         `A` is the number of atoms and `K` is the number of atomic orbitals.
         Default is the Mulliken partitioning scheme where two orbitals that belong to the given atom
         is 1, only one orbital that belong to the given atoms is 0.5, and no orbitals is 0.
+    coeff_ab_oab : np.ndarray(K, K), optional
+        Transformation matrix from the atomic basis to the symmetrically orthogonalized atomic
+        basis, i.e. :math:`S^{-1/2}`, if it is already available (e.g. from
+        `AtomicOrbitals.compute_overlap_power`).
+        Default is computed from the eigendecomposition of `olp_ab_ab`.
 
     Returns
     -------
@@ -412,7 +519,11 @@ def lowdin_populations(
         `ab_atom_indices`.
 
     """
-    coeff_ab_oab = power_symmetric(olp_ab_ab, -0.5)
+    if coeff_ab_oab is None:
+        coeff_ab_oab = power_symmetric(olp_ab_ab, -0.5)
+    # overlap of the orthogonalized basis, S^(-1/2) S S^(-1/2), is a projector (identity, unless
+    # eigenvalues of S are discarded), so it is its own pseudo-inverse
+    olp_oab_oab = coeff_ab_oab.T.dot(olp_ab_ab).dot(coeff_ab_oab)
     return mulliken_populations_newbasis(
         coeff_ab_mo,
         occupations,
@@ -421,4 +532,5 @@ def lowdin_populations(
         coeff_ab_oab,
         ab_atom_indices,
         new_atom_weights=atom_weights,
+        olp_new_new_inv=olp_oab_oab,
     )
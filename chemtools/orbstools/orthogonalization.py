@@ -1,7 +1,10 @@
 """Tools for matrix decomposition and power."""
 import numpy as np
+from chemtools.orbstools import validation
+from chemtools.profiling import profiled
 
 
+@profiled("orbstools.eigh")
 def eigh(matrix, threshold=1e-9):
     """Return the eigenvalues and eigenvectors of a Hermitian matrix.
 
@@ -46,7 +49,7 @@ def eigh(matrix, threshold=1e-9):
         raise TypeError("Given matrix must be a two-dimensional numpy array.")
     if matrix.shape[0] != matrix.shape[1]:
         raise ValueError("Given matrix must be square.")
-    if not np.allclose(matrix.conjugate().T, matrix):
+    if not validation.is_symmetric(matrix):
         raise ValueError("Given matrix must be Hermitian.")
     if not isinstance(threshold, (int, float)):
         raise TypeError("Given threshold must be an integer or a float.")
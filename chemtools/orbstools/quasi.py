@@ -1,6 +1,7 @@
 """Module for making Quasiatomic orbitals."""
 import numpy as np
 from chemtools.orbstools import orthogonalization as orth
+from chemtools.orbstools import validation
 
 
 def _check_input(
@@ -55,6 +56,11 @@ def _check_input(
         `olp_aao_aao`.
         If molecular orbitals are not normalized.
 
+    Notes
+    -----
+    The numerical properties of the inputs (normalization, symmetry, positive-semidefiniteness)
+    are checked according to the validation level (see `orbstools.validation`).
+
     """
     # pylint: disable=R0912
     if coeff_ab_mo is not None:
@@ -70,11 +76,11 @@ def _check_input(
             raise TypeError(
                 "Given overlap matrix for atomic basis is not a two-dimensional square numpy array."
             )
-        if not np.allclose(np.diag(olp_ab_ab), np.ones(olp_ab_ab.shape[0])):
+        if not validation.is_close(np.diag(olp_ab_ab), 1):
             raise ValueError("Given overlap matrix for atomic basis is not normalized.")
-        if not np.allclose(olp_ab_ab, olp_ab_ab.T):
+        if not validation.is_symmetric(olp_ab_ab):
             raise ValueError("Given overlap matrix for atomic basis is not symmetric.")
-        if not np.all(orth.eigh(olp_ab_ab)[0] >= 0):
+        if not validation.is_positive_semidefinite(olp_ab_ab, orth.eigh):
             raise ValueError("Given overlap matrix for atomic basis is not positive semidefinite.")
 
     if olp_aao_ab is not None:
@@ -93,11 +99,11 @@ def _check_input(
             raise TypeError(
                 "Given overlap matrix for AAO is not a two dimensional square numpy array."
             )
-        if not np.allclose(np.diag(olp_aao_aao), np.ones(olp_aao_aao.shape[0])):
+        if not validation.is_close(np.diag(olp_aao_aao), 1):
             raise ValueError("Given overlap matrix for AAO is not normalized.")
-        if not np.allclose(olp_aao_aao, olp_aao_aao.T):
+        if not validation.is_symmetric(olp_aao_aao):
             raise ValueError("Given overlap matrix for AAO is not symmetric.")
-        if not np.all(orth.eigh(olp_aao_aao)[0] >= 0):
+        if not validation.is_positive_semidefinite(olp_aao_aao, orth.eigh):
             raise ValueError("Given overlap matrix for AAO is not positive semidefinite.")
 
     if (
@@ -139,8 +145,7 @@ def _check_input(
         )
 
     if coeff_ab_mo is not None and olp_ab_ab is not None:
-        olp_mo_mo = coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)
-        if not np.allclose(np.diag(olp_mo_mo), np.ones(olp_mo_mo.shape[0])):
+        if not validation.is_normalized(coeff_ab_mo, olp_ab_ab):
             raise ValueError(
                 "The overlap of the molecular orbitals, calculated from `coeff_ab_mo` and "
                 "`olp_ab_ab` is not normalized."
@@ -162,7 +167,7 @@ def _check_input(
             )
 
 
-def project(olp_one_one, olp_one_two):
+def project(olp_one_one, olp_one_two, olp_one_one_inv=None):
     r"""Project one basis set onto another basis set.
 
     .. math::
@@ -180,6 +185,9 @@ def project(olp_one_one, olp_one_two):
         Overlap of the basis functions in set 1 with basis functions from set 1.
     olp_one_two : np.ndarray(N, M)
         Overlap of the basis functions in set 1 with basis functions from set 2.
+    olp_one_one_inv : np.ndarray(N, N), optional
+        (Pseudo-)inverse of `olp_one_one`, if it is already available.
+        Default is computed from the eigendecomposition of `olp_one_one`.
 
     Returns
     -------
@@ -201,7 +209,10 @@ def project(olp_one_one, olp_one_two):
             "Number of rows/columns of `olp_one_one` must be equal to the number of rows in "
             "`olp_one_two`."
         )
-    olp_one_one_inv = orth.power_symmetric(olp_one_one, -1)
+    if olp_one_one_inv is None:
+        olp_one_one_inv = orth.power_symmetric(olp_one_one, -1)
+    elif olp_one_one_inv.shape != olp_one_one.shape:
+        raise ValueError("`olp_one_one_inv` must have the same shape as `olp_one_one`.")
     coeff_one_proj = olp_one_one_inv.dot(olp_one_two)
     # Remove zero columns
     coeff_one_proj = coeff_one_proj[:, np.any(coeff_one_proj, axis=0)]
@@ -210,6 +221,8 @@ def project(olp_one_one, olp_one_two):
     normalizer = np.diag(olp_proj_proj) ** (-0.5)
     coeff_one_proj *= normalizer
     # Check linear dependence
+    if validation.get_validation_level() != "full":
+        return coeff_one_proj
     rank = np.linalg.matrix_rank(coeff_one_proj)
     if rank < coeff_one_proj.shape[1]:
         print(
@@ -0,0 +1,99 @@
+"""Test orbstools.bondorder."""
+from chemtools.orbstools.bondorder import mayer_bond_orders, wiberg_bond_orders
+from chemtools.orbstools.orthogonalization import power_symmetric
+import numpy as np
+from numpy.testing import assert_raises
+
+
+def test_bond_orders_h2():
+    """Test bond orders of H2 in minimal basis."""
+    olp_ab_ab = np.array([[1.0, 0.6], [0.6, 1.0]])
+    coeff_ab_mo = np.array([[1.0, 1.0], [1.0, -1.0]])
+    coeff_ab_mo *= np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)) ** (-0.5)
+    occupations = np.array([1.0, 0.0])
+    ab_atom_indices = np.array([0, 1])
+    # bond order of alpha & beta orbitals add up to a single bond
+    for func in [mayer_bond_orders, wiberg_bond_orders]:
+        bond_orders = func(coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices)
+        assert np.allclose(bond_orders, [[0.0, 0.5], [0.5, 0.0]])
+    # no bond for occupied bonding & antibonding orbitals
+    bond_orders = mayer_bond_orders(coeff_ab_mo, np.ones(2), olp_ab_ab, 2, ab_atom_indices)
+    assert np.allclose(bond_orders, 0)
+
+
+def test_bond_orders():
+    """Test bond orders against a loop over the pairs of atoms."""
+    # get random unitary matrix
+    unitary = np.linalg.svd(np.random.rand(20, 20))[0]
+    # get random olp_ab_ab
+    olp_ab_ab = (unitary * (np.random.rand(20) + 0.1)).dot(unitary.T)
+    norm = np.diag(olp_ab_ab) ** (-0.5)
+    olp_ab_ab *= norm[:, None]
+    olp_ab_ab *= norm[None, :]
+    # get random mo's
+    coeff_ab_mo = np.random.rand(20, 15) - 0.5
+    coeff_ab_mo *= np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)) ** (-0.5)
+    occupations = np.random.rand(15)
+    # atom 4 does not have any basis functions
+    ab_atom_indices = np.array([0, 1, 2, 1, 1, 0, 2, 1, 0, 2, 1, 2, 0, 1, 2, 0, 3, 3, 1, 0])
+    dens = (coeff_ab_mo * occupations).dot(coeff_ab_mo.T)
+    dens_olp = dens.dot(olp_ab_ab)
+    olp_sqrt = power_symmetric(olp_ab_ab, 0.5)
+    dens_oab = olp_sqrt.dot(dens).dot(olp_sqrt)
+    mayer = np.zeros((5, 5))
+    wiberg = np.zeros((5, 5))
+    for i in range(4):
+        for j in range(4):
+            if i != j:
+                ind_i, ind_j = ab_atom_indices == i, ab_atom_indices == j
+                mayer[i, j] = 2 * np.sum(dens_olp[ind_i][:, ind_j] * dens_olp[ind_j][:, ind_i].T)
+                wiberg[i, j] = 2 * np.sum(dens_oab[ind_i][:, ind_j] ** 2)
+    assert np.allclose(
+        mayer_bond_orders(coeff_ab_mo, occupations, olp_ab_ab, 5, ab_atom_indices), mayer
+    )
+    assert np.allclose(
+        wiberg_bond_orders(coeff_ab_mo, occupations, olp_ab_ab, 5, ab_atom_indices), wiberg
+    )
+    assert np.allclose(
+        wiberg_bond_orders(
+            coeff_ab_mo, occupations, olp_ab_ab, 5, ab_atom_indices, olp_ab_ab_sqrt=olp_sqrt
+        ),
+        wiberg,
+    )
+    # sorted basis functions give the same bond orders
+    order = np.argsort(ab_atom_indices)
+    assert np.allclose(
+        mayer_bond_orders(
+            coeff_ab_mo[order], occupations, olp_ab_ab[order][:, order], 5, ab_atom_indices[order]
+        ),
+        mayer,
+    )
+    # errors
+    assert_raises(
+        TypeError,
+        mayer_bond_orders,
+        coeff_ab_mo.tolist(),
+        occupations,
+        olp_ab_ab,
+        5,
+        ab_atom_indices,
+    )
+    assert_raises(
+        TypeError, mayer_bond_orders, coeff_ab_mo, occupations, olp_ab_ab, 5.0, ab_atom_indices
+    )
+    assert_raises(
+        ValueError, mayer_bond_orders, coeff_ab_mo, occupations, olp_ab_ab, 3, ab_atom_indices
+    )
+    assert_raises(
+        ValueError, mayer_bond_orders, 2 * coeff_ab_mo, occupations, olp_ab_ab, 5, ab_atom_indices
+    )
+    assert_raises(
+        ValueError,
+        wiberg_bond_orders,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        5,
+        ab_atom_indices,
+        olp_sqrt[:10],
+    )
@@ -13,6 +13,7 @@ from chemtools.orbstools.orthogonalization import power_symmetric
 from chemtools.orbstools.quasi import project
 import numpy as np
 from numpy.testing import assert_raises
+from scipy.sparse import csr_matrix
 
 
 def test_mulliken_populations_input():
@@ -438,3 +439,99 @@ def test_lowdin_populations():
         ),
         lowdin_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices),
     )
+    # precomputed symmetric orthogonalization
+    assert np.allclose(
+        lowdin_populations(
+            coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices, coeff_ab_oab=coeff_ab_oab
+        ),
+        lowdin_populations(coeff_ab_mo, occupations, olp_ab_ab, 6, ab_atom_indices),
+    )
+
+
+def test_mulliken_populations_weights():
+    """Test orbstools.mulliken.mulliken_populations with weights of each atom given separately."""
+    # get random unitary matrix
+    unitary = np.linalg.svd(np.random.rand(20, 20))[0]
+    # get random olp_ab_ab
+    olp_ab_ab = (unitary * np.random.rand(20)).dot(unitary.T)
+    norm = np.diag(olp_ab_ab) ** (-0.5)
+    olp_ab_ab *= norm[:, None]
+    olp_ab_ab *= norm[None, :]
+    # get random mo's
+    coeff_ab_mo = np.random.rand(20, 15) - 0.5
+    coeff_ab_mo *= np.diag(coeff_ab_mo.T.dot(olp_ab_ab).dot(coeff_ab_mo)) ** (-0.5)
+    occupations = np.random.rand(15)
+    num_atoms = 4
+    ab_atom_indices = np.array([0, 1, 2, 1, 1, 0, 2, 1, 0, 2, 1, 2, 0, 1, 2, 0, 3, 3, 1, 0])
+    # mulliken weights
+    atom_weights = np.zeros((num_atoms, 20, 20))
+    for i in range(num_atoms):
+        weights = np.zeros(20)
+        weights[ab_atom_indices == i] = 0.5
+        atom_weights[i] = weights[:, None] + weights[None, :]
+    # default, dense, list of dense & list of sparse weights give the same populations
+    pops = mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices)
+    density = (coeff_ab_mo * occupations).dot(coeff_ab_mo.T)
+    gross_pops = np.diag(density.dot(olp_ab_ab))
+    assert np.allclose(pops, [np.sum(gross_pops[ab_atom_indices == i]) for i in range(4)])
+    for weights in [atom_weights, list(atom_weights), [csr_matrix(w) for w in atom_weights]]:
+        assert np.allclose(
+            pops,
+            mulliken_populations(
+                coeff_ab_mo, occupations, olp_ab_ab, num_atoms, ab_atom_indices, weights
+            ),
+        )
+    # check errors of weights given for each atom
+    weights = [csr_matrix(w) for w in atom_weights]
+    assert_raises(
+        TypeError,
+        mulliken_populations,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        num_atoms,
+        ab_atom_indices,
+        weights[:3] + [atom_weights[3].tolist()],
+    )
+    assert_raises(
+        ValueError,
+        mulliken_populations,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        num_atoms,
+        ab_atom_indices,
+        weights[:3],
+    )
+    assert_raises(
+        ValueError,
+        mulliken_populations,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        num_atoms,
+        ab_atom_indices,
+        weights[:3] + [csr_matrix(atom_weights[3][:, :19])],
+    )
+    asymmetric = np.copy(atom_weights[3])
+    asymmetric[0, 1] += 0.5
+    assert_raises(
+        ValueError,
+        mulliken_populations,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        num_atoms,
+        ab_atom_indices,
+        weights[:3] + [asymmetric],
+    )
+    assert_raises(
+        ValueError,
+        mulliken_populations,
+        coeff_ab_mo,
+        occupations,
+        olp_ab_ab,
+        num_atoms,
+        ab_atom_indices,
+        weights[:3] + [2 * weights[3]],
+    )
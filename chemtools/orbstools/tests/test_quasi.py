@@ -36,7 +36,18 @@ def test_project():
     olp_1 = np.identity(10)
     olp_1_2 = np.hstack([np.identity(10)] * 2)
     assert np.allclose(project(olp_1, olp_1_2), np.hstack([np.identity(10)] * 2))
+    # precomputed inverse of the overlap
+    olp_1 = np.identity(20)
+    olp_1[:10, 10:] = np.identity(10) * 0.5
+    olp_1[10:, :10] = np.identity(10) * 0.5
+    olp_1_2 = np.vstack([np.identity(10)] * 2)
+    assert np.allclose(
+        project(olp_1, olp_1_2, olp_one_one_inv=np.linalg.inv(olp_1)), project(olp_1, olp_1_2)
+    )
     # errors
+    assert_raises(ValueError, project, olp_1, olp_1_2, np.identity(10))
+    olp_1 = np.identity(10)
+    olp_1_2 = np.hstack([np.identity(10)] * 2)
     assert_raises(TypeError, project, olp_1.tolist(), olp_1_2)
     assert_raises(TypeError, project, olp_1.reshape(10, 10, 1), olp_1_2)
     assert_raises(TypeError, project, olp_1.reshape(4, 25), olp_1_2)
@@ -0,0 +1,107 @@
+"""Test orbstools.validation."""
+from chemtools.orbstools import validation
+from chemtools.orbstools.bondorder import mayer_bond_orders, wiberg_bond_orders
+from chemtools.orbstools.mulliken import mulliken_populations
+from chemtools.orbstools.quasi import _check_input
+import numpy as np
+from numpy.testing import assert_raises
+
+
+def test_validation_level():
+    """Test setting the validation level in orbstools.validation."""
+    assert validation.get_validation_level() == "full"
+    assert_raises(ValueError, validation.set_validation_level, "gibberish")
+    assert_raises(ValueError, validation.ValidationLevel, "none")
+    with validation.ValidationLevel("cheap"):
+        assert validation.get_validation_level() == "cheap"
+        with validation.ValidationLevel("off"):
+            assert validation.get_validation_level() == "off"
+        assert validation.get_validation_level() == "cheap"
+    assert validation.get_validation_level() == "full"
+    validation.set_validation_level("off")
+    assert validation.get_validation_level() == "off"
+    validation.set_validation_level("full")
+
+
+def test_validation_checks():
+    """Test checks of orbstools.validation for each validation level."""
+    # get random positive definite overlap matrix
+    unitary = np.linalg.svd(np.random.rand(40, 40))[0]
+    olp = (unitary * (np.random.rand(40) + 0.1)).dot(unitary.T)
+    norm = np.diag(olp) ** (-0.5)
+    olp *= norm[:, None] * norm[None, :]
+    coeff = np.random.rand(40, 30) - 0.5
+    coeff *= np.diag(coeff.T.dot(olp).dot(coeff)) ** (-0.5)
+    # matrix that is asymmetric only in one (sampled) row
+    asym = np.copy(olp)
+    asym[0, 5] += 0.1
+    # symmetric matrix that is not positive semidefinite but satisfies the cheap bound
+    indefinite = np.identity(40)
+    indefinite[0, 1] = indefinite[1, 0] = 1.0
+    indefinite[1, 2] = indefinite[2, 1] = 1.0
+    for level in ["full", "cheap", "off"]:
+        with validation.ValidationLevel(level):
+            assert validation.is_symmetric(olp)
+            assert validation.is_positive_semidefinite(olp)
+            assert validation.is_normalized(coeff, olp)
+            assert validation.is_close(np.diag(olp), 1)
+            assert validation.is_symmetric(asym) == (level == "off")
+            assert validation.is_normalized(2 * coeff, olp) == (level == "off")
+            assert validation.is_close(np.diag(2 * olp), 1) == (level == "off")
+            assert validation.is_positive_semidefinite(-olp) == (level == "off")
+            assert validation.is_positive_semidefinite(indefinite) == (level != "full")
+
+
+def test_validation_mulliken_populations():
+    """Test that orbstools.mulliken.mulliken_populations honours the validation level."""
+    coeff_ab_mo = np.identity(10)
+    occupations = np.array([2.0] * 4 + [0.0] * 6)
+    olp_ab_ab = np.identity(10)
+    olp_ab_ab[0, 1] = 0.5
+    ab_atom_indices = np.array([0, 0, 1, 1, 0, 0, 1, 1, 0, 1])
+    for level in ["full", "cheap"]:
+        with validation.ValidationLevel(level):
+            assert_raises(
+                ValueError,
+                mulliken_populations,
+                coeff_ab_mo,
+                occupations,
+                olp_ab_ab,
+                2,
+                ab_atom_indices,
+            )
+            assert_raises(ValueError, _check_input, olp_ab_ab=olp_ab_ab)
+    with validation.ValidationLevel("off"):
+        mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices)
+        _check_input(olp_ab_ab=olp_ab_ab)
+        # types are always checked
+        assert_raises(
+            TypeError,
+            mulliken_populations,
+            coeff_ab_mo.tolist(),
+            occupations,
+            olp_ab_ab,
+            2,
+            ab_atom_indices,
+        )
+
+
+def test_validation_bond_orders():
+    """Test that orbstools.bondorder functions honour the validation level."""
+    coeff_ab_mo = np.identity(10)
+    occupations = np.array([1.0] * 4 + [0.0] * 6)
+    olp_ab_ab = np.identity(10)
+    olp_ab_ab[0, 1] = 0.5
+    ab_atom_indices = np.array([0, 0, 1, 1, 0, 0, 1, 1, 0, 1])
+    for func in [mayer_bond_orders, wiberg_bond_orders]:
+        for level in ["full", "cheap"]:
+            with validation.ValidationLevel(level):
+                assert_raises(
+                    ValueError, func, coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices
+                )
+        with validation.ValidationLevel("off"):
+            func(coeff_ab_mo, occupations, olp_ab_ab, 2, ab_atom_indices)
+            # types are always checked
+            assert_raises(
+                TypeError, func, coeff_ab_mo.tolist(), occupations, olp_ab_ab, 2, ab_atom_indices
+            )
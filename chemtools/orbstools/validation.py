@@ -0,0 +1,204 @@
+"""Validation of the numerical properties of the inputs to the orbital partitioning tools.
+
+Checking the numerical properties of the inputs (e.g. symmetry and positive-semidefiniteness of
+the overlap matrix, or normalization of the molecular orbitals) can be more expensive than the
+analysis itself, so the amount of validation is controlled by a validation level:
+
+- "full": all checks are done on the complete arrays.
+- "cheap": checks are done in :math:`\\mathcal{O}(K^2)` or on a sample of the rows/columns.
+- "off": only the types and shapes of the inputs are checked.
+
+"""
+import numpy as np
+
+
+__all__ = ["get_validation_level", "set_validation_level", "ValidationLevel"]
+
+
+_VALIDATION = {"level": "full"}
+
+# maximum number of rows/columns checked in the "cheap" validation level
+NUM_SAMPLES = 16
+
+
+def get_validation_level():
+    """Return the validation level used in the orbstools module.
+
+    Returns
+    -------
+    level : str
+        One of "full", "cheap", or "off".
+
+    """
+    return _VALIDATION["level"]
+
+
+def set_validation_level(level):
+    """Set the validation level used in the orbstools module.
+
+    Parameters
+    ----------
+    level : str
+        One of "full", "cheap", or "off".
+
+    Raises
+    ------
+    ValueError
+        If `level` is not one of "full", "cheap", or "off".
+
+    """
+    if level not in ["full", "cheap", "off"]:
+        raise ValueError("Validation level must be one of 'full', 'cheap', or 'off'.")
+    _VALIDATION["level"] = level
+
+
+class ValidationLevel(object):
+    """Context manager for temporarily changing the validation level.
+
+    Examples
+    --------
+    >>> with ValidationLevel("off"):
+    ...     pops = mulliken_populations(coeff_ab_mo, occupations, olp_ab_ab, num_atoms, indices)
+
+    """
+
+    def __init__(self, level):
+        """Initialize.
+
+        Parameters
+        ----------
+        level : str
+            One of "full", "cheap", or "off".
+
+        """
+        if level not in ["full", "cheap", "off"]:
+            raise ValueError("Validation level must be one of 'full', 'cheap', or 'off'.")
+        self.level = level
+        self._old_level = None
+
+    def __enter__(self):
+        """Set the validation level."""
+        self._old_level = get_validation_level()
+        set_validation_level(self.level)
+        return self
+
+    def __exit__(self, *args):
+        """Restore the previous validation level."""
+        set_validation_level(self._old_level)
+
+
+def _sample(size):
+    """Return the indices of the rows/columns checked in the "cheap" validation level.
+
+    Indices are evenly spaced so that the checks are reproducible.
+
+    """
+    if size <= NUM_SAMPLES:
+        return np.arange(size)
+    return np.unique(np.linspace(0, size - 1, NUM_SAMPLES).astype(int))
+
+
+def is_symmetric(matrix):
+    """Return True if the given square matrix is Hermitian within the validation level.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(N, N)
+        Square matrix.
+
+    Returns
+    -------
+    is_symmetric : bool
+        True if the matrix is Hermitian or if its symmetry is not checked.
+
+    """
+    level = get_validation_level()
+    if level == "off":
+        return True
+    if level == "cheap":
+        indices = _sample(matrix.shape[0])
+        return np.allclose(matrix[indices, :], matrix[:, indices].conjugate().T)
+    return np.allclose(matrix, matrix.conjugate().T)
+
+
+def is_positive_semidefinite(matrix, eigh=np.linalg.eigvalsh):
+    """Return True if the given symmetric matrix is positive semidefinite (up to validation level).
+
+    In the "cheap" validation level, only the necessary conditions that the diagonal is
+    nonnegative and that :math:`|M_{ij}| \\leq \\sqrt{M_{ii} M_{jj}}` are checked.
+
+    Parameters
+    ----------
+    matrix : np.ndarray(N, N)
+        Symmetric matrix.
+    eigh : callable
+        Function that returns the eigenvalues of the matrix as the first (or only) output.
+
+    Returns
+    -------
+    is_positive_semidefinite : bool
+        True if the matrix is positive semidefinite or if it is not checked.
+
+    """
+    level = get_validation_level()
+    if level == "off":
+        return True
+    if level == "cheap":
+        diag = np.diag(matrix)
+        if np.any(diag < 0):
+            return False
+        bound = np.sqrt(diag)
+        return np.all(np.abs(matrix) <= bound[:, None] * bound[None, :] + 1e-8)
+    eigval = eigh(matrix)
+    if isinstance(eigval, tuple):
+        eigval = eigval[0]
+    return np.all(eigval >= 0)
+
+
+def is_normalized(coeff, olp):
+    """Return True if the functions given by coefficients are normalized (up to validation level).
+
+    In the "cheap" validation level, only a sample of the functions are checked.
+
+    Parameters
+    ----------
+    coeff : np.ndarray(K, M)
+        Transformation matrix from the basis functions (rows) to the functions (columns).
+    olp : np.ndarray(K, K)
+        Overlap of the basis functions.
+
+    Returns
+    -------
+    is_normalized : bool
+        True if the functions are normalized or if it is not checked.
+
+    """
+    level = get_validation_level()
+    if level == "off":
+        return True
+    if level == "cheap":
+        coeff = coeff[:, _sample(coeff.shape[1])]
+    return np.allclose(np.sum(coeff * olp.dot(coeff), axis=0), 1)
+
+
+def is_close(array, value):
+    """Return True if all entries of an array are close to a value within the validation level.
+
+    This check is not expensive, so the "full" and "cheap" validation levels do the same check.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        Array to be checked.
+    value : {float, np.ndarray}
+        Value that the entries of the array must be close to.
+
+    Returns
+    -------
+    is_close : bool
+        True if the entries are close to the value or if it is not checked.
+
+    """
+    if get_validation_level() == "off":
+        return True
+    return np.allclose(array, value)
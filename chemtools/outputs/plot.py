@@ -23,25 +23,28 @@
 """Simple Plotting Module."""
 
 
+import numpy as np
 import matplotlib
 matplotlib.use('agg')
 import matplotlib.pyplot as plt
 
 from matplotlib import rcParams
+from matplotlib.colors import LinearSegmentedColormap, LogNorm, colorConverter
 
 
-__all__ = ['plot_scatter']
+__all__ = ['plot_scatter', 'plot_density']
 
 
-def plot_scatter(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, ylim=None):
+def plot_scatter(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, ylim=None,
+                 per_bin=None, bins=200):
     r"""Scatter plot of y versus x.
 
     Parameters
     ----------
     x : 1-D array or sequence.
-        Array or sequence containing data on x axis.
+        Array or sequence containing data on x axis. Masked points are not plotted.
     y : 1-D array or sequence.
-        Array or sequence containing data on y axis.
+        Array or sequence containing data on y axis. Masked points are not plotted.
     fname : str
         A string representing the path to a filename for storing the plot.
         If the given filename does not have a proper extension, the 'png' format is used
@@ -67,8 +70,131 @@ def plot_scatter(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, yl
         The lower and higher limit of x axis.
     ylim : 1-D array or sequence of length 2, optional
         The lower and higher limit of y axis.
+    per_bin : int, optional
+        If given, the plotted region is divided into `bins` x `bins` cells and at most `per_bin`
+        randomly chosen points of each cell are plotted. Points outside the plotted region are
+        dropped. This keeps the shape of the scatter plot of many (overlapping) points, while
+        plotting a bounded number of points.
+    bins : int, optional
+        Number of cells along each axis used for subsampling the points. Only used when
+        `per_bin` is given.
 
     """
+    x, y = _unmasked_points(x, y)
+    if per_bin is not None:
+        index = _bin_index(x, y, bins, xlim, ylim)
+        keep = _stratified_sample(index, per_bin)
+        x, y = x[keep], y[keep]
+    # create figure
+    fig, ax = _new_figure()
+    # scatter plot
+    plt.scatter(x, y, marker='o', color=color)
+    _save_figure(fig, ax, fname, xlabel, ylabel, xlim, ylim)
+
+
+def plot_density(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, ylim=None,
+                 bins=400, chunk_size=1000000):
+    r"""Plot the density of points of y versus x as an image.
+
+    The points are counted in a `bins` x `bins` histogram within the plotted region, and each
+    non-empty cell is shaded by its (logarithmic) number of points. Unlike the scatter plot, the
+    time & memory for rendering does not depend on the number of points.
+
+    Parameters
+    ----------
+    x : 1-D array or sequence.
+        Array or sequence containing data on x axis. Masked points are not plotted.
+    y : 1-D array or sequence.
+        Array or sequence containing data on y axis. Masked points are not plotted.
+    fname : str
+        A string representing the path to a filename for storing the plot.
+        If the given filename does not have a proper extension, the 'png' format is used
+        by default, i.e. plot is saved as filename.png.
+        See :func:`plot_scatter` for supported formats.
+    color : str, optional
+        Color of the most populated cells. To customize color, see
+        http://matplotlib.org/users/colors.html
+    xlabel : str, optional
+        The x axis label.
+    ylabel : str, optional
+        The y axis label.
+    xlim : 1-D array or sequence of length 2, optional
+        The lower and higher limit of x axis. By default, the range of `x` is used.
+    ylim : 1-D array or sequence of length 2, optional
+        The lower and higher limit of y axis. By default, the range of `y` is used.
+    bins : int, optional
+        Number of cells along each axis.
+    chunk_size : int, optional
+        Number of points binned at once.
+
+    """
+    x, y = _unmasked_points(x, y)
+    xlim, ylim = _check_limits(x, xlim, 'xlim'), _check_limits(y, ylim, 'ylim')
+    # count the points in each cell, a chunk of points at a time
+    counts = np.zeros(bins * bins, dtype=int)
+    for start in range(0, len(x), chunk_size):
+        index = _bin_index(x[start:start + chunk_size], y[start:start + chunk_size],
+                           bins, xlim, ylim)
+        counts += np.bincount(index[index >= 0], minlength=bins * bins)
+    counts = np.ma.masked_equal(counts.reshape(bins, bins), 0)
+    # create figure
+    fig, ax = _new_figure()
+    # shade cells from a light to the full color, and leave the empty cells blank
+    cmap = LinearSegmentedColormap.from_list(
+        'density', [colorConverter.to_rgba(color, 0.15), colorConverter.to_rgba(color, 1.0)])
+    cmap.set_bad(alpha=0.0)
+    norm = LogNorm(vmin=1, vmax=max(counts.max(), 2)) if counts.count() else None
+    ax.imshow(counts.T, origin='lower', extent=tuple(xlim) + tuple(ylim), aspect='auto',
+              cmap=cmap, norm=norm, interpolation='nearest')
+    _save_figure(fig, ax, fname, xlabel, ylabel, xlim, ylim)
+
+
+def _unmasked_points(x, y):
+    """Return the x & y arrays of points which are not masked in either x or y."""
+    if len(x) != len(y):
+        raise ValueError('Length of x & y does not match! {0}!={1}'.format(len(x), len(y)))
+    mask = np.ma.getmaskarray(x) | np.ma.getmaskarray(y)
+    return np.ma.getdata(x)[~mask], np.ma.getdata(y)[~mask]
+
+
+def _check_limits(values, lim, name):
+    """Return the limits of an axis, which default to the range of the values."""
+    if lim is None:
+        if len(values) == 0:
+            return (0., 1.)
+        return (np.min(values), np.max(values))
+    if len(lim) != 2:
+        raise ValueError('Argument {0}={1} should have a length 2!'.format(name, len(lim)))
+    return tuple(lim)
+
+
+def _bin_index(x, y, bins, xlim=None, ylim=None):
+    """Return the flattened index of the histogram cell of each point, or -1 if outside."""
+    xlim, ylim = _check_limits(x, xlim, 'xlim'), _check_limits(y, ylim, 'ylim')
+    xi = np.floor((x - xlim[0]) * (bins / float(xlim[1] - xlim[0] or 1.))).astype(int)
+    yi = np.floor((y - ylim[0]) * (bins / float(ylim[1] - ylim[0] or 1.))).astype(int)
+    # points on the upper limits belong to the last cell
+    xi[x == xlim[1]] = bins - 1
+    yi[y == ylim[1]] = bins - 1
+    index = xi * bins + yi
+    index[(xi < 0) | (xi >= bins) | (yi < 0) | (yi >= bins)] = -1
+    return index
+
+
+def _stratified_sample(index, per_bin, seed=0):
+    """Return the sorted indices of at most `per_bin` random points of each (non-negative) cell."""
+    # shuffle the points, then group them by cell keeping the shuffled order within each cell
+    order = np.random.RandomState(seed).permutation(len(index))
+    order = order[np.argsort(index[order], kind='mergesort')]
+    cells = index[order]
+    # rank of each point within its cell
+    starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+    rank = np.arange(len(cells)) - np.repeat(starts, np.diff(np.r_[starts, len(cells)]))
+    return np.sort(order[(rank < per_bin) & (cells >= 0)])
+
+
+def _new_figure():
+    """Return a new figure & its axes using the style of the plots."""
     # set font
     rcParams['font.family'] = 'serif'
     rcParams['font.serif'] = ['Times New Roman']
@@ -76,16 +202,17 @@ def plot_scatter(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, yl
     # create figure
     fig = plt.figure()
     ax = fig.add_subplot(1, 1, 1)
-    # scatter plot
-    if len(x) != len(y):
-        raise ValueError('Length of x & y does not match! {0}!={1}'.format(len(x), len(y)))
-    plt.scatter(x, y, marker='o', color=color)
+    return fig, ax
+
+
+def _save_figure(fig, ax, fname, xlabel, ylabel, xlim, ylim):
+    """Set the axes of the figure and save it."""
     # set axis range
-    if xlim:
+    if xlim is not None:
         if len(xlim) != 2:
             raise ValueError('Argument xlim={0} should have a length 2!'.format(len(xlim)))
-    plt.xlim(*xlim)
-    if ylim:
+        plt.xlim(*xlim)
+    if ylim is not None:
         if len(ylim) != 2:
             raise ValueError('Argument ylim={0} should have a length 2!'.format(len(ylim)))
         plt.ylim(*ylim)
@@ -101,3 +228,4 @@ def plot_scatter(x, y, fname, color='b', xlabel=None, ylabel=None, xlim=None, yl
     ax.yaxis.tick_left()
     # save plot ('.png' extension is added by default, if filename is not a supported format)
     plt.savefig(fname, dpi=800)
+    plt.close(fig)
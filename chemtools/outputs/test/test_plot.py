@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+# pragma pylint: disable=protected-access
+"""Test chemtools.outputs.plot."""
+
+
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from contextlib import contextmanager
+from numpy.testing import assert_raises
+from chemtools.outputs import plot
+
+
+@contextmanager
+def tmpdir(name):
+    """Create temporary directory that gets deleted after accessing it."""
+    dn = tempfile.mkdtemp(name)
+    try:
+        yield dn
+    finally:
+        shutil.rmtree(dn)
+
+
+def test_bin_index():
+    x = np.array([0., 0.24, 0.5, 0.99, 1.0, -0.1, 0.5])
+    y = np.array([0., 0.5, 0.76, 1.0, 0.1, 0.5, 1.1])
+    index = plot._bin_index(x, y, 4, (0., 1.), (0., 1.))
+    assert np.all(index == [0, 2, 11, 15, 12, -1, -1])
+
+
+def test_stratified_sample():
+    index = np.array([3, 1, 3, 3, -1, 1, 0, 3, 2])
+    keep = plot._stratified_sample(index, 2)
+    assert np.all(np.diff(keep) > 0)
+    # at most two points of each cell & none outside
+    assert np.all(np.bincount(index[keep]) == [1, 2, 1, 2])
+    assert np.all(plot._stratified_sample(index, 10) == [0, 1, 2, 3, 5, 6, 7, 8])
+
+
+def test_plot_scatter_density():
+    np.random.seed(1)
+    x, y = np.random.randn(2, 20000)
+    with tmpdir('chemtools.outputs.test.test_plot.test_plot_scatter_density') as dn:
+        for name, kwargs in [('scatter.png', {}), ('sample.png', {'per_bin': 2, 'bins': 50})]:
+            fname = os.path.join(dn, name)
+            plot.plot_scatter(x, y, fname, xlim=(-2, 2), ylim=(-2, 2), **kwargs)
+            assert os.path.isfile(fname)
+        fname = os.path.join(dn, 'density.png')
+        plot.plot_density(x, y, fname, color='r', xlabel='x', ylim=(-2, 2), chunk_size=3000)
+        assert os.path.isfile(fname)
+        # check raises
+        assert_raises(ValueError, plot.plot_scatter, x, y[:-1], fname)
+        assert_raises(ValueError, plot.plot_density, x, y[:-1], fname)
+        assert_raises(ValueError, plot.plot_density, x, y, fname, xlim=(1, 2, 3))
+
+
+def test_plot_masked_points():
+    # vacuum points of NCI have a masked reduced density gradient with tiny underlying values
+    dens = np.array([-0.03, 1.e-32, 0.01, -1.e-35, 0.04])
+    rdg = np.ma.masked_where(abs(dens) < 1.e-30, np.array([0.5, 1.e-41, 0.3, 1.e-41, 1.5]))
+    x, y = plot._unmasked_points(dens, rdg)
+    assert np.all(x == [-0.03, 0.01, 0.04])
+    assert np.all(y == [0.5, 0.3, 1.5])
+    x, y = plot._unmasked_points(np.ma.masked_greater(dens, 0.02), rdg)
+    assert np.all(x == [-0.03, 0.01]) and np.all(y == [0.5, 0.3])
+    # masked points are not binned inside the plotted region
+    assert np.all(plot._bin_index(x, y, 10, (-0.05, 0.05), (0., 2.)) >= 0)
+    with tmpdir('chemtools.outputs.test.test_plot.test_plot_masked_points') as dn:
+        for name, kwargs in [('scatter.png', {}), ('sample.png', {'per_bin': 1, 'bins': 10})]:
+            fname = os.path.join(dn, name)
+            plot.plot_scatter(dens, rdg, fname, xlim=(-0.05, 0.05), ylim=(0., 2.), **kwargs)
+            assert os.path.isfile(fname)
+        fname = os.path.join(dn, 'density.png')
+        plot.plot_density(dens, rdg, fname, xlim=(-0.05, 0.05), ylim=(0., 2.), bins=10)
+        assert os.path.isfile(fname)
+        assert_raises(ValueError, plot.plot_scatter, dens, rdg[:-1], fname)
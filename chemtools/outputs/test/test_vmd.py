@@ -456,6 +456,61 @@ def test_print_vmd_script_multiple_cube():
                       isosurfs=[0.6, 0.8], colors=[3, 1060])
 
 
+def test_print_vmd_script_multiple_cube_datasets():
+    def rsurf(iso, n, c):
+        """Generate representation of the surface."""
+        return ('# add representation of the surface\n'
+                'mol representation Isosurface {0} {1} 0 0 1 1\n'.format(iso, n) +
+                'mol color ColorID {0}\n'.format(c) +
+                'mol selection {all}\n'
+                'mol material Opaque\n'
+                'mol addrep top\n'
+                'mol selupdate 1 top 0\n'
+                'mol colupdate 1 top 0\n'
+                'mol scaleminmax top 1 -0.050000 0.050000\n'
+                'mol smoothrep top 1 0\n'
+                'mol drawframes top 1 {now}\n'
+                'color scale method RGB\n'
+                'color Display Background silver\n'
+                '#\n')
+
+    with tmpdir('chemtools.utils.test.test_base.test_vmd_script_multiple_cube_datasets') as dn:
+        fname = '%s/%s' % (dn, 'test.vmd')
+        c1 = '%s/%s' % (dn, 'mo.cube')
+        c2 = '%s/%s' % (dn, 'iso.cube')
+        # cube file with two atoms & three datasets
+        with open(c1, 'w') as f:
+            f.write('title\ncomment\n   -2 0.0 0.0 0.0\n'
+                    '    1 1.0 0.0 0.0\n    1 0.0 1.0 0.0\n    1 0.0 0.0 1.0\n'
+                    '    1 1.0 0.0 0.0 0.0\n    1 1.0 0.0 0.0 1.0\n'
+                    '    3    4    5    6\n 0.1 0.2 0.3\n')
+        open(c2, 'a').close()
+
+        vmd.print_vmd_script_multiple_cube(fname, [c1, c2], isosurfs=0.6)
+        with open(fname, 'r') as content_file:
+            content = content_file.read()
+        assert content.count('mol new {0} type cube'.format(c1)) == 1
+        assert content.count('mol addfile {0} type cube'.format(c2)) == 1
+        assert content.endswith(rsurf('0.60000', '0', '0') + rsurf('0.60000', '1', '1') +
+                                rsurf('0.60000', '2', '2') + rsurf('0.60000', '3', '3'))
+
+        # select datasets of the cube file, which is loaded once
+        vmd.print_vmd_script_multiple_cube(fname, [(c1, 2), c2, (c1, 0)], colors=[3, 4, 5],
+                                           negative=True)
+        with open(fname, 'r') as content_file:
+            content = content_file.read()
+        assert content.count('type cube') == 2
+        assert content.endswith(rsurf('0.50000', '2', '3') + rsurf('-0.50000', '2', '3') +
+                                rsurf('0.50000', '3', '4') + rsurf('-0.50000', '3', '4') +
+                                rsurf('0.50000', '0', '5') + rsurf('-0.50000', '0', '5'))
+
+        # check ValueError:
+        assert_raises(ValueError, vmd.print_vmd_script_multiple_cube, fname, [(c1, 3)])
+        assert_raises(ValueError, vmd.print_vmd_script_multiple_cube, fname, [(c2, 1)])
+        assert_raises(TypeError, vmd.print_vmd_script_multiple_cube, fname, [c1],
+                      isosurfs=[0.6, 0.8])
+
+
 def test_print_vmd_script_vector_field():
     centers = np.array([[1, 2, 3]])
     vecs = np.array([[1, 0, 0]])
@@ -492,3 +547,32 @@ def test_print_vmd_script_vector_field():
                  'draw color 0\n'
                  'draw arrow {1 2 3} {1.0 0.0 0.0} 0.08 0.15 0.7\n'
                  '#\n')
+
+
+def test_print_vmd_script_topology():
+    points = {'blue': [np.array([0., 0., 0.])]}
+    paths = {'black': [np.array([[0., 0., -1.], [0., 0., 0.], [0., 0., 1.]])]}
+    with tmpdir('chemtools.utils.test.test_base.test_print_vmd_script_topology') as dn:
+        fname = '%s/%s' % (dn, 'test')
+        vmd.print_vmd_script_topology(fname, points, radius=0.1, paths=paths)
+        with open(fname + '.vmd', 'r') as content_file:
+            assert content_file.read() == \
+                ('#!/usr/local/bin/vmd\n'
+                 '#\n'
+                 '# Display settings\n'
+                 'display shadow off\n'
+                 'axes location Off\n'
+                 'light 2 on\n'
+                 'light 3 on\n'
+                 'color Display Background white\n'
+                 '#\n'
+                 '# Critical Points\n'
+                 'draw color blue\n'
+                 'draw sphere { 0.000000  0.000000  0.000000} radius 0.100000 resolution 36\n'
+                 '#\n'
+                 '# Gradient Paths\n'
+                 'draw color black\n'
+                 'draw cylinder { 0.000000  0.000000 -1.000000} { 0.000000  0.000000  0.000000} '
+                 'radius 0.050000 resolution 12\n'
+                 'draw cylinder { 0.000000  0.000000  0.000000} { 0.000000  0.000000  1.000000} '
+                 'radius 0.050000 resolution 12\n')
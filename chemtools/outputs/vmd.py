@@ -526,23 +526,53 @@ def print_vmd_script_isosurface(scriptfile, isofile, colorfile=None, isosurf=0.5
         f.write(output)
 
 
+def _cube_num_datasets(fname):
+    """Return the number of datasets stored in a cube file.
+
+    Cube files with several datasets (e.g. molecular orbitals) have a negative number of atoms,
+    and the number of datasets is given on the line following the atoms.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the cube file.
+
+    Returns
+    -------
+    Number of datasets in the cube file. Files without a readable header have one dataset.
+    """
+    with open(fname) as f:
+        lines = [f.readline() for _ in range(3)]
+        try:
+            natom = int(lines[2].split()[0])
+        except (IndexError, ValueError):
+            return 1
+        if natom >= 0:
+            return 1
+        for _ in range(3 - natom):
+            f.readline()
+        return int(f.readline().split()[0])
+
+
 def print_vmd_script_multiple_cube(scriptfile, cubes, isosurfs=None, material='Opaque',
                                    scalemin=-0.05, scalemax=0.05, colors=None,
-                                   representation='CPK'):
+                                   representation='CPK', negative=False):
     """Generate VMD (Visual Molecular Dynamics) script for visualizing multiple cube files.
 
-    Visualize multiple cube files simultaneously where data from each cube file is colored
-    differently.
+    Visualize multiple cube files (or datasets of cube files) simultaneously where data from each
+    dataset is colored differently. Each cube file is loaded once, so the datasets of a cube file
+    with multiple datasets (e.g. molecular orbitals) are all read from that single file.
 
     Parameters
     ----------
     scriptfile : str
         Name of VMD script file to generate.
-    cubes : list of str
-        Names of cube files to plot
+    cubes : list of {str, tuple of (str, int)}
+        Names of cube files to plot. All datasets of a cube file are plotted, unless a tuple of
+        the cube file name and the (zero-based) index of one of its datasets is given.
     isosurfs : float, list of float
         Isovalue at which the plot (iso-surface) is generated
-        If a float is given, then this is the value of iso-surface for all cube files
+        If a float is given, then this is the value of iso-surface for all datasets
         Default value is 0.5 for all iso-surfaces
     material : str
         The material setting of the iso-surface used in VMD script.
@@ -558,52 +588,75 @@ def print_vmd_script_multiple_cube(scriptfile, cubes, isosurfs=None, material='O
         Largest value to color on the iso-surface used in VMD script.
         Default is 0.05
     colors : list of int
-        Colors of each cube file data
+        Colors of each dataset
         Each integer corresponds to a color. See VMD program or manual for details.
-        Default selects random color for each cube file
+        Default selects random color for each dataset
+    representation: str, optional
+        Representation of a molecule.
+    negative : bool, optional
+        Determines if you want to plot the negative of the iso-surfaces as well (with the same
+        colors).
 
     Note
     ----
-    Not quite sure what happens when the number of cube files exceeds 1057 (possiblly the maximum
+    Not quite sure what happens when the number of datasets exceeds 1057 (possiblly the maximum
     number of ColorID's in VMD)
 
     Raises
     ------
     TypeError
         If cube files are not provided as a list or tuple
-        If colors are not provided as a list or tuple of the same length as the cube files
+        If colors are not provided as a list or tuple of the same length as the datasets
     ValueError
         If any of the cube files cannot be found
+        If any of the dataset indices are not available in the cube file
         If any of the colors are not an integer between 0 and 32
     """
     if not isinstance(cubes, (list, tuple)):
         raise TypeError('The cube files must be given as a list or tuple')
-    if not all(os.path.isfile(cube) for cube in cubes):
+    fnames = [cube[0] if isinstance(cube, tuple) else cube for cube in cubes]
+    if not all(os.path.isfile(fname) for fname in fnames):
         raise ValueError('Cannot find at least one of the cube files')
 
+    # load each cube file once & find the volume index of each dataset to plot
+    files, offsets, volumes = [], {}, []
+    for fname, cube in zip(fnames, cubes):
+        if fname not in offsets:
+            offsets[fname] = sum(_cube_num_datasets(item) for item in files)
+            files.append(fname)
+        nset = _cube_num_datasets(fname)
+        datasets = [cube[1]] if isinstance(cube, tuple) else range(nset)
+        if not all(isinstance(i, int) and 0 <= i < nset for i in datasets):
+            raise ValueError('Dataset {0} is not in cube file {1}'.format(cube[1], fname))
+        volumes.extend(offsets[fname] + i for i in datasets)
+
     if isosurfs is None:
-        isosurfs = [0.5 for i in cubes]
+        isosurfs = [0.5 for i in volumes]
     elif isinstance(isosurfs, float):
-        isosurfs = [isosurfs for i in cubes]
-    if not (isinstance(isosurfs, (list, tuple)) and len(isosurfs) == len(cubes)):
+        isosurfs = [isosurfs for i in volumes]
+    if not (isinstance(isosurfs, (list, tuple)) and len(isosurfs) == len(volumes)):
         raise TypeError('The isosurfs must be provided as a list or tuple of same length as the '
-                        'number of cube files')
+                        'number of datasets')
     elif not all(isinstance(isosurf, float) for isosurf in isosurfs):
         raise TypeError('Each iso-surface value must be a float')
 
     if colors is None:
-        colors = range(len(cubes))
-    elif not (isinstance(colors, (list, tuple)) and len(colors) == len(cubes)):
+        colors = range(len(volumes))
+    elif not (isinstance(colors, (list, tuple)) and len(colors) == len(volumes)):
         raise TypeError('The colors must be provided as a list or tuple of the same length as the '
-                        'number of cube files')
+                        'number of datasets')
     elif not all(isinstance(color, int) and 0 <= color < 1057 for color in colors):
         raise ValueError('Each color must be given as an integer between 0 and 1056')
 
     output = _vmd_script_start()
-    output += _vmd_script_molecule(representation, *cubes)
-    for i, (isosurf, color) in enumerate(zip(isosurfs, colors)):
-        output += _vmd_script_isosurface(isosurf=isosurf, index=i, material=material,
+    output += _vmd_script_molecule(representation, *files)
+    for volume, isosurf, color in zip(volumes, isosurfs, colors):
+        output += _vmd_script_isosurface(isosurf=isosurf, index=volume, material=material,
                                          scalemin=scalemin, scalemax=scalemax, colorscheme=color)
+        if negative:
+            output += _vmd_script_isosurface(isosurf=-isosurf, index=volume, material=material,
+                                             scalemin=scalemin, scalemax=scalemax,
+                                             colorscheme=color)
 
     with open(scriptfile, 'w') as f:
         f.write(output)
@@ -634,7 +687,7 @@ def print_vmd_script_vector_field(scriptfile, xyz, vector_centers, vector_direct
         f.write(output)
 
 
-def print_vmd_script_topology(fname, points, radius=0.2):
+def print_vmd_script_topology(fname, points, radius=0.2, paths=None, path_radius=0.05):
     """Generate VMD script for visualizing critical points & gradient path.
 
     Parameters
@@ -645,6 +698,11 @@ def print_vmd_script_topology(fname, points, radius=0.2):
         Dictionary of color (key) and coordinates (values) of critical points.
     radius : float, optional
         Radius of spheres representing the critical points.
+    paths : dict, optional
+        Dictionary of color (key) and sequence of np.ndarray(K, 3) of points (values) of the
+        gradient paths, which are drawn as connected cylinders.
+    path_radius : float, optional
+        Radius of cylinders representing the gradient paths.
 
     """
     output = ('#!/usr/local/bin/vmd\n'
@@ -663,6 +721,15 @@ def print_vmd_script_topology(fname, points, radius=0.2):
             coord = '% .6f % .6f % .6f' % tuple(coord)
             # resolution determines how many polygons are used in the approximation of a sphere
             output += 'draw sphere {%s} radius %f resolution 36\n' % (coord, radius)
+    if paths:
+        output += '#\n# Gradient Paths\n'
+        for color, lines in paths.items():
+            output += 'draw color {}\n'.format(color)
+            for line in lines:
+                line = ['% .6f % .6f % .6f' % tuple(coord) for coord in line]
+                for start, end in zip(line[:-1], line[1:]):
+                    output += 'draw cylinder {%s} {%s} radius %f resolution 12\n' % (
+                        start, end, path_radius)
     # write output
     if not fname.endswith('.vmd'):
         fname += '.vmd'
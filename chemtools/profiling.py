@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Lightweight profiling of the stages of ChemTools pipelines.
+
+When profiling is enabled, the wall time and the increase of the peak memory of the process are
+recorded for each stage (e.g. loading a file, building a grid, each ``compute_*`` call,
+partitioning, eigen-decompositions and cube I/O). Stages are nested, so the report shows where
+the time of each pipeline goes, e.g. ``NCI.from_molecule/Molecule.compute_hessian``. When
+profiling is disabled (default), the instrumentation costs one dictionary lookup per stage.
+
+Examples
+--------
+>>> with Profiling("report.json"):
+...     nci = NCI.from_file("h2o_dimer.fchk")
+
+"""
+
+
+import sys
+import json
+import timeit
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+
+__all__ = ["enable_profiling", "disable_profiling", "is_profiling", "reset_profile",
+           "get_profile_report", "write_profile_report", "profile_stage", "profiled", "count",
+           "Profiling"]
+
+
+_PROFILE = {"enabled": False, "start": None, "stack": [], "stages": OrderedDict(),
+            "counters": OrderedDict()}
+
+
+def enable_profiling(reset=True):
+    """Enable recording the stages of ChemTools pipelines.
+
+    Parameters
+    ----------
+    reset : bool, optional
+        Whether to discard the stages recorded so far.
+
+    """
+    if reset or _PROFILE["start"] is None:
+        reset_profile()
+    _PROFILE["enabled"] = True
+
+
+def disable_profiling():
+    """Disable recording the stages of ChemTools pipelines (the recorded stages are kept)."""
+    _PROFILE["enabled"] = False
+
+
+def is_profiling():
+    """Return True if the stages of ChemTools pipelines are recorded."""
+    return _PROFILE["enabled"]
+
+
+def reset_profile():
+    """Discard the recorded stages & counters."""
+    _PROFILE["start"] = timeit.default_timer()
+    _PROFILE["stack"] = []
+    _PROFILE["stages"] = OrderedDict()
+    _PROFILE["counters"] = OrderedDict()
+
+
+def _peak_memory():
+    """Return the peak resident memory of the process in MB, or None if it is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux, and in bytes on macOS
+    return peak / (1024.**2 if sys.platform == "darwin" else 1024.)
+
+
+@contextmanager
+def profile_stage(name):
+    """Record the wall time & peak memory increase of the enclosed code as a stage.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage. Stages recorded within this stage are named ``name/substage``.
+
+    """
+    if not _PROFILE["enabled"]:
+        yield
+        return
+    _PROFILE["stack"].append(name)
+    path = "/".join(_PROFILE["stack"])
+    memory = _peak_memory()
+    start = timeit.default_timer()
+    try:
+        yield
+    finally:
+        elapsed = timeit.default_timer() - start
+        _PROFILE["stack"].pop()
+        stage = _PROFILE["stages"].setdefault(
+            path, {"calls": 0, "time": 0., "max_time": 0., "peak_memory_increase": None})
+        stage["calls"] += 1
+        stage["time"] += elapsed
+        stage["max_time"] = max(stage["max_time"], elapsed)
+        if memory is not None:
+            increase = _peak_memory() - memory
+            stage["peak_memory_increase"] = max(stage["peak_memory_increase"] or 0., increase)
+
+
+def profiled(name):
+    """Return a decorator recording each call of the decorated function as a stage.
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage, e.g. "Molecule.compute_density".
+
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _PROFILE["enabled"]:
+                return func(*args, **kwargs)
+            with profile_stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name, value=1):
+    """Add the given value to a counter, e.g. the number of points a property is evaluated on.
+
+    Parameters
+    ----------
+    name : str
+        Name of the counter.
+    value : int or float, optional
+        Value added to the counter.
+
+    """
+    if _PROFILE["enabled"]:
+        _PROFILE["counters"][name] = _PROFILE["counters"].get(name, 0) + value
+
+
+def get_profile_report():
+    """Return the recorded stages & counters.
+
+    Returns
+    -------
+    report : dict
+        Dictionary with the following keys:
+
+        - "total_time": wall time (in seconds) since profiling was enabled or reset.
+        - "peak_memory": peak resident memory of the process (in MB), or None if not available.
+        - "stages": dictionary of the stage name and its number of calls, total & maximum wall
+          time (in seconds), and the maximum increase of the peak memory (in MB) during a call.
+        - "counters": dictionary of the counter name and its value.
+
+    """
+    total = None
+    if _PROFILE["start"] is not None:
+        total = timeit.default_timer() - _PROFILE["start"]
+    return OrderedDict([("total_time", total),
+                        ("peak_memory", _peak_memory()),
+                        ("stages", OrderedDict((key, dict(value)) for key, value in
+                                               _PROFILE["stages"].items())),
+                        ("counters", OrderedDict(_PROFILE["counters"]))])
+
+
+def write_profile_report(fname):
+    """Write the recorded stages & counters into a JSON file.
+
+    Parameters
+    ----------
+    fname : str
+        Name of the JSON file. See :func:`get_profile_report` for its content.
+
+    """
+    with open(fname, "w") as f:
+        json.dump(get_profile_report(), f, indent=2)
+        f.write("\n")
+
+
+class Profiling(object):
+    """Context manager for profiling the enclosed ChemTools pipelines."""
+
+    def __init__(self, fname=None):
+        """Initialize.
+
+        Parameters
+        ----------
+        fname : str, optional
+            Name of the JSON file the report is written to on exit. If None, the report is
+            only available from :func:`get_profile_report`.
+
+        """
+        self.fname = fname
+        self._was_enabled = None
+
+    def __enter__(self):
+        """Enable profiling & discard previously recorded stages."""
+        self._was_enabled = is_profiling()
+        enable_profiling()
+        return self
+
+    def __exit__(self, *args):
+        """Write the report & restore the previous state of profiling."""
+        if not self._was_enabled:
+            disable_profiling()
+        if self.fname is not None:
+            write_profile_report(self.fname)
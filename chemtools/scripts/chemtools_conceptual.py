@@ -25,8 +25,6 @@
 """Conceptual Density Functional Theory Script."""
 
 
-from chemtools import print_vmd_script_isosurface
-from chemtools import GlobalConceptualDFT, LocalConceptualDFT, CondensedConceptualDFT
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -150,6 +148,8 @@ def parse_args_condensed(subparser):
 
 def main_conceptual_global(args):
     """Build GlobalConceptualDFT class and print global descriptors."""
+    from chemtools.toolbox.conceptual import GlobalConceptualDFT
+
     # build model & print descriptors
     model = GlobalConceptualDFT.from_file(args.fname, args.model)
     print(model)
@@ -157,6 +157,9 @@ def main_conceptual_global(args):
 
 def main_conceptual_local(args):
     """Build LocalConceptualDFT class and dump a cube file of local descriptor."""
+    from chemtools.toolbox.conceptual import LocalConceptualDFT
+    from chemtools.outputs.vmd import print_vmd_script_isosurface
+
     # load molecule & cubic grid
     mol, cube = load_molecule_and_grid(args.fname, args.cube)
 
@@ -182,6 +185,7 @@ def main_conceptual_local(args):
 
 def main_conceptual_condensed(args):
     """Build LocalConceptualDFT class and dump a cube file of local descriptor."""
+    from chemtools.toolbox.conceptual import CondensedConceptualDFT
 
     # build condensed tool
     model = CondensedConceptualDFT.from_file(args.fname, model=args.model, scheme=args.scheme,
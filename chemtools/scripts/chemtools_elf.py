@@ -25,7 +25,6 @@
 """Electron Localization Function (ELF) Script."""
 
 
-from chemtools.toolbox.interactions import ELF
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -100,6 +99,8 @@ def parse_args_elf(subparser):
 
 def main_elf(args):
     """Build ELF model and dump VMD script and cube files for visualizing ELF."""
+    from chemtools.toolbox.interactions import ELF
+
     # load molecule & cubic grid
     mol, cube = load_molecule_and_grid(args.fname, args.cube)
 
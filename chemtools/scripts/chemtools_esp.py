@@ -25,7 +25,6 @@
 """Electrostatic Potential (ESP) Script."""
 
 
-from chemtools.outputs.vmd import print_vmd_script_isosurface
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -102,6 +101,8 @@ def parse_args_esp(subparser):
 
 def main_esp(args):
     """Generate VMD script and cube files for visualizing ESP on electron density iso-surface."""
+    from chemtools.outputs.vmd import print_vmd_script_isosurface
+
     # load molecule & cubic grid
     mol, cube = load_molecule_and_grid(args.fname, args.cube)
 
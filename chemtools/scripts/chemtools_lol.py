@@ -25,7 +25,6 @@
 """Localized Orbital Locator (LOL) Script."""
 
 
-from chemtools.toolbox.interactions import LOL
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -100,6 +99,8 @@ def parse_args_lol(subparser):
 
 def main_lol(args):
     """Build LOL model and dump VMD script and cube files for visualizing LOL."""
+    from chemtools.toolbox.interactions import LOL
+
     # load molecule & cubic grid
     mol, cube = load_molecule_and_grid(args.fname, args.cube)
 
@@ -27,8 +27,6 @@
 
 import numpy as np
 
-from chemtools.wrappers.molecule import Molecule
-from chemtools.toolbox.motbased import MOTBasedTool
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -38,6 +36,9 @@ Visualize Molecular Orbitals (MO) using VMD package.
 The generated files include:
   output.vmd                 The VMD script.
   output_mo{index}.cube      The MO cube file.
+
+With --single-file, all MOs are written as datasets of output_mo.cube and visualized by
+output_mo.vmd.
 """
 
 
@@ -93,9 +94,26 @@ def parse_args_mot(subparser):
         metavar="",
         help="iso-surface value of MO to visualize. [default=%(default)s]")
 
+    subparser.add_argument(
+        "--single-file",
+        action="store_true",
+        default=False,
+        help="write all orbitals into one cube file with multiple datasets. "
+             "[default=%(default)s]")
+
+    subparser.add_argument(
+        "-n", "--nproc",
+        default=1,
+        type=int,
+        metavar="",
+        help="number of worker processes used for writing cube files. [default=%(default)s]")
+
 
 def main_mot(args):
     """Build MOTBasedTool model and dump VMD script and cube files for visualizing MO."""
+    from chemtools.wrappers.molecule import Molecule
+    from chemtools.toolbox.motbased import MOTBasedTool
+
     if args.info:
         mol = Molecule.from_file(args.fname)
     else:
@@ -142,4 +160,5 @@ def main_mot(args):
     if args.output is None:
         args.output = args.fname.rsplit(".")[0]
     mot.generate_scripts(args.output, spin=args.spin, index=index, grid=cube,
-                         isosurf=args.isosurface)
+                         isosurf=args.isosurface, nproc=args.nproc,
+                         single_file=args.single_file)
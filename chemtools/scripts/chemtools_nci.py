@@ -25,7 +25,6 @@
 """Non-Covalent Interactions (NCI) Script."""
 
 
-from chemtools.toolbox.interactions import NCI
 from chemtools.scripts.common import help_cube, load_molecule_and_grid
 
 
@@ -102,6 +101,14 @@ def parse_args_nci(subparser):
              "disregarding of density value, set this argument to inf or infinity. "
              "[default=%(default)s]")
 
+    subparser.add_argument(
+        "--plot-method",
+        default="scatter",
+        choices=["scatter", "density"],
+        type=str,
+        help="rendering of the plot; density bins the grid points into an image which is much "
+             "faster for large grids. [default=%(default)s]")
+
     subparser.add_argument(
         "--color",
         default="b",
@@ -112,6 +119,8 @@ def parse_args_nci(subparser):
 
 def main_nci(args):
     """Build NCI model and dump VMD script and cube files for visualizing NCI with VMD."""
+    from chemtools.toolbox.interactions import NCI
+
     # load molecule & cubic grid
     mol, cube = load_molecule_and_grid(args.fname, args.cube)
 
@@ -126,4 +135,4 @@ def main_nci(args):
 
     # plot reduced density gradient vs. signed density
     if args.plot:
-        nci.generate_plot(output, color=args.color)
+        nci.generate_plot(output, color=args.color, method=args.plot_method)
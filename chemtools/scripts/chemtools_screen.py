@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+# pragma pylint: disable=invalid-name
+"""Batch Conceptual Density Functional Theory Screening Script."""
+
+
+description_screen = """
+Screen global (and condensed) conceptual density functional theory (DFT) reactivity
+descriptors of many molecules listed in a manifest file.
+
+Each line of the manifest lists either one wave-function file, for which the frontier
+molecular orbital (FMO) approach is invoked, or three wave-function files of the N-1, N
+and N+1 electron systems, for which the finite difference (FD) approach is invoked.
+Lines starting with # are ignored.
+
+The generated files include:
+  output.csv             The table of global descriptors (one row per entry).
+  output-condensed.csv   The table of condensed descriptors (one row per atom).
+
+If output has a .npz extension, the tables are streamed into .ckpt.csv checkpoint files
+and stored as a columnar numpy archive at the end. Re-running the same command resumes an
+interrupted screening by skipping the entries already recorded in the output.
+"""
+
+
+def parse_args_screen(subparser):
+    """Parse command-line arguments for screening conceptual DFT descriptors."""
+    # required arguments
+    subparser.add_argument("model", help="energy model.")
+
+    subparser.add_argument(
+        "manifest",
+        help="manifest file listing one or three wave-function files per line.")
+
+    subparser.add_argument(
+        "output",
+        help="name of output table with .csv or .npz extension.")
+
+    # optional arguments
+    subparser.add_argument(
+        "--props",
+        default="ip,ea,chemical_potential,chemical_hardness,softness,electrophilicity",
+        type=str,
+        metavar="",
+        help="comma-separated global descriptors to record. [default=%(default)s]")
+
+    subparser.add_argument(
+        "--condensed",
+        default=None,
+        type=str,
+        metavar="",
+        help="comma-separated condensed descriptors to record, e.g. "
+             "fukui_function,dual_descriptor. [default=%(default)s]")
+
+    subparser.add_argument(
+        "--approach",
+        type=str,
+        default="FMR",
+        choices=["FMR", "RMF"],
+        help="choose between fragment of molecular response or response of molecular fragment."
+             "[default=%(default)s]")
+
+    subparser.add_argument(
+        "--scheme",
+        type=str,
+        default="h",
+        choices=["h", "hi", "mbis"],
+        help="partitioning scheme. [default=%(default)s]")
+
+    subparser.add_argument(
+        "-n", "--nproc",
+        default=1,
+        type=int,
+        metavar="",
+        help="number of worker processes. [default=%(default)s]")
+
+
+def main_screen(args):
+    """Screen conceptual DFT descriptors of molecules listed in the manifest file."""
+    from chemtools.toolbox.screening import screen_conceptual_dft
+
+    condensed = None
+    if args.condensed is not None:
+        condensed = args.condensed.split(",")
+    table = screen_conceptual_dft(args.manifest, args.output, model=args.model,
+                                  props=args.props.split(","), condensed=condensed,
+                                  approach=args.approach, scheme=args.scheme, nproc=args.nproc)
+    print("Screened {0} entries; results are stored in {1}".format(
+        len(table["entry"]), args.output))
@@ -26,9 +26,6 @@
 
 import numpy as np
 
-from chemtools.wrappers.molecule import Molecule
-from chemtools.utils.cube import UniformGrid
-
 
 help_cube = """
 cubic grid used for evaluation and visualization.
@@ -50,6 +47,9 @@ def load_molecule_and_grid(fname, cube):
        Uniform cubic grid specifications.
 
     """
+    from chemtools.wrappers.molecule import Molecule
+    from chemtools.utils.cube import UniformGrid
+
     # load molecule
     mol = Molecule.from_file(fname)
 
@@ -27,6 +27,7 @@
 import argparse
 
 from chemtools import __version__
+from chemtools.profiling import Profiling, profile_stage
 from chemtools.scripts.chemtools_conceptual import (
     main_conceptual_global,
     main_conceptual_local,
@@ -43,6 +44,7 @@ from chemtools.scripts.chemtools_elf import main_elf, parse_args_elf, descriptio
 from chemtools.scripts.chemtools_lol import main_lol, parse_args_lol, description_lol
 from chemtools.scripts.chemtools_mot import main_mot, parse_args_mot, description_mot
 from chemtools.scripts.chemtools_esp import main_esp, parse_args_esp, description_esp
+from chemtools.scripts.chemtools_screen import main_screen, parse_args_screen, description_screen
 
 from argparse import RawDescriptionHelpFormatter
 
@@ -60,6 +62,7 @@ SCRIPT_MAIN = {
     "gcdft": main_conceptual_global,
     "lcdft": main_conceptual_local,
     "ccdft": main_conceptual_condensed,
+    "screen": main_screen,
 }
 
 
@@ -76,6 +79,14 @@ def parse_args_chemtools():
         version="{} (ChemTools version {})".format(parser.prog, __version__),
     )
 
+    parser.add_argument(
+        "--profile",
+        default=None,
+        metavar="FILE",
+        help="record the wall time & memory of each stage of the command, and write the "
+        "report into the given JSON file.",
+    )
+
     # command parser, stored in parser.command
     subparser = parser.add_subparsers(
         metavar="<Commands>", help="<Functions>", dest="command"
@@ -147,6 +158,14 @@ def parse_args_chemtools():
     )
     parse_args_condensed(parser_c)
 
+    parser_s = subparser.add_parser(
+        "screen",
+        help="Batch Conceptual DFT Screening.",
+        description=description_screen,
+        formatter_class=RawDescriptionHelpFormatter,
+    )
+    parse_args_screen(parser_s)
+
     return parser.parse_args()
 
 
@@ -154,7 +173,11 @@ def main():
     """Entry point function for Chemtools."""
     arg = parse_args_chemtools()  # parse all variables for each functions
     main_fun = SCRIPT_MAIN[arg.command]  # call the main executable function
-    main_fun(arg)  # run the function
+    if arg.profile is None:
+        main_fun(arg)  # run the function
+    else:
+        with Profiling(arg.profile), profile_stage(arg.command):
+            main_fun(arg)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test lazy imports of chemtools package & command-line interface."""
+
+
+import sys
+import types
+import subprocess
+import importlib
+
+import chemtools
+
+
+# packages which make importing chemtools slow, and are only needed by some of its tools
+HEAVY_MODULES = ['horton', 'scipy', 'sympy', 'matplotlib']
+
+CHECK_IMPORT = """
+import sys
+import time
+start = time.time()
+import chemtools.scripts.main
+sys.argv = ['chemtools', '--help']
+try:
+    chemtools.scripts.main.parse_args_chemtools()
+except SystemExit:
+    pass
+sys.stderr.write('%.6f ' % (time.time() - start))
+sys.stderr.write(' '.join(name for name in {0} if name in sys.modules))
+"""
+
+
+def test_import_cli_without_heavy_modules():
+    # import package & build the command-line parser in a fresh interpreter
+    process = subprocess.Popen([sys.executable, '-c', CHECK_IMPORT.format(HEAVY_MODULES)],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    _, output = process.communicate()
+    assert process.returncode == 0, output
+    words = output.decode().split()
+    loaded = words[1:]
+    assert not loaded, 'Importing the command-line interface ({0} s) loaded {1}'.format(
+        words[0], ', '.join(loaded))
+
+
+def test_lazy_attributes():
+    assert chemtools.__version__ == '0.9.0'
+    # subpackage exports are attributes of chemtools
+    for subpackage, names in chemtools._SUBPACKAGE_EXPORTS.items():
+        module = importlib.import_module('chemtools.' + subpackage)
+        public = [name for name in dir(module) if not name.startswith('_') and
+                  not isinstance(getattr(module, name), types.ModuleType)]
+        assert sorted(public) == sorted(names), subpackage
+        for name in names:
+            assert getattr(chemtools, name) is getattr(module, name)
+    assert sorted(chemtools.__all__) == sorted(chemtools._EXPORTS)
+    assert set(chemtools.__all__) <= set(dir(chemtools))
+    # subpackages are attributes of chemtools
+    assert chemtools.orbstools is importlib.import_module('chemtools.orbstools')
+    # unknown attributes
+    for name in ['gibberish', '_gibberish', '__wrapped__']:
+        assert not hasattr(chemtools, name)
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.profiling."""
+
+
+import os
+import json
+import shutil
+import tempfile
+
+import numpy as np
+
+from chemtools import profiling
+from chemtools.orbstools.orthogonalization import eigh
+
+
+@profiling.profiled("square")
+def square(value):
+    """Return the square of the value."""
+    profiling.count("square.calls")
+    with profiling.profile_stage("multiply"):
+        return value * value
+
+
+def test_profiling_disabled():
+    profiling.disable_profiling()
+    profiling.reset_profile()
+    assert not profiling.is_profiling()
+    assert square(3) == 9
+    assert square.__doc__ == "Return the square of the value."
+    report = profiling.get_profile_report()
+    assert report["stages"] == {} and report["counters"] == {}
+
+
+def test_profiling_stages():
+    profiling.enable_profiling()
+    try:
+        assert profiling.is_profiling()
+        with profiling.profile_stage("pipeline"):
+            assert square(2) == 4
+            assert square(3) == 9
+            eigh(np.identity(3))
+        assert square(4) == 16
+    finally:
+        profiling.disable_profiling()
+    report = profiling.get_profile_report()
+    stages = report["stages"]
+    assert list(stages.keys()) == ["pipeline/square/multiply", "pipeline/square",
+                                   "pipeline/orbstools.eigh", "pipeline", "square/multiply",
+                                   "square"]
+    assert stages["pipeline/square"]["calls"] == 2
+    assert stages["square"]["calls"] == 1
+    assert stages["pipeline"]["time"] >= stages["pipeline/square"]["time"] >= 0
+    assert stages["pipeline/square"]["max_time"] <= stages["pipeline/square"]["time"]
+    assert report["counters"] == {"square.calls": 3}
+    assert report["total_time"] >= stages["pipeline"]["time"]
+    # stages are kept when profiling is disabled, and discarded when it is enabled again
+    square(5)
+    assert profiling.get_profile_report()["stages"]["square"]["calls"] == 1
+    profiling.enable_profiling(reset=False)
+    square(5)
+    profiling.disable_profiling()
+    assert profiling.get_profile_report()["stages"]["square"]["calls"] == 2
+
+
+def test_profiling_report_json():
+    dirname = tempfile.mkdtemp("test_profiling_report_json")
+    try:
+        fname = os.path.join(dirname, "report.json")
+        with profiling.Profiling(fname):
+            assert profiling.is_profiling()
+            square(2)
+        assert not profiling.is_profiling()
+        with open(fname) as f:
+            report = json.load(f)
+        assert sorted(report.keys()) == ["counters", "peak_memory", "stages", "total_time"]
+        assert sorted(report["stages"].keys()) == ["square", "square/multiply"]
+        assert report["stages"]["square"]["calls"] == 1
+        assert report["counters"] == {"square.calls": 1}
+    finally:
+        shutil.rmtree(dirname)
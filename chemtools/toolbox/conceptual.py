@@ -34,12 +34,14 @@ from chemtools.wrappers.molecule import Molecule
 from chemtools.wrappers.grid import MolecularGrid
 from chemtools.toolbox.utils import check_arg_molecule, get_matching_attr
 from chemtools.toolbox.utils import get_dict_energy, get_dict_density, get_dict_population
+from chemtools.toolbox.utils import get_dict_density_parallel
 from chemtools.conceptual.linear import LinearGlobalTool, LinearLocalTool, LinearCondensedTool
 from chemtools.conceptual.quadratic import QuadraticGlobalTool, QuadraticLocalTool
 from chemtools.conceptual.quadratic import QuadraticCondensedTool
 from chemtools.conceptual.exponential import ExponentialGlobalTool
 from chemtools.conceptual.rational import RationalGlobalTool
 from chemtools.conceptual.general import GeneralGlobalTool
+from chemtools.profiling import profiled
 try:
     from pathlib2 import Path
 except ImportError:
@@ -214,6 +216,7 @@ class GlobalConceptualDFT(BaseConceptualDFT):
         return content
 
     @classmethod
+    @profiled("GlobalConceptualDFT.from_file")
     def from_file(cls, fname, model):
         r"""
         Initialize class from calculation output file(s).
@@ -230,6 +233,7 @@ class GlobalConceptualDFT(BaseConceptualDFT):
         return cls.from_molecule(molecules, model)
 
     @classmethod
+    @profiled("GlobalConceptualDFT.from_molecule")
     def from_molecule(cls, molecule, model):
         r"""
         Initialize class from `Molecule` object(s).
@@ -313,7 +317,8 @@ class LocalConceptualDFT(BaseConceptualDFT):
         return content
 
     @classmethod
-    def from_file(cls, fname, model, points):
+    @profiled("LocalConceptualDFT.from_file")
+    def from_file(cls, fname, model, points, nproc=1):
         r"""
         Initialize class from calculation output file(s).
 
@@ -328,12 +333,20 @@ class LocalConceptualDFT(BaseConceptualDFT):
         points : np.array
             Coordinates of points on which the local properties are evaluated given as a 2D
             array with 3 columns.
+        nproc : int, optional
+            Number of processes used for loading the molecule files and evaluating their
+            densities concurrently, when more than one file is given.
         """
+        if nproc > 1 and not isinstance(fname, (str, unicode, Path)) and len(fname) > 1:
+            # load molecules & compute their densities in worker processes
+            dict_dens, numbers, coords = get_dict_density_parallel(fname, points, nproc)
+            return cls(dict_dens, model, coords, numbers)
         molecules = cls.load_file(fname)
         return cls.from_molecule(molecules, model, points)
 
     @classmethod
-    def from_molecule(cls, molecule, model, points):
+    @profiled("LocalConceptualDFT.from_molecule")
+    def from_molecule(cls, molecule, model, points, nproc=1):
         r"""
         Initialize class from `Molecule` object(s).
 
@@ -347,6 +360,8 @@ class LocalConceptualDFT(BaseConceptualDFT):
         points : np.array
             Coordinates of points on which the local properties are evaluated given as a 2D
             array with 3 columns.
+        nproc : int, optional
+            Number of processes used for evaluating the densities of molecules concurrently.
         """
         # check molecule
         molecule = check_arg_molecule(molecule)
@@ -356,7 +371,7 @@ class LocalConceptualDFT(BaseConceptualDFT):
         #     points, numbers, coords = grid.points, grid.numbers, grid.centers
         numbers = get_matching_attr(molecule, "numbers", 1.e-8)
         coords = get_matching_attr(molecule, "coordinates", 1.e-4)
-        dict_dens = get_dict_density(molecule, points)
+        dict_dens = get_dict_density(molecule, points, nproc)
         return cls(dict_dens, model, coords, numbers)
 
 
@@ -414,6 +429,7 @@ class CondensedConceptualDFT(BaseConceptualDFT):
         return content
 
     @classmethod
+    @profiled("CondensedConceptualDFT.from_file")
     def from_file(cls, fname, model, approach="FMR", scheme="h", **kwargs):
         r"""
         Initialize class from calculation output file(s).
@@ -438,6 +454,7 @@ class CondensedConceptualDFT(BaseConceptualDFT):
         return cls.from_molecule(molecules, model, approach, scheme, **kwargs)
 
     @classmethod
+    @profiled("CondensedConceptualDFT.from_molecule")
     def from_molecule(cls, molecule, model, approach="FMR", scheme="h", **kwargs):
         r"""
         Initialize class from `Molecule` object(s).
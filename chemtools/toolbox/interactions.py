@@ -30,8 +30,9 @@ from chemtools.wrappers.molecule import Molecule
 from chemtools.denstools.densbased import DensGradTool
 from chemtools.utils.utils import doc_inherit
 from chemtools.utils.cube import UniformGrid
-from chemtools.outputs.plot import plot_scatter
+from chemtools.outputs.plot import plot_scatter, plot_density
 from chemtools.outputs.vmd import print_vmd_script_nci, print_vmd_script_isosurface
+from chemtools.profiling import profiled, profile_stage
 
 from numpy.ma import masked_less
 
@@ -40,7 +41,7 @@ class BaseInteraction(object):
     """Base class for (non)bonding interactions indicators."""
 
     @classmethod
-    def from_file(cls, fname, spin='ab', index=None, grid=None):
+    def from_file(cls, fname, spin='ab', index=None, grid=None, dtype=np.float64):
         """Initialize class using wave-function file.
 
         Parameters
@@ -55,12 +56,14 @@ class BaseInteraction(object):
         grid : instance of `Grid`, optional
             Grid used for calculating and visualizing the property values.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None.
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin=spin, index=index, grid=grid)
+        return cls.from_molecule(molecule, spin=spin, index=index, grid=grid, dtype=dtype)
 
     @classmethod
-    def from_molecule(cls, molecule, spin='ab', index=None, grid=None):
+    def from_molecule(cls, molecule, spin='ab', index=None, grid=None, dtype=np.float64):
         """Initialize class from ``Molecule`` object.
 
         Parameters
@@ -75,18 +78,34 @@ class BaseInteraction(object):
         grid : instance of `Grid`, optional
             Grid used for calculating and visualizing the property values.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+            For a `UniformGrid` with symmetry, only its symmetry-unique points are evaluated
+            when all orbitals are included (index=None).
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None. Properties
+            evaluated on float32 points are converted to float64 before forming the ratios.
         """
         pass
 
     @staticmethod
-    def _check_grid(molecule, grid):
+    def _check_grid(molecule, grid, dtype=np.float64):
         if grid is None:
-            grid = UniformGrid.from_molecule(molecule, spacing=0.1, extension=2.0)
+            grid = UniformGrid.from_molecule(molecule, spacing=0.1, extension=2.0, dtype=dtype)
         elif not hasattr(grid, 'points'):
             raise ValueError('Argument grid should have "points" attribute!')
 
         return grid
 
+    @staticmethod
+    def _unique_points(grid, index):
+        """Return the points to evaluate properties on & the function expanding their values.
+
+        Only the symmetry-unique points of a `UniformGrid` are evaluated when all orbitals are
+        included, because the density of a subset of orbitals is not totally-symmetric.
+        """
+        if index is None and isinstance(grid, UniformGrid):
+            return grid.unique_points, grid.expand
+        return grid.points, lambda values, rank=0: values
+
     @staticmethod
     def _transform(ratio, trans, trans_k, trans_a):
         if trans == 'rational':
@@ -133,7 +152,8 @@ class NCI(BaseInteraction):
                                  "({1}, 3, 3) shape!".format(hessian.shape, len(grid.points)))
 
             # compute hessian eigenvalues on cubic grid
-            eigvalues = np.linalg.eigvalsh(hessian, UPLO='U')
+            with profile_stage('NCI.eigvalsh'):
+                eigvalues = np.linalg.eigvalsh(hessian, UPLO='U')
 
             # use sign of second eigenvalue to distinguish interaction types
             sdens = np.sign(eigvalues[:, 1]) * density
@@ -150,14 +170,18 @@ class NCI(BaseInteraction):
         self._grid = grid
 
     @classmethod
+    @profiled('NCI.from_molecule')
     @doc_inherit(BaseInteraction, 'from_molecule')
-    def from_molecule(cls, molecule, spin='ab', index=None, grid=None):
+    def from_molecule(cls, molecule, spin='ab', index=None, grid=None, dtype=np.float64):
         # generate or check cubic grid
-        grid = BaseInteraction._check_grid(molecule, grid)
-        # compute density, gradient & hessian on cubic grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        hess = molecule.compute_hessian(grid.points, spin=spin, index=index)
+        grid = BaseInteraction._check_grid(molecule, grid, dtype)
+        # compute density, gradient & hessian on (symmetry-unique points of) cubic grid
+        points, expand = BaseInteraction._unique_points(grid, index)
+        dens = expand(molecule.compute_density(points, spin=spin, index=index))
+        grad = expand(molecule.compute_gradient(points, spin=spin, index=index), rank=1)
+        hess = expand(molecule.compute_hessian(points, spin=spin, index=index), rank=2)
+        # reduced gradient & hessian eigenvalues are computed in float64 (also for float32 grid)
+        dens, grad, hess = [np.asarray(arr, dtype=np.float64) for arr in [dens, grad, hess]]
         # compute reduced gradient
         rdgrad = DensGradTool(dens, grad).reduced_density_gradient
         return cls(dens, rdgrad, grid, hessian=hess)
@@ -177,7 +201,8 @@ class NCI(BaseInteraction):
         r"""Eigenvalues of Hessian."""
         return self._eigvalues
 
-    def generate_plot(self, fname, color='b', denslim=(-0.2, 0.2), rdglim=(0., 2.)):
+    def generate_plot(self, fname, color='b', denslim=(-0.2, 0.2), rdglim=(0., 2.),
+                      method='scatter', bins=400, per_bin=None):
         r"""Plot reduced density gradient.
 
         Reduced density gradient vs.
@@ -195,15 +220,35 @@ class NCI(BaseInteraction):
             The minimum and maximum of the (signed) density in the plot.
         rdglim: tuple, optional
             The minimum and maximum of the reduced density gradient in the plot.
+        method : str, optional
+            How the grid points are rendered. Options:
+
+                - 'scatter' plots each grid point (or a subsample of them, see `per_bin`).
+                - 'density' plots the number of grid points in `bins` x `bins` cells within
+                  `denslim` and `rdglim` as an image, which renders in a time independent of
+                  the number of grid points.
+
+        bins : int, optional
+            Number of cells along each axis used for binning the grid points.
+        per_bin : int, optional
+            If given, the scatter plot only includes (at most) `per_bin` randomly chosen grid
+            points of each cell. Only used with the 'scatter' method.
 
         """
-        # scatter plot
         kwargs = {'color': color,
                   'xlim': denslim,
                   'ylim': rdglim,
                   'xlabel': r'sgn$\mathbf{(\lambda_2)}$ $\times$ $\mathbf{\rho(r)}$ (a.u)',
-                  'ylabel': 'Reduced Density Gradient'}
-        plot_scatter(self._signed_density, self._rdgrad, fname, **kwargs)
+                  'ylabel': 'Reduced Density Gradient',
+                  'bins': bins}
+        if method == 'scatter':
+            # scatter plot
+            plot_scatter(self._signed_density, self._rdgrad, fname, per_bin=per_bin, **kwargs)
+        elif method == 'density':
+            # density-binned plot
+            plot_density(self._signed_density, self._rdgrad, fname, **kwargs)
+        else:
+            raise ValueError('Argument method={0} is not known.'.format(method))
 
     def generate_scripts(self, fname, isosurf=0.50, denscut=0.05):
         r"""Generate cube files and VMD script to visualize non-covalent interactions (NCI).
@@ -321,6 +366,8 @@ class ELF(BaseInteraction):
             raise ValueError('Argument trans_k should be positive! trans_k={0}'.format(trans_k))
         if not trans_a > 0:
             raise ValueError('Argument trans_a should be positive! trans_a={0}'.format(trans_a))
+        # ratio of kinetic energy densities is computed in float64 (also for float32 grid)
+        dens, grad, ked = [np.asarray(arr, dtype=np.float64) for arr in [dens, grad, ked]]
         self._grid = grid
         self._denstool = DensGradTool(dens, grad)
         # compute elf ratio
@@ -331,8 +378,9 @@ class ELF(BaseInteraction):
         self._value[self._denstool.density < denscut] = 0.
 
     @classmethod
+    @profiled('ELF.from_molecule')
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='rational',
-                      trans_k=2, trans_a=1, denscut=0.0005):
+                      trans_k=2, trans_a=1, denscut=0.0005, dtype=np.float64):
         """Initialize class from molecule.
 
         Parameters
@@ -346,6 +394,8 @@ class ELF(BaseInteraction):
         grid : instance of `Grid`, optional
             Grid used for computation of ELF. Only if this a CubeGrid one can generate the scripts.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+            For a `UniformGrid` with symmetry, only its symmetry-unique points are evaluated
+            when all orbitals are included (index=None).
         trans : str, optional
             Type of transformation applied to ELF ratio; options are 'rational' or 'hyperbolic'.
         trans_k : float, optional
@@ -354,19 +404,22 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None.
 
         """
         # generate cubic grid or check grid
-        grid = BaseInteraction._check_grid(molecule, grid)
-        # compute density, gradient & kinetic energy density on grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        kin = molecule.compute_ked(grid.points, spin=spin, index=index)
+        grid = BaseInteraction._check_grid(molecule, grid, dtype)
+        # compute density, gradient & kinetic energy density on (symmetry-unique points of) grid
+        points, expand = BaseInteraction._unique_points(grid, index)
+        dens = expand(molecule.compute_density(points, spin=spin, index=index))
+        grad = expand(molecule.compute_gradient(points, spin=spin, index=index), rank=1)
+        kin = expand(molecule.compute_ked(points, spin=spin, index=index))
         return cls(dens, grad, kin, grid, trans, trans_k, trans_a, denscut)
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='rational',
-                  trans_k=2, trans_a=1, denscut=0.0005):
+                  trans_k=2, trans_a=1, denscut=0.0005, dtype=np.float64):
         """Initialize class from wave-function file.
 
         Parameters
@@ -380,6 +433,8 @@ class ELF(BaseInteraction):
         grid : instance of `Grid`, optional
             Grid used for computation of ELF. Only if this a CubeGrid one can generate the scripts.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+            For a `UniformGrid` with symmetry, only its symmetry-unique points are evaluated
+            when all orbitals are included (index=None).
         trans : str, optional
             Type of transformation applied to ELF ratio; options are 'rational' or 'hyperbolic'.
         trans_k : float, optional
@@ -388,10 +443,13 @@ class ELF(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. ELF value of points with density < denscut is set to zero.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None.
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 dtype)
 
     @property
     def ratio(self):
@@ -493,6 +551,8 @@ class LOL(BaseInteraction):
             raise ValueError('Argument trans_k should be positive! trans_k={0}'.format(trans_k))
         if not trans_a > 0:
             raise ValueError('Argument trans_a should be positive! trans_a={0}'.format(trans_a))
+        # ratio of kinetic energy densities is computed in float64 (also for float32 grid)
+        dens, grad, ked = [np.asarray(arr, dtype=np.float64) for arr in [dens, grad, ked]]
         self._denstool = DensGradTool(dens, grad)
         self._grid = grid
         # compute elf ratio
@@ -502,8 +562,9 @@ class LOL(BaseInteraction):
         self._value[self._denstool.density < denscut] = 0
 
     @classmethod
+    @profiled('LOL.from_molecule')
     def from_molecule(cls, molecule, spin='ab', index=None, grid=None, trans='inverse_rational',
-                      trans_k=1, trans_a=1, denscut=0.0005):
+                      trans_k=1, trans_a=1, denscut=0.0005, dtype=np.float64):
         """Initialize class from molecule.
 
         Parameters
@@ -517,6 +578,8 @@ class LOL(BaseInteraction):
         grid : instance of `Grid`, optional
             Grid used for computation of LOL. Only if this a CubeGrid one can generate the scripts.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+            For a `UniformGrid` with symmetry, only its symmetry-unique points are evaluated
+            when all orbitals are included (index=None).
         trans : str, optional
             Type of transformation applied to ELF ratio; options are 'inverse_rational' or
             'inverse_hyperbolic'.
@@ -526,19 +589,22 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None.
 
         """
         # generate cubic grid or check grid
-        grid = BaseInteraction._check_grid(molecule, grid)
-        # compute density, gradient & kinetic energy density on grid
-        dens = molecule.compute_density(grid.points, spin=spin, index=index)
-        grad = molecule.compute_gradient(grid.points, spin=spin, index=index)
-        ked = molecule.compute_ked(grid.points, spin=spin, index=index)
+        grid = BaseInteraction._check_grid(molecule, grid, dtype)
+        # compute density, gradient & kinetic energy density on (symmetry-unique points of) grid
+        points, expand = BaseInteraction._unique_points(grid, index)
+        dens = expand(molecule.compute_density(points, spin=spin, index=index))
+        grad = expand(molecule.compute_gradient(points, spin=spin, index=index), rank=1)
+        ked = expand(molecule.compute_ked(points, spin=spin, index=index))
         return cls(dens, grad, ked, grid, trans, trans_k, trans_a, denscut)
 
     @classmethod
     def from_file(cls, fname, spin='ab', index=None, grid=None, trans='inverse_rational',
-                  trans_k=1, trans_a=1, denscut=0.0005):
+                  trans_k=1, trans_a=1, denscut=0.0005, dtype=np.float64):
         """Initialize class from wave-function file.
 
         Parameters
@@ -552,6 +618,8 @@ class LOL(BaseInteraction):
         grid : instance of `Grid`, optional
             Grid used for computation of LOL. Only if this a CubeGrid one can generate the scripts.
             If None, a cubic grid is constructed from molecule with spacing=0.1 & extension=2.0.
+            For a `UniformGrid` with symmetry, only its symmetry-unique points are evaluated
+            when all orbitals are included (index=None).
         trans : str, optional
             Type of transformation applied to LOL ratio; options are 'inverse_rational' or
             'inverse_hyperbolic'.
@@ -561,10 +629,13 @@ class LOL(BaseInteraction):
             Parameter :math:`a` of transformation.
         denscut : float, optional
             Value of density cut. LOL value of points with density < denscut is set to zero.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the points of the cubic grid constructed when grid is None.
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut)
+        return cls.from_molecule(molecule, spin, index, grid, trans, trans_k, trans_a, denscut,
+                                 dtype)
 
     @property
     def ratio(self):
@@ -24,10 +24,15 @@
 """Orbital-Based Local Tools."""
 
 
+import multiprocessing
+import numpy as np
+
+from multiprocessing.sharedctypes import RawArray
 from chemtools.utils.utils import doc_inherit
 from chemtools.utils.cube import UniformGrid
 from chemtools.orbstools.mulliken import mulliken_populations, lowdin_populations
-from chemtools.outputs.vmd import print_vmd_script_isosurface
+from chemtools.orbstools.bondorder import mayer_bond_orders, wiberg_bond_orders
+from chemtools.outputs.vmd import print_vmd_script_isosurface, print_vmd_script_multiple_cube
 from chemtools.wrappers.molecule import Molecule, MolecularOrbitals
 
 
@@ -162,59 +167,210 @@ class MOTBasedTool(object):
                 coeff_ab_mo_beta, occupations_beta, olp_ab_ab, num_atoms, ab_atom_indices
             )
         elif scheme == "lowdin":
+            # symmetric orthogonalization is computed from the cached overlap eigendecomposition
+            coeff_ab_oab = self._molecule.ao.compute_overlap_power(-0.5)
             pop = lowdin_populations(
-                coeff_ab_mo_alpha, occupations_alpha, olp_ab_ab, num_atoms, ab_atom_indices
+                coeff_ab_mo_alpha,
+                occupations_alpha,
+                olp_ab_ab,
+                num_atoms,
+                ab_atom_indices,
+                coeff_ab_oab=coeff_ab_oab,
             )
             pop += lowdin_populations(
-                coeff_ab_mo_beta, occupations_beta, olp_ab_ab, num_atoms, ab_atom_indices
+                coeff_ab_mo_beta,
+                occupations_beta,
+                olp_ab_ab,
+                num_atoms,
+                ab_atom_indices,
+                coeff_ab_oab=coeff_ab_oab,
             )
         else:
             raise ValueError("`scheme` must be one of 'mulliken' or 'lowdin'.")
 
         return atomic_charges - pop
 
-    def generate_scripts(self, fname, spin='a', index=None, isosurf=0.05, grid=None):
+    def compute_bond_orders(self, scheme="mayer"):
+        """Return the bond orders between each pair of atoms using the given scheme.
+
+        Parameters
+        ----------
+        scheme : {"mayer", "wiberg"}
+            Type of bond order analysis. The Wiberg bond orders are computed in the symmetrically
+            orthogonalized (Lowdin) atomic orbitals.
+            Default is Mayer bond order analysis.
+
+        Returns
+        -------
+        bond_orders : np.ndarray(N, N)
+            Symmetric matrix of bond orders between each pair of atoms (with zero diagonal).
+
+        """
+        coeff_ab_mo_alpha, coeff_ab_mo_beta = self._molecule.mo.coefficient
+        occupations_alpha, occupations_beta = self._molecule.mo.occupation
+        olp_ab_ab = self._molecule.ao.compute_overlap()
+        num_atoms = len(self._molecule.numbers)
+        ab_atom_indices = self._molecule._ind_basis_center
+
+        if scheme == "mayer":
+            bond_orders = mayer_bond_orders(
+                coeff_ab_mo_alpha, occupations_alpha, olp_ab_ab, num_atoms, ab_atom_indices
+            )
+            bond_orders += mayer_bond_orders(
+                coeff_ab_mo_beta, occupations_beta, olp_ab_ab, num_atoms, ab_atom_indices
+            )
+        elif scheme == "wiberg":
+            olp_ab_ab_sqrt = self._molecule.ao.compute_overlap_power(0.5)
+            bond_orders = wiberg_bond_orders(
+                coeff_ab_mo_alpha,
+                occupations_alpha,
+                olp_ab_ab,
+                num_atoms,
+                ab_atom_indices,
+                olp_ab_ab_sqrt=olp_ab_ab_sqrt,
+            )
+            bond_orders += wiberg_bond_orders(
+                coeff_ab_mo_beta,
+                occupations_beta,
+                olp_ab_ab,
+                num_atoms,
+                ab_atom_indices,
+                olp_ab_ab_sqrt=olp_ab_ab_sqrt,
+            )
+        else:
+            raise ValueError("`scheme` must be one of 'mayer' or 'wiberg'.")
+
+        return bond_orders
+
+    def generate_scripts(self, fname, spin='a', index=None, isosurf=0.05, grid=None,
+                         chunk_size=5000, nproc=1, single_file=False, dtype=np.float64,
+                         batch_size=16):
         """Generate VMD script(s) and cube file(s) to visualize MO iso-surface of given orbitals.
 
+        The orbitals are evaluated and written in batches of at most `batch_size` orbitals, so
+        only the values of one batch are stored. In each pass over the grid points, all orbitals
+        of the batch are evaluated together for each chunk of grid points, so the basis functions
+        are computed once per chunk and contracted with the coefficients of the batch only. With
+        `single_file`, all orbitals are evaluated in one pass, because their values are
+        interleaved in the cube file.
+
         Parameters
         ----------
         fname : str
             A string representing the path to a fname of generated files.
             The VMD script and cube file will be named fname_mo{index}.vmd and
-            fname_mo{index}.cube, respectively.
+            fname_mo{index}.cube, respectively (or fname_mo.vmd and fname_mo.cube, if
+            `single_file` is True).
         spin : str, optional
            The type of occupied spin orbitals. Choose either 'a' or 'b'.
-        index : int, optional
-           Integer representing the index of spin orbital to visualize. Spin orbitals are each
-           indexed from 1 to :attr:`nbasis`. If None, files for visualizing all orbitals are
-           generated.
+        index : int or sequence of int, optional
+           Integer(s) representing the index of spin orbital(s) to visualize. Spin orbitals are
+           each indexed from 1 to :attr:`nbasis`. If None, files for visualizing all occupied
+           orbitals are generated.
         isosurf : float, optional
             Value of MO iso-surface used in VMD script.
         grid : UniformGrid, optional
            Instance of UniformGrid used for computation and generating cube file(s).
            If None, a cubic grid is constructed from molecule with spacing=0.2 & extension=5.0.
+        chunk_size : int, optional
+           Number of grid points for which the orbitals are evaluated at once.
+        nproc : int, optional
+           Number of worker processes used for writing the cube files.
+        single_file : bool, optional
+           If True, all orbitals are written as datasets of one cube file, which is visualized
+           by one VMD script.
+        dtype : {np.float64, np.float32}, optional
+           Data type of the points of the cubic grid constructed when grid is None.
+        batch_size : int, optional
+           Maximum number of orbitals evaluated & written in one pass over the grid points.
 
         """
         if spin not in ['a', 'b']:
             raise ValueError('Argument spin can only be "a" or "b".')
-        if index is not None and not isinstance(index, int):
-            raise ValueError('Argument index is either None or an integer for visualization. '
-                             'Given index={0}'.format(index))
+        if isinstance(index, int):
+            index = [index]
+        if index is not None and not (hasattr(index, '__iter__')
+                                      and all(isinstance(item, int) for item in index)):
+            raise ValueError('Argument index is either None, an integer or a sequence of integers '
+                             'for visualization. Given index={0}'.format(index))
         if grid is None:
-            grid = UniformGrid.from_molecule(self._molecule, spacing=0.2, extension=5.0, rotate=True)
+            grid = UniformGrid.from_molecule(self._molecule, spacing=0.2, extension=5.0,
+                                             rotate=True, dtype=dtype)
         elif not isinstance(grid, UniformGrid):
             raise ValueError('Argument grid should be a UniformGrid to generate cube files.')
-
+        if not isinstance(nproc, int) or nproc < 1:
+            raise ValueError('Argument nproc should be a positive integer! '
+                             'Given nproc={0}'.format(nproc))
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError('Argument batch_size should be a positive integer! '
+                             'Given batch_size={0}'.format(batch_size))
+
+        spin_index = {'a': 0, 'b': 1}
         if index is None:
-            spin_index = {'a': 0, 'b': 1}
             index = range(1, self.homo_index[spin_index[spin]] + 1)
+        index = list(index)
+        if any(item < 1 for item in index):
+            raise ValueError('Argument index={0} cannot be less than one!'.format(index))
+
+        npoint = grid.points.shape[0]
+        if single_file:
+            values = np.empty((len(index), npoint))
+            self._compute_orbital_values(grid, spin, index, chunk_size, values)
+            cubname = fname + '_mo.cube'
+            grid.generate_cube(cubname, values.T, labels=index)
+            print_vmd_script_multiple_cube(fname + '_mo.vmd', [cubname], isosurfs=float(isosurf),
+                                           material='BlownGlass', negative=True)
+            return
+
+        # values of one batch of orbitals are shared with the processes writing the cube files
+        nbatch = min(batch_size, len(index))
+        shared_values = RawArray('d', nbatch * npoint)
+        values = np.frombuffer(shared_values, dtype=float).reshape(nbatch, npoint)
+        pool = None
+        if nproc == 1 or len(index) == 1:
+            _init_worker_cube(grid, shared_values, npoint)
         else:
-            index = [index]
-
-        for mo_index in index:
-            vmdname = fname + '_mo{0}.vmd'.format(mo_index)
-            cubname = fname + '_mo{0}.cube'.format(mo_index)
-            mo_value = self.compute_orbital_expression(grid.points, spin=spin, index=mo_index)
-            grid.generate_cube(cubname, mo_value)
-            print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, negative=True,
-                                        material='BlownGlass')
+            pool = multiprocessing.Pool(min(nproc, nbatch), _init_worker_cube,
+                                        (grid, shared_values, npoint))
+        try:
+            for start in range(0, len(index), nbatch):
+                batch = index[start:start + nbatch]
+                self._compute_orbital_values(grid, spin, batch, chunk_size, values[:len(batch)])
+                # write cube files & VMD scripts of the batch
+                args = [(fname, mo_index, isosurf) for mo_index in batch]
+                if pool is None:
+                    for item in enumerate(args):
+                        _write_cube_worker(item)
+                else:
+                    pool.map(_write_cube_worker, enumerate(args))
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+            _WORKER_STATE.clear()
+
+    def _compute_orbital_values(self, grid, spin, index, chunk_size, values):
+        """Store the given orbitals on the grid points in the values array, a chunk at a time."""
+        for start in range(0, grid.points.shape[0], chunk_size):
+            chunk = slice(start, start + chunk_size)
+            values[:, chunk] = self.compute_orbital_expression(grid.points[chunk], spin, index).T
+
+
+# state of worker processes used in MOTBasedTool.generate_scripts
+_WORKER_STATE = {}
+
+
+def _init_worker_cube(grid, shared_values, npoint):
+    """Store the grid & orbital values in the global state of a worker process."""
+    _WORKER_STATE["grid"] = grid
+    _WORKER_STATE["values"] = np.frombuffer(shared_values, dtype=float).reshape(-1, npoint)
+
+
+def _write_cube_worker(item):
+    """Write the cube file & VMD script of one orbital."""
+    column, (fname, mo_index, isosurf) = item
+    vmdname = fname + '_mo{0}.vmd'.format(mo_index)
+    cubname = fname + '_mo{0}.cube'.format(mo_index)
+    _WORKER_STATE["grid"].generate_cube(cubname, _WORKER_STATE["values"][column])
+    print_vmd_script_isosurface(vmdname, cubname, isosurf=isosurf, negative=True,
+                                material='BlownGlass')
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+# pragma pylint: disable=broad-except
+"""Batch Screening of Conceptual DFT Descriptors over Libraries of Molecules.
+
+This module evaluates global (and optionally condensed) conceptual DFT reactivity descriptors
+for many wave-function files listed in a manifest. Each manifest entry is either one file
+(frontier molecular orbital approach) or three files (finite difference approach with the
+:math:`N-1`, :math:`N` and :math:`N+1` electron systems). Entries are evaluated in a process
+pool and the results are streamed into CSV tables, which also serve as a checkpoint for
+resuming an interrupted screening.
+"""
+
+
+import os
+import csv
+import json
+import logging
+import multiprocessing
+
+import numpy as np
+
+from chemtools.toolbox.conceptual import BaseConceptualDFT
+from chemtools.toolbox.conceptual import GlobalConceptualDFT, CondensedConceptualDFT
+
+
+__all__ = ["load_manifest", "screen_conceptual_dft"]
+
+
+# prefix of the first line of the global table storing the settings of the screening
+_SETTINGS_PREFIX = "# settings: "
+
+
+def load_manifest(fname):
+    """Return the sequence of entries listed in a manifest file.
+
+    Every non-empty line of the manifest specifies one entry, given as either one wave-function
+    file (FMO approach) or three wave-function files (FD approach) separated by whitespace.
+    Everything following a `#` character is treated as a comment. Relative paths are resolved
+    with respect to the directory of the manifest file.
+
+    Parameters
+    ----------
+    fname : str
+        Path to the manifest file.
+
+    Returns
+    -------
+    entries : list of tuple of str
+        Sequence of entries, each given as a tuple of one or three paths.
+
+    """
+    dirname = os.path.dirname(os.path.abspath(str(fname)))
+    entries = []
+    with open(str(fname)) as f:
+        for nline, line in enumerate(f):
+            words = line.split("#")[0].split()
+            if not words:
+                continue
+            if len(words) not in [1, 3]:
+                raise ValueError("Line {0} of manifest {1} should list either 1 or 3 files! "
+                                 "Given {2} files.".format(nline + 1, fname, len(words)))
+            entries.append(tuple(os.path.join(dirname, word) for word in words))
+    return entries
+
+
+def screen_conceptual_dft(manifest, output, model="quadratic", props=None, condensed=None,
+                          approach="FMR", scheme="h", nproc=1):
+    r"""Evaluate conceptual DFT descriptors of many molecules & stream them into a table.
+
+    Global descriptors are written as one row per entry into a CSV table, and condensed
+    descriptors (if requested) are written as one row per atom into a second CSV table named
+    `{root}-condensed.csv`. Rows are flushed as soon as each entry is evaluated, so the tables
+    double as a checkpoint: when the screening is run again with the same output, entries which
+    already appear in the table are skipped. Entries that fail are logged and left out of the
+    table, so they are retried on the next run. The settings of the screening (model, props,
+    condensed, approach & scheme) are stored in the first line of the global table, which starts
+    with "#", and a screening is only resumed with the same settings.
+
+    Parameters
+    ----------
+    manifest : str or sequence of sequence of str
+        Path to a manifest file (see :func:`load_manifest`), or a sequence of entries each
+        given as a sequence of one or three paths to wave-function files.
+    output : str
+        Path to the output table with either `.csv` or `.npz` extension. For `.npz` output, the
+        results are streamed into `{root}.ckpt.csv` and `{root}-condensed.ckpt.csv` checkpoint
+        tables which are converted into a columnar `.npz` archive once all entries are done.
+    model : str, optional
+        Energy model used to calculate the reactivity descriptors.
+    props : sequence of str, optional
+        Name of global descriptors to record. If None, the ionization potential, electron
+        affinity, chemical potential, chemical hardness, softness and electrophilicity are used.
+    condensed : sequence of str, optional
+        Name of condensed descriptors to record, e.g. ["fukui_function", "dual_descriptor"].
+        If None, condensed descriptors are not computed.
+    approach : str, optional
+        Choose between "FMR" (fragment of molecular response) or "RMF"
+        (response of molecular fragment) for condensing.
+    scheme : str, optional
+        Partitioning scheme used for condensing. Options: "h", "hi", "mbis".
+    nproc : int, optional
+        Number of worker processes. If 1, the entries are evaluated in the current process.
+
+    Returns
+    -------
+    table : dict
+        Dictionary of column names (keys) and arrays of values (values) of the output table(s).
+        The "entry" column identifies each entry by its file names joined with ";". Columns of
+        the condensed table are prefixed with "atom_" or "condensed_".
+
+    Raises
+    ------
+    ValueError
+        If the existing output table was written with different settings.
+
+    """
+    if props is None:
+        props = ["ip", "ea", "chemical_potential", "chemical_hardness", "softness",
+                 "electrophilicity"]
+    props, condensed = list(props), list(condensed or [])
+    if not isinstance(nproc, int) or nproc < 1:
+        raise ValueError("Argument nproc should be a positive integer! "
+                         "Given nproc={0}".format(nproc))
+    # get entries & name of tables
+    if isinstance(manifest, str):
+        manifest = load_manifest(manifest)
+    entries = [tuple(str(fname) for fname in entry) for entry in manifest]
+    fname_glob, fname_cond = _get_table_names(output)
+
+    # check settings of checkpoint, so entries are not mixed with results of other settings
+    settings = {"model": model, "props": props, "condensed": condensed, "approach": approach,
+                "scheme": scheme}
+    if os.path.isfile(fname_glob):
+        stored = _read_settings(fname_glob)
+        if stored != settings:
+            raise ValueError("Checkpoint {0} was written with settings {1}, which differ from the "
+                             "given settings {2}! Remove it or choose another output to start "
+                             "over.".format(fname_glob, stored, settings))
+
+    # read checkpoint & discard condensed rows of entries which were not completed
+    done = set(_read_table(fname_glob).get("entry", []))
+    if condensed:
+        rows = _read_rows(fname_cond)
+        _write_rows(fname_cond, ["entry", "index", "number"] + condensed,
+                    [row for row in rows if row[0] in done], mode="w")
+    if not os.path.isfile(fname_glob):
+        with open(fname_glob, "w") as f:
+            f.write(_SETTINGS_PREFIX + json.dumps(settings, sort_keys=True) + "\n")
+        _write_rows(fname_glob, ["entry", "nfiles"] + props, [], mode="a")
+
+    # evaluate remaining entries
+    tasks = [(";".join(entry), entry, model, props, condensed, approach, scheme)
+             for entry in entries if ";".join(entry) not in done]
+    logging.info("Screening    : {0} entries ({1} done)".format(len(entries), len(done)))
+    if nproc == 1 or len(tasks) <= 1:
+        results = (_screen_entry(task) for task in tasks)
+        _stream_results(results, fname_glob, fname_cond)
+    else:
+        pool = multiprocessing.Pool(nproc)
+        try:
+            _stream_results(pool.imap_unordered(_screen_entry, tasks), fname_glob, fname_cond)
+        finally:
+            pool.close()
+            pool.join()
+
+    # gather results
+    table = _read_table(fname_glob)
+    if condensed:
+        table.update(dict(("atom_" + key if key in ["entry", "index", "number"]
+                           else "condensed_" + key, value)
+                          for key, value in _read_table(fname_cond).items()))
+    if output.endswith(".npz"):
+        np.savez(output, **table)
+    return table
+
+
+def _get_table_names(output):
+    """Return names of the global & condensed CSV tables corresponding to output."""
+    if output.endswith(".csv"):
+        root = output[:-4]
+        return output, root + "-condensed.csv"
+    elif output.endswith(".npz"):
+        root = output[:-4]
+        return root + ".ckpt.csv", root + "-condensed.ckpt.csv"
+    raise ValueError("Argument output should have either .csv or .npz extension! "
+                     "Given output={0}".format(output))
+
+
+def _screen_entry(task):
+    """Return the global & condensed descriptors of one entry; used by worker processes."""
+    key, fnames, model, props, condensed, approach, scheme = task
+    try:
+        molecule = BaseConceptualDFT.load_file(list(fnames))
+        tool = GlobalConceptualDFT.from_molecule(molecule, model)
+        row_glob = [key, len(fnames)] + [_get_value(tool, prop) for prop in props]
+        rows_cond = []
+        if condensed:
+            tool = CondensedConceptualDFT.from_molecule(molecule, model, approach, scheme)
+            values = [np.asarray(_get_value(tool, prop)) for prop in condensed]
+            for index, number in enumerate(tool.numbers):
+                rows_cond.append([key, index, number] + [value[index] for value in values])
+    except Exception as error:
+        return key, None, None, "{0}: {1}".format(error.__class__.__name__, error)
+    return key, row_glob, rows_cond, None
+
+
+def _get_value(tool, prop):
+    """Return the value of a descriptor with None replaced by nan."""
+    value = getattr(tool, prop)
+    if callable(value):
+        raise ValueError("Descriptor {0} is a method, not an attribute!".format(prop))
+    if value is None:
+        return np.nan
+    return value
+
+
+def _stream_results(results, fname_glob, fname_cond):
+    """Append results to the tables as soon as they become available."""
+    for key, row_glob, rows_cond, error in results:
+        if error is not None:
+            logging.warning("Screening of {0} failed; {1}".format(key, error))
+            continue
+        # condensed rows are written first, because global rows mark completed entries
+        if rows_cond:
+            _write_rows(fname_cond, None, rows_cond, mode="a")
+        _write_rows(fname_glob, None, [row_glob], mode="a")
+        logging.info("Screened     : {0}".format(key))
+
+
+def _write_rows(fname, header, rows, mode="a"):
+    """Write header (if given) & rows into a CSV table."""
+    with open(fname, mode) as f:
+        writer = csv.writer(f)
+        if header is not None:
+            writer.writerow(header)
+        for row in rows:
+            writer.writerow([repr(float(item)) if isinstance(item, (float, np.floating))
+                             else item for item in row])
+
+
+def _read_settings(fname):
+    """Return the settings stored in the first line of a CSV table, or None if not stored."""
+    with open(fname) as f:
+        line = f.readline()
+    if not line.startswith(_SETTINGS_PREFIX):
+        return None
+    return json.loads(line[len(_SETTINGS_PREFIX):])
+
+
+def _read_rows(fname):
+    """Return rows of a CSV table excluding its header (and settings)."""
+    if not os.path.isfile(fname):
+        return []
+    with open(fname) as f:
+        rows = list(csv.reader(line for line in f if not line.startswith("#")))
+    return rows[1:]
+
+
+def _read_table(fname):
+    """Return dictionary of column names & arrays of a CSV table."""
+    if not os.path.isfile(fname):
+        return {}
+    with open(fname) as f:
+        rows = list(csv.reader(line for line in f if not line.startswith("#")))
+    table = {}
+    for index, column in enumerate(rows[0]):
+        values = [row[index] for row in rows[1:]]
+        if column == "entry":
+            table[column] = np.array(values, dtype=str)
+        elif column in ["nfiles", "index", "number"]:
+            table[column] = np.array(values, dtype=int)
+        else:
+            table[column] = np.array(values, dtype=float)
+    return table
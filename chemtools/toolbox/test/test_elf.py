@@ -26,6 +26,8 @@
 import numpy as np
 from numpy.testing import assert_allclose, assert_raises
 from chemtools.toolbox.interactions import ELF, LOL
+from chemtools.wrappers.molecule import Molecule
+from chemtools.utils.cube import UniformGrid
 try:
     from importlib_resources import path
 except ImportError:
@@ -66,3 +68,28 @@ def test_lol_h2o_nuclei():
     assert_raises(ValueError, LOL, dens, grad, ked, trans_k=0)
     assert_raises(ValueError, LOL, dens, grad, ked, trans_a=0)
     assert_raises(ValueError, LOL, dens, grad, ked, trans='rational')
+
+
+def test_elf_lol_symmetry_h2o():
+    with path('chemtools.data', 'water_b3lyp_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+    grid = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0)
+    cube = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0, symmetry=True)
+    assert len(cube.operations) == 4
+    # only symmetry-unique points are evaluated
+    for tool in [ELF, LOL]:
+        expected = tool.from_molecule(mol, grid=grid)
+        result = tool.from_molecule(mol, grid=cube)
+        assert_allclose(result.value, expected.value, rtol=1.e-4, atol=1.e-4)
+
+
+def test_elf_lol_float32_h2o():
+    with path('chemtools.data', 'water_b3lyp_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+    for tool in [ELF, LOL]:
+        expected = tool.from_molecule(mol)
+        result = tool.from_molecule(mol, dtype=np.float32)
+        assert result._grid.dtype == np.float32
+        # ratio of kinetic energy densities is formed in float64
+        assert result.value.dtype == np.float64
+        assert_allclose(result.value, expected.value, rtol=0., atol=1.e-5)
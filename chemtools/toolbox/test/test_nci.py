@@ -190,3 +190,36 @@ def test_nci_assert_errors():
         test = '%s/%s' % (dn, 'test.png')
         desp.generate_plot(test)
         assert os.path.isfile(test) and os.access(test, os.R_OK)
+        test = '%s/%s' % (dn, 'test-density.png')
+        desp.generate_plot(test, method='density', bins=100)
+        assert os.path.isfile(test) and os.access(test, os.R_OK)
+        test = '%s/%s' % (dn, 'test-sample.png')
+        desp.generate_plot(test, per_bin=5, bins=100)
+        assert os.path.isfile(test) and os.access(test, os.R_OK)
+        assert_raises(ValueError, desp.generate_plot, test, method='hexbin')
+
+
+def test_nci_symmetry_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as file_path:
+        mol = Molecule.from_file(file_path)
+    grid = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0)
+    cube = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0, symmetry=True)
+    # Cs dimer, i.e. about half of the grid points are evaluated
+    assert len(cube.operations) == 2
+    assert 1.8 * len(cube.unique_points) < cube.npoints
+    expected = NCI.from_molecule(mol, grid=grid)
+    result = NCI.from_molecule(mol, grid=cube)
+    assert_almost_equal(result.signed_density, expected.signed_density, decimal=8)
+    assert_almost_equal(result.eigvalues, expected.eigvalues, decimal=6)
+    assert_almost_equal(result._rdgrad, expected._rdgrad, decimal=6)
+
+
+def test_nci_float32_h2o_dimer():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as file_path:
+        expected = NCI.from_file(file_path)
+        result = NCI.from_file(file_path, dtype=np.float32)
+    assert result._grid.dtype == np.float32
+    # reduced density gradient & hessian eigenvalues are computed in float64
+    assert result._rdgrad.dtype == np.float64 and result.signed_density.dtype == np.float64
+    assert np.allclose(result.signed_density, expected.signed_density, rtol=1.e-5, atol=0.)
+    assert np.allclose(result._rdgrad, expected._rdgrad, rtol=1.e-5, atol=0.)
@@ -4,7 +4,12 @@ try:
 except ImportError:
     from importlib.resources import path
 
+import os
+import shutil
+import tempfile
+
 from chemtools.toolbox.motbased import MOTBasedTool
+from chemtools.utils.cube import UniformGrid
 import numpy as np
 from numpy.testing import assert_raises
 
@@ -33,3 +38,61 @@ def test_compute_populations():
         atol=1e-6,
     )
     assert_raises(ValueError, mot.compute_charges, "bad type")
+
+
+def test_compute_bond_orders():
+    """Test MOTBasedTool.compute_bond_orders for H2O UB3LYP/aug-cc-pVDZ."""
+    with path("chemtools.data.examples", "h2o.fchk") as fname:
+        mot = MOTBasedTool.from_file(str(fname))
+    for scheme in ["mayer", "wiberg"]:
+        bond_orders = mot.compute_bond_orders(scheme)
+        assert bond_orders.shape == (3, 3)
+        assert np.allclose(bond_orders, bond_orders.T)
+        assert np.allclose(np.diag(bond_orders), 0)
+        # O-H bonds are equivalent single bonds & H-H are not bonded
+        assert abs(bond_orders[0, 1] - bond_orders[0, 2]) < 1e-4
+        assert 0.6 < bond_orders[0, 1] < 1.2
+        assert abs(bond_orders[1, 2]) < 0.1
+    assert_raises(ValueError, mot.compute_bond_orders, "bad type")
+
+
+def test_generate_scripts():
+    """Test MOTBasedTool.generate_scripts against orbitals evaluated one at a time."""
+    with path("chemtools.data.examples", "h2o.fchk") as fname:
+        mot = MOTBasedTool.from_file(str(fname))
+    grid = UniformGrid.from_molecule(mot._molecule, spacing=0.5, extension=2.0)
+    dirname = tempfile.mkdtemp("test_generate_scripts")
+    try:
+        prefix = os.path.join(dirname, "h2o")
+        mot.generate_scripts(prefix, spin="b", index=[1, 5], grid=grid, chunk_size=100, nproc=2)
+        for index in [1, 5]:
+            assert os.path.isfile(prefix + "_mo{0}.vmd".format(index))
+            with open(prefix + "_mo{0}.cube".format(index)) as cube:
+                lines = cube.readlines()[6 + len(grid.numbers):]
+            values = np.array(" ".join(lines).split(), dtype=float)
+            expected = mot.compute_orbital_expression(grid.points, spin="b", index=index)
+            assert np.allclose(values, expected.ravel(), rtol=1e-4, atol=1e-9)
+        assert not os.path.isfile(prefix + "_mo2.cube")
+        # orbitals evaluated & written in batches smaller than the number of orbitals
+        for nproc in [1, 2]:
+            prefix = os.path.join(dirname, "batch{0}".format(nproc))
+            mot.generate_scripts(prefix, spin="b", index=[1, 3, 5], grid=grid, chunk_size=100,
+                                 nproc=nproc, batch_size=2)
+            for index in [1, 3, 5]:
+                values, _ = UniformGrid.read_cube_data(prefix + "_mo{0}.cube".format(index))
+                expected = mot.compute_orbital_expression(grid.points, spin="b", index=index)
+                assert np.allclose(values.ravel(), expected.ravel(), rtol=1e-4, atol=1e-9)
+        # all orbitals in one cube file
+        mot.generate_scripts(prefix, spin="b", index=[1, 5], grid=grid, single_file=True)
+        assert os.path.isfile(prefix + "_mo.vmd")
+        values, labels = UniformGrid.read_cube_data(prefix + "_mo.cube")
+        assert np.all(labels == [1, 5])
+        expected = mot.compute_orbital_expression(grid.points, spin="b", index=[1, 5])
+        assert np.allclose(values, expected, rtol=1e-4, atol=1e-9)
+    finally:
+        shutil.rmtree(dirname)
+    assert_raises(ValueError, mot.generate_scripts, "h2o", spin="ab")
+    assert_raises(ValueError, mot.generate_scripts, "h2o", index=1.0)
+    assert_raises(ValueError, mot.generate_scripts, "h2o", index=[0, 1], grid=grid)
+    assert_raises(ValueError, mot.generate_scripts, "h2o", grid=grid, nproc=0)
+    assert_raises(ValueError, mot.generate_scripts, "h2o", grid=grid, batch_size=0)
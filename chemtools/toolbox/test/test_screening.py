@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.toolbox.screening."""
+
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from numpy.testing import assert_raises, assert_almost_equal, assert_equal
+
+from chemtools.toolbox.conceptual import GlobalConceptualDFT, CondensedConceptualDFT
+from chemtools.toolbox.screening import load_manifest, screen_conceptual_dft
+try:
+    from importlib_resources import path
+except ImportError:
+    from importlib.resources import path
+
+
+def test_load_manifest():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        fname = os.path.join(tmpdir, "manifest.txt")
+        with open(fname, "w") as f:
+            f.write("# comment line\n\na.fchk\nb.fchk  c.fchk d.fchk  # triplet\n")
+        entries = load_manifest(fname)
+        assert_equal(len(entries), 2)
+        assert_equal(entries[0], (os.path.join(tmpdir, "a.fchk"),))
+        assert_equal([os.path.basename(item) for item in entries[1]],
+                     ["b.fchk", "c.fchk", "d.fchk"])
+        # check invalid number of files
+        with open(fname, "w") as f:
+            f.write("a.fchk b.fchk\n")
+        assert_raises(ValueError, load_manifest, fname)
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_screen_conceptual_dft_raises():
+    assert_raises(ValueError, screen_conceptual_dft, [], "output.txt")
+    assert_raises(ValueError, screen_conceptual_dft, [], "output.csv", nproc=0)
+
+
+def test_screen_conceptual_dft_settings():
+    tmpdir = tempfile.mkdtemp()
+    try:
+        output = os.path.join(tmpdir, "screen.csv")
+        table = screen_conceptual_dft([], output, "quadratic", props=["ip", "ea"])
+        assert_equal(len(table["entry"]), 0)
+        # resume with the same settings
+        table = screen_conceptual_dft([], output, "quadratic", props=("ip", "ea"))
+        assert_equal(sorted(table.keys()), ["ea", "entry", "ip", "nfiles"])
+        # resuming with different settings is refused
+        assert_raises(ValueError, screen_conceptual_dft, [], output, "linear", props=["ip", "ea"])
+        assert_raises(ValueError, screen_conceptual_dft, [], output, "quadratic", props=["ip"])
+        assert_raises(ValueError, screen_conceptual_dft, [], output, "quadratic",
+                      props=["ip", "ea"], condensed=["ff_plus"])
+        assert_raises(ValueError, screen_conceptual_dft, [], output, "quadratic",
+                      props=["ip", "ea"], scheme="mbis")
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+def test_screen_conceptual_dft_h2o():
+    with path("chemtools.data", "h2o_q+0_ub3lyp_ccpvtz.fchk") as fname0:
+        with path("chemtools.data", "h2o_q+1_ub3lyp_ccpvtz.fchk") as fname1:
+            with path("chemtools.data", "h2o_q-1_ub3lyp_ccpvtz.fchk") as fname2:
+                entries = [[str(fname0)], [str(fname0), str(fname1), str(fname2)]]
+                expected = [GlobalConceptualDFT.from_file(entry, "quadratic")
+                            for entry in entries]
+                fmo = CondensedConceptualDFT.from_file(entries[0], "linear")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        output = os.path.join(tmpdir, "screen.csv")
+        # screen the first entry, then resume with both entries
+        table = screen_conceptual_dft(entries[:1], output, "quadratic", props=["ip", "ea"])
+        assert_equal(len(table["entry"]), 1)
+        table = screen_conceptual_dft(entries, output, "quadratic", props=["ip", "ea"], nproc=2)
+        assert_equal(len(table["entry"]), 2)
+        assert_equal(table["nfiles"], [1, 3])
+        assert_almost_equal(table["ip"], [glob.ip for glob in expected], decimal=8)
+        assert_almost_equal(table["ea"], [glob.ea for glob in expected], decimal=8)
+        # resuming with a different model is refused
+        assert_raises(ValueError, screen_conceptual_dft, entries, output, "linear",
+                      props=["ip", "ea"])
+        # check npz output with condensed descriptors
+        output = os.path.join(tmpdir, "screen.npz")
+        screen_conceptual_dft(entries[:1], output, "linear", props=["ip"], condensed=["ff_plus"])
+        table = np.load(output)
+        assert_equal(table["atom_number"], [8, 1, 1])
+        assert_almost_equal(table["condensed_ff_plus"], fmo.ff_plus, decimal=6)
+    finally:
+        shutil.rmtree(tmpdir)
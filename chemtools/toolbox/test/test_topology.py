@@ -23,9 +23,13 @@
 """Test chemtools.toolbox.topology."""
 
 
+import os
+import shutil
+import tempfile
 import numpy as np
+from numpy.testing import assert_raises
 
-from chemtools.toolbox.topology import TopologicalTool
+from chemtools.toolbox.topology import TopologicalTool, _local_extrema
 from chemtools.wrappers.molecule import Molecule
 from chemtools.utils.cube import UniformGrid
 
@@ -166,3 +170,89 @@ def test_critical_point_c4h4():
     # check total number of CP
     assert len(top.cps) == 23
     assert top.poincare_hopf_equation
+
+
+def test_bond_paths_h2o():
+    with path("chemtools.data", "h2o_q+0_ub3lyp_ccpvtz.fchk") as fpath:
+        mol = Molecule.from_file(fpath)
+    cub = UniformGrid.from_molecule(mol, spacing=0.15, extension=0.1, rotate=False)
+    top = TopologicalTool.from_molecule(mol, points=cub.points)
+    connectivity = top.find_bond_paths()
+    assert connectivity.shape == (2, 2)
+    assert len(top.bond_paths) == 2
+    # index of the nuclear attractor of each atom
+    atoms = [np.argmin([np.linalg.norm(nna.coordinate - coord) for nna in top.nna])
+             for coord in mol.coordinates]
+    # both bond paths connect oxygen to one of the hydrogen atoms
+    bonds = sorted([sorted(pair) for pair in connectivity.tolist()])
+    assert bonds == sorted([sorted([atoms[0], atoms[1]]), sorted([atoms[0], atoms[2]])])
+    for bond_path, pair in zip(top.bond_paths, connectivity):
+        assert np.allclose(bond_path[0], top.nna[pair[0]].coordinate)
+        assert np.allclose(bond_path[-1], top.nna[pair[1]].coordinate)
+
+
+def test_local_extrema():
+    values = np.zeros((4, 5, 6))
+    values[1, 2, 3] = 1.
+    values[3, 0, 5] = 2.
+    values[2, 3, 1] = -1.
+    is_max, is_min = _local_extrema(values)
+    assert is_max[1, 2, 3] and not is_min[1, 2, 3]
+    assert is_max[3, 0, 5] and not is_min[3, 0, 5]
+    assert is_min[2, 3, 1] and not is_max[2, 3, 1]
+    # neighbours of the maximum are not maxima
+    assert not is_max[1, 2, 2] and not is_max[2, 1, 4]
+    # points of flat regions are both maxima & minima
+    assert is_max[0, 4, 0] and is_min[0, 4, 0]
+
+
+def test_critical_point_from_cube_gaussians():
+    centers = np.array([[0., 0., -1.3], [0., 0., 1.3], [1.4, 0.6, 0.]])
+
+    def func(points):
+        dist = points[:, np.newaxis, :] - centers
+        return np.sum(np.exp(-2 * np.sum(dist**2, axis=-1)), axis=-1)
+
+    shape = np.array([50, 50, 60])
+    axes = np.identity(3) * 0.12
+    grid = UniformGrid(np.array([1, 1, 1]), np.array([1., 1., 1.]), centers,
+                       -0.5 * np.dot(shape, axes), axes, shape)
+    dn = tempfile.mkdtemp('chemtools.toolbox.test.test_topology')
+    try:
+        fname = os.path.join(dn, 'gauss.cube')
+        grid.generate_cube(fname, func(grid.points))
+        top = TopologicalTool.from_cube(fname)
+        grid.generate_cube(fname, np.array([func(grid.points)] * 2).T)
+        assert_raises(ValueError, TopologicalTool.from_cube, fname)
+    finally:
+        shutil.rmtree(dn)
+    # nuclear attractors are (close to) the gaussian centers
+    assert len(top.nna) == 3
+    for nna in top.nna:
+        assert np.min(np.linalg.norm(centers - nna.coordinate, axis=-1)) < 1.e-3
+    # bonds between the third gaussian & each of the others
+    assert len(top.bcp) == 2
+    assert len(top.rcp) == 0
+    assert len(top.ccp) == 0
+    assert top.poincare_hopf_equation
+
+
+def test_critical_point_from_cube_h2o():
+    with path("chemtools.data", "h2o_q+0_ub3lyp_ccpvtz.fchk") as fpath:
+        mol = Molecule.from_file(fpath)
+    cub = UniformGrid.from_molecule(mol, spacing=0.1, extension=2.0, rotate=False)
+    dn = tempfile.mkdtemp('chemtools.toolbox.test.test_topology')
+    try:
+        fname = os.path.join(dn, 'h2o.cube')
+        cub.generate_cube(fname, mol.compute_density(cub.points))
+        top = TopologicalTool.from_cube(fname)
+    finally:
+        shutil.rmtree(dn)
+    ref = TopologicalTool.from_molecule(mol, points=cub.points[::5])
+    assert len(top.nna) == 3
+    assert len(top.bcp) == 2
+    # critical points of the interpolated density are close to the ones of the wave-function
+    for cps, cps_ref in [(top.nna, ref.nna), (top.bcp, ref.bcp)]:
+        for cp in cps:
+            dist = [np.linalg.norm(cp.coordinate - cp_ref.coordinate) for cp_ref in cps_ref]
+            assert np.min(dist) < 0.05
@@ -24,12 +24,15 @@
 
 import numpy as np
 
-from numpy.testing import assert_raises
+from numpy.testing import assert_raises, assert_almost_equal
 
 from chemtools import UniformGrid
 from chemtools.wrappers.molecule import Molecule
+from chemtools.wrappers.grid import MolecularGrid
 from chemtools.toolbox.utils import get_matching_attr, get_molecular_grid
 from chemtools.toolbox.utils import get_dict_energy, get_dict_density, get_dict_population
+from chemtools.toolbox.utils import get_dict_density_parallel, compute_fmo_density
+from chemtools.toolbox.utils import get_homo_lumo_data
 try:
     from importlib_resources import path
 except ImportError:
@@ -153,3 +156,68 @@ def test_get_dict_population_raises():
                             Molecule.from_file(file2),
                             Molecule.from_file(file3),]
     assert_raises(ValueError, get_dict_population, molecule, "rmf", "gibberish")
+
+
+def test_get_dict_density_parallel_h2o():
+    points = np.array([[0., 0., 0.], [0.5, 0.2, -0.1], [1.0, -1.0, 2.0], [-2.0, 0.3, 0.1]])
+    with path('chemtools.data', 'h2o_q+0_ub3lyp_ccpvtz.fchk') as file1:
+        with path('chemtools.data', 'h2o_q+1_ub3lyp_ccpvtz.fchk') as file2:
+            with path('chemtools.data', 'h2o_q-1_ub3lyp_ccpvtz.fchk') as file3:
+                fnames = [file1, file2, file3]
+                molecule = [Molecule.from_file(fname) for fname in fnames]
+                # densities evaluated by loading the files in worker processes
+                dict_file, numbers, coords = get_dict_density_parallel(fnames, points, 2)
+    # densities evaluated from molecules sequentially & concurrently
+    dict_seq = get_dict_density(molecule, points)
+    dict_par = get_dict_density(molecule, points, nproc=3)
+    assert sorted(dict_seq.keys()) == sorted(dict_par.keys()) == sorted(dict_file.keys())
+    for nelec, dens in dict_seq.items():
+        assert_almost_equal(dict_par[nelec], dens, decimal=10)
+        assert_almost_equal(dict_file[nelec], dens, decimal=10)
+    assert_almost_equal(numbers, molecule[0].numbers, decimal=10)
+    assert_almost_equal(coords, molecule[0].coordinates, decimal=10)
+    # check repeated molecules & invalid nproc
+    assert_raises(ValueError, get_dict_density_parallel, [molecule[0]] * 2, points)
+    assert_raises(ValueError, get_dict_density_parallel, molecule, points, 0)
+    assert_raises(ValueError, get_dict_density_parallel, molecule, points[0])
+
+
+def check_compute_fmo_density(molecule, points):
+    """Check fused FMO densities against separately evaluated densities."""
+    spin_to_index = {"a": 0, "b": 1}
+    _, _, homo_s, lumo_s = get_homo_lumo_data(molecule)
+    homo_i = molecule.mo.homo_index[spin_to_index[homo_s]]
+    lumo_i = molecule.mo.lumo_index[spin_to_index[lumo_s]]
+    # use a small chunk size to check evaluation over several chunks
+    dens, homo_dens, lumo_dens = compute_fmo_density(molecule, points, chunk_size=3)
+    assert_almost_equal(dens, molecule.compute_density(points, "ab", None), decimal=8)
+    assert_almost_equal(homo_dens, molecule.compute_density(points, homo_s, homo_i), decimal=8)
+    assert_almost_equal(lumo_dens, molecule.compute_density(points, lumo_s, lumo_i), decimal=8)
+
+
+def test_compute_fmo_density():
+    points = np.array([[0., 0., 0.], [0.5, 0.2, -0.1], [1.0, -1.0, 2.0], [-2.0, 0.3, 0.1],
+                       [0.1, 1.2, -0.4], [-0.7, -0.5, 0.9], [2.5, 0.1, 0.2]])
+    for fname in ["h2o_q+0_ub3lyp_ccpvtz.fchk", "ch4_rhf_ccpvdz.fchk", "o2_uhf_virtual.fchk"]:
+        with path('chemtools.data', fname) as fname:
+            molecule = Molecule.from_file(fname)
+        check_compute_fmo_density(molecule, points)
+    # check invalid points
+    assert_raises(ValueError, compute_fmo_density, molecule, points[0])
+
+
+def test_get_dict_population_rmf_parallel_h2o():
+    with path('chemtools.data', 'h2o_q+0_ub3lyp_ccpvtz.fchk') as file1:
+        with path('chemtools.data', 'h2o_q+1_ub3lyp_ccpvtz.fchk') as file2:
+            with path('chemtools.data', 'h2o_q-1_ub3lyp_ccpvtz.fchk') as file3:
+                molecule = [Molecule.from_file(file1), Molecule.from_file(file2),
+                            Molecule.from_file(file3)]
+    grid = MolecularGrid.from_molecule(molecule[0], 'exp:1e-5:25:80:110')
+    for scheme in ["h", "mbis"]:
+        dict_seq = get_dict_population(molecule, "rmf", scheme, grid=grid)
+        dict_par = get_dict_population(molecule, "rmf", scheme, nproc=2, grid=grid)
+        assert sorted(dict_seq.keys()) == sorted(dict_par.keys()) == [9, 10, 11]
+        for nelec, pops in dict_seq.items():
+            assert_almost_equal(dict_par[nelec], pops, decimal=6)
+            assert_almost_equal(np.sum(pops), nelec, decimal=1)
+    assert_raises(ValueError, get_dict_population, molecule, "rmf", "h", nproc=0, grid=grid)
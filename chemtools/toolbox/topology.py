@@ -28,14 +28,36 @@ import numpy as np
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.utils.cube import UniformGrid
+from chemtools.utils.interpolation import UniformGridInterpolator
 from chemtools.topology.critical import Topology
 from chemtools.outputs.vmd import print_vmd_script_topology
+from chemtools.profiling import profiled
+
+
+def _local_extrema(values):
+    """Return masks of the local maxima & minima of a 3D array (among the 26 neighbours).
+
+    Points on the boundary of the array are compared only to the neighbours inside the array.
+
+    """
+    shape = values.shape
+    is_max = np.ones(shape, dtype=bool)
+    is_min = np.ones(shape, dtype=bool)
+    padded_max = np.pad(values, 1, mode="constant", constant_values=-np.inf)
+    padded_min = np.pad(values, 1, mode="constant", constant_values=np.inf)
+    for offset in np.ndindex(3, 3, 3):
+        if offset == (1, 1, 1):
+            continue
+        window = tuple(slice(start, start + size) for start, size in zip(offset, shape))
+        is_max &= values >= padded_max[window]
+        is_min &= values <= padded_min[window]
+    return is_max, is_min
 
 
 class TopologicalTool(Topology):
     """Topological analysis of scalar functions."""
 
-    def __init__(self, func_dens, func_grad, func_hess, points, coordinates=None):
+    def __init__(self, func_dens, func_grad, func_hess, points, coordinates=None, nproc=1):
         """Initialize class for topological analysis of arbitrary scalar function.
 
         Parameters
@@ -50,6 +72,9 @@ class TopologicalTool(Topology):
             Cartesian coordinates of points used for critical point search.
         coordinates : np.ndarray, optional
             Cartesian coordinates of atoms. If given, they are added for critical point search.
+        nproc : int, optional
+            Number of processes used for refining the critical points; see
+            `Topology.find_critical_points`.
 
         """
         if points.ndim != 2 and points.shape[1] != 3:
@@ -57,10 +82,11 @@ class TopologicalTool(Topology):
         if coordinates.ndim != 2 and coordinates.shape[1] != 3:
             raise ValueError("Argument coordinates should be a 2D-array with 3 columns.")
         super(TopologicalTool, self).__init__(func_dens, func_grad, func_hess, points, coordinates)
-        self.find_critical_points()
+        self.find_critical_points(nproc=nproc)
 
     @classmethod
-    def from_molecule(cls, molecule, spin="ab", index=None, points=None):
+    @profiled("TopologicalTool.from_molecule")
+    def from_molecule(cls, molecule, spin="ab", index=None, points=None, nproc=1):
         """Initialize class from `Molecule` object for topological analysis of electron density.
 
         Parameters
@@ -75,6 +101,9 @@ class TopologicalTool(Topology):
         points : np.ndarray, optional
             Cartesian coordinates of points used for critical point search.
             If None, cubic grid points with spacing=0.1 & extension=0.1 are used.
+        nproc : int, optional
+            Number of processes used for refining the critical points; see
+            `Topology.find_critical_points`.
 
         """
         if points is None:
@@ -82,10 +111,10 @@ class TopologicalTool(Topology):
         func_dens = cls._wrapper_compute_density(molecule, spin=spin, index=index)
         func_grad = cls._wrapper_compute_gradient(molecule, spin=spin, index=index)
         func_hess = cls._wrapper_compute_hessian(molecule, spin=spin, index=index)
-        return cls(func_dens, func_grad, func_hess, points, molecule.coordinates)
+        return cls(func_dens, func_grad, func_hess, points, molecule.coordinates, nproc)
 
     @classmethod
-    def from_file(cls, fname, spin="ab", index=None, points=None):
+    def from_file(cls, fname, spin="ab", index=None, points=None, nproc=1):
         """Initialize class from wave-function file for topological analysis of electron density.
 
         Parameters
@@ -100,12 +129,63 @@ class TopologicalTool(Topology):
         points : np.ndarray, optional
             Cartesian coordinates of points used for critical point search.
             If None, cubic grid points with spacing=0.1 & extension=0.1 are used.
+        nproc : int, optional
+            Number of processes used for refining the critical points; see
+            `Topology.find_critical_points`.
 
         """
         molecule = Molecule.from_file(fname)
-        return cls.from_molecule(molecule, spin=spin, index=index, points=points)
+        return cls.from_molecule(molecule, spin=spin, index=index, points=points, nproc=nproc)
+
+    @classmethod
+    @profiled("TopologicalTool.from_cube")
+    def from_cube(cls, fname, threshold=1.e-5, nproc=1):
+        r"""Initialize class from a cube file for topological analysis of its (interpolated) data.
+
+        The function, gradient & hessian are evaluated with cubic B-spline interpolation of the
+        cube data (see `UniformGridInterpolator`), so no wave-function is needed. The seeds of
+        the critical point search are the grid points which are local maxima or minima of the
+        data or of its gradient norm (i.e. candidates for all types of critical points) among
+        their 26 neighbours, and the atomic coordinates given in the cube file.
 
-    def generate_scripts(self, fname, radius=0.2):
+        Parameters
+        ----------
+        fname : str
+            Cube file name with \*.cube extension containing one dataset.
+        threshold : float, optional
+            Grid points at which the absolute value of the data is below the threshold (e.g.
+            vacuum) are not used as seeds.
+        nproc : int, optional
+            Number of processes used for refining the critical points; see
+            `Topology.find_critical_points`.
+
+        """
+        grid = UniformGrid.from_cube(fname)
+        data, labels = UniformGrid.read_cube_data(fname)
+        if labels is not None:
+            raise ValueError("Cube file {0} contains more than one dataset.".format(fname))
+        interpolator = UniformGridInterpolator(grid, data)
+        seeds = grid.points[cls._cube_seeds(grid, data, threshold)]
+        # seeds are already candidates, so they are passed (only) as coordinates to be refined
+        # like the atomic coordinates, i.e. without comparing their gradient norm to that of the
+        # surrounding polyhedron vertices
+        return cls(interpolator.compute_value, interpolator.compute_gradient,
+                   interpolator.compute_hessian, np.zeros((0, 3)),
+                   np.vstack((grid.coordinates, seeds)), nproc)
+
+    @staticmethod
+    def _cube_seeds(grid, data, threshold):
+        """Return the mask of cubic grid points used as seeds of the critical point search."""
+        values = data.reshape(tuple(grid.shape))
+        # gradient norm from finite differences along the grid axes (transformed to Cartesian)
+        grad = np.array(np.gradient(values)).reshape(3, -1).T
+        norm = np.linalg.norm(np.dot(grad, np.linalg.inv(grid.axes).T), axis=-1)
+        is_max, is_min = _local_extrema(values)
+        _, is_flat = _local_extrema(norm.reshape(values.shape))
+        mask = (is_max | is_min | is_flat).ravel()
+        return mask & (np.abs(data) >= threshold)
+
+    def generate_scripts(self, fname, radius=0.2, bond_paths=False):
         """Generate VMD script to visualize critical points & gradient path.
 
         Parameters
@@ -114,13 +194,21 @@ class TopologicalTool(Topology):
             The name of the VMD script file.
         radius : float, optional
             Radius of spheres representing the critical points.
+        bond_paths : bool, optional
+            If True, the bond paths are drawn as well (and traced, if `find_bond_paths` has not
+            been called).
 
         """
         cps = {'gray': [nna.coordinate for nna in self.nna],
                'blue': [bcp.coordinate for bcp in self.bcp],
                'green': [rcp.coordinate for rcp in self.rcp],
                'red': [ccp.coordinate for ccp in self.ccp]}
-        print_vmd_script_topology(fname, cps, radius=radius)
+        paths = None
+        if bond_paths:
+            if len(self.bond_paths) != len(self.bcp):
+                self.find_bond_paths()
+            paths = {'black': self.bond_paths}
+        print_vmd_script_topology(fname, cps, radius=radius, paths=paths)
 
     @staticmethod
     def _wrapper_compute_density(molecule, spin, index):
@@ -24,13 +24,16 @@
 """Utility Functions of Toolbox Module."""
 
 
+import multiprocessing
 import numpy as np
 
+from multiprocessing.sharedctypes import RawArray
 from horton import ProAtomDB
 from horton.scripts.wpart import wpart_schemes
 
 from chemtools.wrappers.grid import MolecularGrid
 from chemtools.wrappers.molecule import Molecule
+from chemtools.wrappers.part import get_condense_matrix
 
 
 def check_arg_molecule(molecule):
@@ -143,7 +146,7 @@ def get_molecular_grid(molecule, grid=None):
     return grid
 
 
-def condense_to_atoms(local_property, part):
+def condense_to_atoms(local_property, part, matrix=None):
     r"""
     Return condensed values of the local descriptor partitioned and integrated over atoms.
 
@@ -157,18 +160,25 @@ def condense_to_atoms(local_property, part):
     Parameters
     ----------
     local_property : ndarray
-        Local descriptor evaluated on grid.
+        Local descriptor evaluated on grid. Several local descriptors can be condensed at once
+        by giving a 2D array of shape (npoint, nprop).
     part : part instance
         Instance of `HORTON` partitioning calss.
+    matrix : scipy.sparse.csr_matrix, optional
+        Condensing matrix of the partitioning, see `get_condense_matrix`. If `None`, it is
+        computed from part, so it should be given when condensing repeatedly.
+
+    Returns
+    -------
+    condensed : ndarray
+        Condensed values of shape (natom,), or (natom, nprop) for a 2D local_property.
     """
-    condensed = np.zeros(part.natom)
-    for index in range(part.natom):
-        at_grid = part.get_grid(index)
-        at_weight = part.cache.load("at_weights", index)
-        wcor = part.get_wcor(index)
-        local_prop = part.to_atomic_grid(index, local_property)
-        condensed[index] = at_grid.integrate(at_weight, local_prop, wcor)
-    return condensed
+    if matrix is None:
+        matrix = get_condense_matrix(part)
+    if local_property.ndim not in [1, 2] or local_property.shape[0] != matrix.shape[1]:
+        raise ValueError("Argument local_property should be an array with {0} rows! "
+                         "shape={1}".format(matrix.shape[1], local_property.shape))
+    return matrix.dot(local_property)
 
 
 def get_dict_energy(molecule):
@@ -204,7 +214,74 @@ def get_dict_energy(molecule):
     return energies
 
 
-def get_dict_density(molecule, points):
+def compute_fmo_density(molecule, points, chunk_size=5000):
+    r"""Return electron density, HOMO density and LUMO density evaluated together.
+
+    The basis functions are evaluated once for each chunk of points, and the occupied
+    orbitals and the LUMO of each spin are obtained by multiplying the basis values with the
+    corresponding block of orbital coefficients. The electron density
+    :math:`\rho_N(\mathbf{r}) = \sum_i n_i \left|\phi_i(\mathbf{r})\right|^2` and
+    the frontier orbital densities are then computed from the same orbital values.
+
+    Parameters
+    ----------
+    molecule : Molecule
+        Instance of Molecule class.
+    points : ndarray
+       The 2D array containing the cartesian coordinates of points on which density is
+       evaluated. It has a shape (n, 3) where n is the number of points.
+    chunk_size : int, optional
+       Number of points for which basis functions are evaluated at once. This controls the
+       memory footprint, as an array of shape (chunk_size, nbasis) is stored.
+
+    Returns
+    -------
+    dens : ndarray
+        Electron density :math:`\rho_N(\mathbf{r})` of all occupied alpha & beta orbitals.
+    homo_dens : ndarray
+        Density of the highest occupied molecular orbital (HOMO).
+    lumo_dens : ndarray
+        Density of the lowest unoccupied molecular orbital (LUMO).
+    """
+    molecule._check_argument(points)
+    # get homo/lumo spin & column index of homo/lumo orbitals (HORTON indexes from 0)
+    _, _, homo_s, lumo_s = get_homo_lumo_data(molecule)
+    spin_to_index = {"a": 0, "b": 1}
+    homo_i = molecule.mo.homo_index[spin_to_index[homo_s]] - 1
+    lumo_i = molecule.mo.lumo_index[spin_to_index[lumo_s]] - 1
+    # columns of occupied orbitals & lumo for each spin
+    coeffs, occs = molecule.mo.coefficient, molecule.mo.occupation
+    restricted = coeffs[0] is coeffs[1] and np.all(occs[0] == occs[1])
+    columns = []
+    for spin in [0, 1]:
+        column = np.where(occs[spin] > 0.)[0]
+        if spin == spin_to_index[lumo_s]:
+            column = np.append(column, lumo_i)
+        columns.append(column)
+    if restricted:
+        columns[0] = np.union1d(columns[0], columns[1])
+
+    dens = np.zeros(points.shape[0])
+    homo_dens, lumo_dens = np.zeros(points.shape[0]), np.zeros(points.shape[0])
+    for start in range(0, points.shape[0], chunk_size):
+        chunk = slice(start, start + chunk_size)
+        basis = molecule.ao.compute_basis(points[chunk])
+        for spin in [0, 1]:
+            if spin == 1 and restricted:
+                # beta orbitals are the same as alpha orbitals
+                dens[chunk] *= 2.
+                break
+            column = columns[spin]
+            orbs = np.dot(basis, coeffs[spin][:, column])
+            dens[chunk] += np.dot(orbs**2, occs[spin][column])
+            if spin == spin_to_index[homo_s] or restricted:
+                homo_dens[chunk] = orbs[:, np.searchsorted(column, homo_i)]**2
+            if spin == spin_to_index[lumo_s] or restricted:
+                lumo_dens[chunk] = orbs[:, np.searchsorted(column, lumo_i)]**2
+    return dens, homo_dens, lumo_dens
+
+
+def get_dict_density(molecule, points, nproc=1):
     r"""Return dictionary of number of electrons and corresponding density values.
 
     Parameters
@@ -217,23 +294,22 @@ def get_dict_density(molecule, points):
     points : ndarray
        The 2D array containing the cartesian coordinates of points on which density is
        evaluated. It has a shape (n, 3) where n is the number of points.
+    nproc : int, optional
+       Number of processes used for evaluating the density of a sequence of molecules
+       concurrently. See :func:`get_dict_density_parallel`.
     """
     if isinstance(molecule, Molecule):
-        # get homo/lumo energy and spin
-        _, _, homo_s, lumo_s = get_homo_lumo_data(molecule)
-        # compute homo & lumo density
-        spin_to_index = {"a": 0, "b": 1}
-        homo_dens = molecule.compute_density(points, homo_s,
-                                             molecule.mo.homo_index[spin_to_index[homo_s]])
-        lumo_dens = molecule.compute_density(points, lumo_s,
-                                             molecule.mo.lumo_index[spin_to_index[lumo_s]])
+        # compute density, homo & lumo density from one evaluation of basis functions
+        dens, homo_dens, lumo_dens = compute_fmo_density(molecule, points)
         # store number of electron and density in a dictionary
         nelec = sum(molecule.mo.nelectrons)
-        dens = molecule.compute_density(points, "ab", None)
         densities = {nelec: dens,
                      nelec + 1: dens + lumo_dens,
                      nelec - 1: dens - homo_dens}
     elif np.all([isinstance(mol, Molecule) for mol in molecule]):
+        if nproc > 1:
+            # evaluate densities of molecules concurrently
+            return get_dict_density_parallel(molecule, points, nproc)[0]
         # compute and record densities on given points in a dictionary
         densities = {}
         for mol in molecule:
@@ -248,7 +324,109 @@ def get_dict_density(molecule, points):
     return densities
 
 
-def get_dict_population(molecule, approach, scheme, **kwargs):
+def get_dict_density_parallel(molecule, points, nproc=None):
+    r"""Return dictionary of number of electrons and density values evaluated concurrently.
+
+    Each molecule is evaluated in a separate worker process. The points and the computed
+    densities are stored in shared memory, so they are not copied between processes.
+    When file names are given, the files are also parsed by the worker processes, so the
+    wall time of loading and evaluating several wave-functions approaches that of one.
+
+    Parameters
+    ----------
+    molecule : Sequence of Molecule or Sequence of str
+        Sequence of Molecule class instances, or sequence of strings specifying the path to
+        molecule files. Molecule instances are inherited by the forked worker processes, so
+        this is only supported on platforms which start processes by forking.
+    points : ndarray
+       The 2D array containing the cartesian coordinates of points on which density is
+       evaluated. It has a shape (n, 3) where n is the number of points.
+    nproc : int, optional
+       Number of processes. If None, one process per molecule is used.
+
+    Returns
+    -------
+    densities : dict
+        Dictionary of number of electrons (keys) and density arrays (values).
+    numbers : ndarray
+        Atomic numbers of atomic centers which match between molecules.
+    coordinates : ndarray
+        Cartesian coordinates of atomic centers which match between molecules.
+    """
+    if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("Argument points should be a 2D-array with 3 columns.")
+    if nproc is None:
+        nproc = len(molecule)
+    if not isinstance(nproc, int) or nproc < 1:
+        raise ValueError("Argument nproc should be a positive integer! "
+                         "Given nproc={0}".format(nproc))
+    # store points & densities in shared memory
+    npoint = points.shape[0]
+    shared_points = RawArray("d", 3 * npoint)
+    np.frombuffer(shared_points, dtype=float)[:] = points.ravel()
+    shared_dens = RawArray("d", len(molecule) * npoint)
+    # evaluate densities in worker processes
+    pool = multiprocessing.Pool(min(nproc, len(molecule)), _init_worker_density,
+                                (molecule, shared_points, shared_dens, npoint))
+    try:
+        results = pool.map(_compute_density_worker, range(len(molecule)))
+    finally:
+        pool.close()
+        pool.join()
+    values = np.frombuffer(shared_dens, dtype=float).reshape(len(molecule), npoint)
+    # check numbers & coordinates match, and store densities in a dictionary
+    densities = {}
+    numbers, coordinates = results[0][1], results[0][2]
+    for index, (nelec, number, coord) in enumerate(results):
+        if number.shape != numbers.shape or not np.max(abs(number - numbers)) < 1.e-8:
+            raise ValueError("Molecule 0 & {0} have different numbers!".format(index))
+        if coord.shape != coordinates.shape or not np.max(abs(coord - coordinates)) < 1.e-4:
+            raise ValueError("Molecule 0 & {0} have different coordinates!".format(index))
+        if nelec in densities.keys():
+            raise ValueError("Two molecules have {0} electrons!".format(nelec))
+        densities[nelec] = values[index].copy()
+    return densities, numbers, coordinates
+
+
+# state of worker processes used in get_dict_density_parallel
+_WORKER_STATE = {}
+
+
+def _init_worker_density(molecule, shared_points, shared_dens, npoint):
+    """Store the molecules and views of shared arrays in the worker process."""
+    _WORKER_STATE["molecule"] = molecule
+    _WORKER_STATE["points"] = np.frombuffer(shared_points, dtype=float).reshape(npoint, 3)
+    _WORKER_STATE["dens"] = np.frombuffer(shared_dens, dtype=float).reshape(-1, npoint)
+
+
+def _compute_density_worker(index):
+    """Compute density of one molecule into the shared array & return its attributes."""
+    mol = _WORKER_STATE["molecule"][index]
+    if not isinstance(mol, Molecule):
+        mol = Molecule.from_file(str(mol))
+    _WORKER_STATE["dens"][index] = mol.compute_density(_WORKER_STATE["points"], "ab", None)
+    return sum(mol.mo.nelectrons), mol.numbers, mol.coordinates
+
+
+def _init_worker_part(part_args, shared_dens, npoint):
+    """Store the partitioning arguments and view of shared densities in the worker process."""
+    _WORKER_STATE["part_args"] = part_args
+    _WORKER_STATE["dens"] = np.frombuffer(shared_dens, dtype=float).reshape(-1, npoint)
+
+
+def _compute_population_worker(index):
+    """Partition one density from the shared array & return its atomic populations."""
+    return _compute_population(*(_WORKER_STATE["part_args"] + (_WORKER_STATE["dens"][index],)))
+
+
+def _compute_population(wpart, mol, grid, kwargs, dens):
+    """Return atomic populations of partitioned density."""
+    part = wpart(mol.coordinates, mol.numbers, mol.pseudo_numbers, grid, dens, **kwargs)
+    part.do_all()
+    return part["populations"]
+
+
+def get_dict_population(molecule, approach, scheme, nproc=1, **kwargs):
     r"""Return dictionary of number of electrons and corresponding atomic charges values.
 
     Parameters
@@ -260,6 +438,9 @@ def get_dict_population(molecule, approach, scheme, **kwargs):
         (response of molecular fragment).
     scheme : str
         Partitioning scheme.
+    nproc : int, optional
+        Number of processes used for partitioning the densities of the reference & perturbed
+        systems concurrently in the "RMF" approach.
     kwargs : optional
     """
     # check approach
@@ -285,15 +466,17 @@ def get_dict_population(molecule, approach, scheme, **kwargs):
         return dict_pops
 
     # case of condensing the density using denspart
+    if not isinstance(nproc, int) or nproc < 1:
+        raise ValueError("Argument nproc should be a positive integer! "
+                         "Given nproc={0}".format(nproc))
     try:
         # check whether molecules have the same coordinates
         get_matching_attr(molecule, "coordinates", 1.e-4)
-        same_coordinates = True
     except ValueError:
         if approach.lower() == "fmr":
             raise ValueError("When geometries of molecules are different, only approach='RMF' "
                              "is possible! Given approach={0}".format(approach.upper()))
-        same_coordinates = False
+        raise
 
     # find reference molecule
     if isinstance(molecule, Molecule):
@@ -319,35 +502,42 @@ def get_dict_population(molecule, approach, scheme, **kwargs):
     # check or generate molecular grid
     grid = get_molecular_grid(molecule, kwargs.pop("grid", None))
     # compute dictionary of number of electron and density
-    dict_dens = get_dict_density(molecule, grid.points)
-
-    # compute population of reference molecule
-    part0 = wpart(mol0.coordinates, mol0.numbers, mol0.pseudo_numbers, grid,
-                  dict_dens[sum(mol0.mo.nelectrons)], **kwargs)
-    part0.do_all()
-    # record population of reference system
-    dict_pops = dict([(sum(mol0.mo.nelectrons), part0["populations"])])
-    del dict_dens[sum(mol0.mo.nelectrons)]
-
-    # compute and record populations given grid in a dictionary
-    for nelec, dens in dict_dens.iteritems():
+    dict_dens = get_dict_density(molecule, grid.points, nproc)
+
+    if approach.lower() == "fmr":
+        # compute population of reference molecule
+        part0 = wpart(mol0.coordinates, mol0.numbers, mol0.pseudo_numbers, grid,
+                      dict_dens[sum(mol0.mo.nelectrons)], **kwargs)
+        part0.do_all()
+        # record population of reference system
+        dict_pops = dict([(sum(mol0.mo.nelectrons), part0["populations"])])
+        del dict_dens[sum(mol0.mo.nelectrons)]
+        # fragment of molecular response; condense all densities at once
+        nelecs = sorted(dict_dens.keys())
+        pops = condense_to_atoms(np.array([dict_dens[nelec] for nelec in nelecs]).T, part0)
+        dict_pops.update(zip(nelecs, pops.T))
+        return dict_pops
 
-        if approach.lower() == "fmr":
-            # fragment of molecular response
-            pops = condense_to_atoms(dens, part0)
-        elif approach.lower() == "rmf":
-            # response of molecular fragment
-            if not same_coordinates:
-                mol = dict_mols[nelec]
-                grid = get_molecular_grid(molecule, None)
-                dens = molecule.compute_density(grid.points, "ab", None)
-            parts = wpart(mol.coordinates, mol.numbers, mol.pseudo_numbers,
-                          grid, dens, **kwargs)
-
-            parts.do_all()
-            pops = parts["populations"]
-        else:
-            raise ValueError("Condensing approach {0} is not recognized!".format(approach))
-        # Store number of electron and populations in a dictionary
-        dict_pops[nelec] = pops
+    # response of molecular fragment; partition reference & perturbed systems independently
+    part_args = (wpart, mol0, grid, kwargs)
+    nelecs = sorted(dict_dens.keys())
+    dict_pops = {}
+    if nproc == 1 or len(nelecs) == 1:
+        for nelec in nelecs:
+            dict_pops[nelec] = _compute_population(*(part_args + (dict_dens[nelec],)))
+        return dict_pops
+    # share densities with worker processes; the grid is inherited by the forked processes
+    npoint = grid.points.shape[0]
+    shared_dens = RawArray("d", len(nelecs) * npoint)
+    values = np.frombuffer(shared_dens, dtype=float).reshape(len(nelecs), npoint)
+    for index, nelec in enumerate(nelecs):
+        values[index] = dict_dens[nelec]
+    pool = multiprocessing.Pool(min(nproc, len(nelecs)), _init_worker_part,
+                                (part_args, shared_dens, npoint))
+    try:
+        pops = pool.map(_compute_population_worker, range(len(nelecs)))
+    finally:
+        pool.close()
+        pool.join()
+    dict_pops.update(zip(nelecs, pops))
     return dict_pops
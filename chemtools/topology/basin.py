@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+r"""Grid-based partitioning of scalar functions into basins of attraction (QTAIM basins)."""
+
+
+import numpy as np
+
+from chemtools.profiling import profiled
+
+
+__all__ = ["assign_basins", "integrate_basins"]
+
+
+def _ascent_neighbours(values, axes):
+    """Return the flat index of the steepest-ascent neighbour of every point of a 3D array.
+
+    Parameters
+    ----------
+    values : np.ndarray(N0, N1, N2)
+        Function values on the cubic grid.
+    axes : np.ndarray(3, 3)
+        The three vectors (rows) between neighbouring grid points.
+
+    Returns
+    -------
+    neighbours : np.ndarray(N0 * N1 * N2,)
+        Flat index of the neighbour with the largest positive slope, or the index of the point
+        itself if it is a local maximum (i.e. no neighbour has a larger value).
+
+    """
+    shape = values.shape
+    # pad with -inf, so that points outside of the grid are never selected
+    padded = np.pad(values, 1, mode="constant", constant_values=-np.inf)
+    indices = np.arange(values.size).reshape(shape)
+    best_slope = np.zeros(shape)
+    neighbours = indices.copy()
+    for offset in np.ndindex(3, 3, 3):
+        offset = np.array(offset) - 1
+        if not np.any(offset):
+            continue
+        # value of the neighbour displaced by offset (in units of the grid axes)
+        shifted = padded[1 + offset[0]: 1 + offset[0] + shape[0],
+                         1 + offset[1]: 1 + offset[1] + shape[1],
+                         1 + offset[2]: 1 + offset[2] + shape[2]]
+        slope = (shifted - values) / np.linalg.norm(offset.dot(axes))
+        mask = slope > best_slope
+        best_slope[mask] = slope[mask]
+        neighbours[mask] = indices[mask] + np.dot(offset, [shape[1] * shape[2], shape[2], 1])
+    return neighbours.ravel()
+
+
+@profiled("assign_basins")
+def assign_basins(grid, data, threshold=None):
+    r"""Assign every point of a cubic grid to the basin of attraction of a local maximum.
+
+    The on-grid steepest-ascent method of Henkelman et al. [1]_ is used: each grid point is
+    linked to the neighbouring point (out of 26) with the steepest ascent, and local maxima are
+    linked to themselves. The links of all points are computed with array operations, and are
+    followed to the maxima by pointer jumping (i.e. replacing each link by the link of the linked
+    point), which takes :math:`\mathcal{O}(N \log L)` operations for :math:`N` grid points and
+    ascent paths of at most :math:`L` points.
+
+    Parameters
+    ----------
+    grid : UniformGrid
+        Cubic grid on which the function is evaluated.
+    data : np.ndarray(N,)
+        Values of the scalar function (e.g. electron density) at the grid points.
+    threshold : float, optional
+        Points with a value below the threshold (e.g. vacuum) are not assigned to any basin.
+        Each point of a plateau (e.g. where the density underflows to zero) is a local maximum,
+        so the threshold avoids spurious basins far from the molecule.
+
+    Returns
+    -------
+    labels : np.ndarray(N,)
+        Index of the basin of each grid point, or -1 if the point is not assigned to a basin.
+    maxima : np.ndarray(B,)
+        Index of the grid point of the local maximum of each basin, so that
+        ``grid.points[maxima]`` are the (approximate) coordinates of the attractors.
+
+    References
+    ----------
+    .. [1] G. Henkelman, A. Arnaldsson, and H. Jonsson, A fast and robust algorithm for Bader
+       decomposition of charge density, Comput. Mater. Sci. 36, 354-360 (2006).
+
+    """
+    data = np.asarray(data)
+    if data.ndim != 1 or data.size != grid.npoints:
+        raise ValueError("Argument data should be a 1D-array with {0} (number of grid points) "
+                         "entries.".format(grid.npoints))
+    links = _ascent_neighbours(data.reshape(tuple(grid.shape)), grid.axes)
+    # follow the links to the local maxima by pointer jumping
+    while True:
+        jumped = links[links]
+        if np.array_equal(jumped, links):
+            break
+        links = jumped
+    if threshold is not None:
+        # remove the maxima (and so their basins) below the threshold
+        links[data[links] < threshold] = -1
+        links[data < threshold] = -1
+    assigned = links >= 0
+    labels = np.full(data.size, -1, dtype=int)
+    maxima, labels[assigned] = np.unique(links[assigned], return_inverse=True)
+    return labels, maxima
+
+
+def integrate_basins(grid, labels, data, method="R0"):
+    r"""Integrate data over the basins of a cubic grid.
+
+    Parameters
+    ----------
+    grid : UniformGrid
+        Cubic grid on which the data is given.
+    labels : np.ndarray(N,)
+        Index of the basin of each grid point (-1 for points not assigned to a basin), e.g. from
+        `assign_basins`.
+    data : np.ndarray(N,) or np.ndarray(N, M)
+        Data (e.g. electron density) at every point on the grid. To compute the volume of the
+        basins, use an array of ones.
+    method : str, optional
+        The method for computing the integration weights at every point on the grid; see
+        `UniformGrid.weights`.
+
+    Returns
+    -------
+    integrals : np.ndarray(B,) or np.ndarray(B, M)
+        Integral of the data over each basin.
+
+    """
+    labels = np.asarray(labels)
+    data = np.asarray(data)
+    if labels.shape != (grid.npoints,):
+        raise ValueError("Argument labels should be a 1D-array with {0} (number of grid points) "
+                         "entries.".format(grid.npoints))
+    if data.ndim not in [1, 2] or data.shape[0] != grid.npoints:
+        raise ValueError("Argument data should have the same size as the grid for axis=0. "
+                         "{0}!={1}".format(data.shape[0], grid.npoints))
+    assigned = labels >= 0
+    nbasin = np.max(labels) + 1 if np.any(assigned) else 0
+    weights = grid.weights(method=method)[assigned]
+    labels = labels[assigned]
+    if data.ndim == 1:
+        return np.bincount(labels, weights=weights * data[assigned], minlength=nbasin)
+    return np.array([np.bincount(labels, weights=weights * column[assigned], minlength=nbasin)
+                     for column in data.T]).T
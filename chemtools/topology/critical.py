@@ -24,11 +24,13 @@ r"""Functionality for finding critical points of any scalar function."""
 
 
 import warnings
+import multiprocessing
 import numpy as np
 
 from scipy.spatial import cKDTree
 
 from chemtools.topology.point import CriticalPoint
+from chemtools.topology.path import trace_gradient_paths
 
 
 class Topology(object):
@@ -46,7 +48,8 @@ class Topology(object):
         func_hess : callable[np.ndarray(N, 3) -> np.ndarray(3, 3)]
             Method for computing the hessian matrix of scalar function.
         points : np.ndarray(M, 3)
-            Cartesian coordinates of :math:`M` initial guess points.
+            Cartesian coordinates of :math:`M` initial guess points. Together with `coords`, at
+            least 4 points are needed.
         coords : np.ndarray(N, 3), optional
             Cartesian coordinates of :math:`N` atomic centers to use as additional initial guesses.
         n_neighbours: int, optional
@@ -55,7 +58,7 @@ class Topology(object):
         """
         if points.ndim != 2 and points.shape[1] != 3:
             raise ValueError("Argument points should be a 2D-array with 3 columns!")
-        if points.shape[0] < 4:
+        if points.shape[0] + (0 if coords is None else len(coords)) < 4:
             raise ValueError("At least 4 points are needed for critical point search!")
         self._points = points
 
@@ -75,6 +78,9 @@ class Topology(object):
         self._neighbours = self._polyhedron_coordinates(n_neighbours)
         # dictionary for storing critical points using (rank, signature) as key
         self._cps = {}
+        # bond paths & the indices of the attractors they connect (computed on demand)
+        self._bond_paths = []
+        self._bond_connectivity = np.zeros((0, 2), dtype=int)
 
     @property
     def cps(self):
@@ -101,6 +107,23 @@ class Topology(object):
         """Sequence of CriticalPoint instances representing cage critical points."""
         return self._cps.get((3, 3), [])
 
+    @property
+    def bond_paths(self):
+        """Sequence of bond paths, i.e. np.ndarray(K, 3) of points from one attractor to another.
+
+        The paths are traced by `find_bond_paths`; the i-th path passes through the i-th bond
+        critical point.
+        """
+        return self._bond_paths
+
+    @property
+    def bond_connectivity(self):
+        """np.ndarray(B, 2): indices of the attractors (`nna`) connected by each bond path.
+
+        The index is -1 if the path did not reach an attractor.
+        """
+        return self._bond_connectivity
+
     @property
     def poincare_hopf_equation(self):
         """bool: whether the Poincare–Hopf equation is satisfied."""
@@ -117,43 +140,155 @@ class Topology(object):
         """
         self._kdtree = cKDTree(np.vstack((self._kdtree.data, points)))
 
-    def find_critical_points(self):
-        """Find and store the critical points."""
-        neighs = np.zeros((4 * len(self._kdtree.data), 3))
-        for index, point in enumerate(self._kdtree.data):
-            # compute distance to 4 closest grid points
-            dists, _ = self._kdtree.query(point, 4)
-            # store coordinates of neighbouring polyhedron vertices surrounding the point
-            neighs[4 * index: 4 * index + 4, :] = point + np.max(dists) * self._neighbours
+    def find_critical_points(self, nproc=1):
+        """Find and store the critical points.
 
-        # compute the gradient norm of points & surrounding vertices
-        points_norm = np.linalg.norm(self.grad(self._kdtree.data), axis=-1)
-        neighs_norm = np.linalg.norm(self.grad(neighs), axis=-1)
-
-        for index, point in enumerate(self._kdtree.data):
-            point_norm = points_norm[index]
-            neigh_norm = neighs_norm[4 * index: 4 * index + 4]
-            # use central point as initial guess for critical point finding
-            if index < len(self._coords) or np.all(point_norm < neigh_norm):
-                try:
-                    coord = self._root_vector_func(point.copy())
-                except np.linalg.LinAlgError as _:
-                    continue
-                # add critical point if it is new
-                if not np.any([np.linalg.norm(coord - cp.coordinate) < 1.e-3 for cp in self.cps]):
-                    dens = self.func(coord)
-                    grad = self.grad(coord)
-                    # skip critical point if its dens & grad are zero
-                    if abs(dens) < 1.e-4 and np.all(abs(grad) < 1.e-4):
-                        continue
-                    # compute rank & signature of critical point
-                    eigenvals, eigenvecs = np.linalg.eigh(self.hess(coord))
-                    cp = CriticalPoint(coord, eigenvals, eigenvecs, 1e-4)
-                    self._cps.setdefault((cp.rank[0], cp.signature[0]), []).append(cp)
+        Parameters
+        ----------
+        nproc : int, optional
+            Number of processes used for refining the candidate points with Newton-Raphson
+            method. When larger than one, the candidates are split into spatially contiguous
+            shards which are refined (and deduplicated) in worker processes, each holding its own
+            copy of the functions (e.g. its own `Molecule`), and the results are merged in the
+            order of the candidates, so the critical points do not depend on `nproc`. The
+            functions are not pickled, so this is only supported on platforms which start
+            processes by forking.
+
+        """
+        if not isinstance(nproc, int) or nproc < 1:
+            raise ValueError("Argument nproc should be a positive integer! "
+                             "Given nproc={0}".format(nproc))
+        candidates = self._screen_candidates()
+        if nproc == 1 or len(candidates) < 2:
+            results = self._refine_candidates(candidates)
+        else:
+            # split candidates into slabs along the direction of their largest spread
+            points = self._kdtree.data[candidates]
+            order = np.argsort(points[:, np.argmax(np.ptp(points, axis=0))], kind="mergesort")
+            shards = [np.sort(shard) for shard in
+                      np.array_split(candidates[order], min(4 * nproc, len(candidates)))]
+            pool = multiprocessing.Pool(nproc, _init_worker_refine, (self,))
+            try:
+                results = pool.map(_refine_worker, shards)
+            finally:
+                pool.close()
+                pool.join()
+            # merge critical points found in all shards in the order of candidates
+            results = sorted([item for result in results for item in result], key=lambda x: x[0])
+        for _, cp in results:
+            self._add_critical_point(cp)
         # check Poincare–Hopf equation
         if not self.poincare_hopf_equation:
             warnings.warn("Poincare–Hopf equation is not satisfied.", RuntimeWarning)
 
+    def _screen_candidates(self):
+        """Return indices of the seed points used as initial guesses for critical point finding.
+
+        The atomic coordinates are always used, while other points are used if their gradient
+        norm is smaller than that of the vertices of a surrounding polyhedron.
+        """
+        points = self._kdtree.data
+        # compute distance to 4 closest grid points
+        dists, _ = self._kdtree.query(points, 4)
+        # coordinates of neighbouring polyhedron vertices surrounding the points
+        neighs = points[:, np.newaxis] + np.max(dists, axis=1)[:, np.newaxis, np.newaxis] * \
+            self._neighbours[np.newaxis]
+        # compute the gradient norm of points & surrounding vertices
+        points_norm = np.linalg.norm(self.grad(points), axis=-1)
+        neighs_norm = np.linalg.norm(self.grad(neighs.reshape(-1, 3)), axis=-1).reshape(-1, 4)
+        mask = np.all(points_norm[:, np.newaxis] < neighs_norm, axis=1)
+        mask[:len(self._coords) if self._coords is not None else 0] = True
+        return np.where(mask)[0]
+
+    def _refine_candidates(self, candidates):
+        """Return the new critical points found from the candidate seed points.
+
+        Parameters
+        ----------
+        candidates : np.ndarray
+            Indices of the seed points used as initial guesses.
+
+        Returns
+        -------
+        found : list of (int, CriticalPoint)
+            Index of the seed point & the critical point found from it, for the critical points
+            which are not (close to) already found ones.
+
+        """
+        found = []
+        for index in candidates:
+            try:
+                coord = self._root_vector_func(self._kdtree.data[index].copy())
+            except np.linalg.LinAlgError as _:
+                continue
+            # add critical point if it is new
+            if _is_new(coord, self.cps + [cp for _, cp in found]):
+                cp = self._classify(coord)
+                if cp is not None:
+                    found.append((index, cp))
+        return found
+
+    def _add_critical_point(self, cp):
+        """Store the critical point using (rank, signature) as key, if it is new."""
+        if _is_new(cp.coordinate, self.cps):
+            self._cps.setdefault((cp.rank[0], cp.signature[0]), []).append(cp)
+
+    def _classify(self, coord):
+        """Return the CriticalPoint at the given coordinate (None if its dens & grad are zero)."""
+        dens = self.func(coord)
+        grad = self.grad(coord)
+        # skip critical point if its dens & grad are zero
+        if abs(dens) < 1.e-4 and np.all(abs(grad) < 1.e-4):
+            return None
+        # compute rank & signature of critical point
+        eigenvals, eigenvecs = np.linalg.eigh(self.hess(coord))
+        return CriticalPoint(coord, eigenvals, eigenvecs, 1e-4)
+
+    def find_bond_paths(self, displacement=0.01, step=0.1, tol=1.e-5, radius=0.1,
+                        max_length=20.):
+        """Trace and store the bond paths starting from the bond critical points.
+
+        From each bond critical point, two gradient paths are traced along (and opposite to) the
+        hessian eigenvector with positive eigenvalue towards the attractors; the paths of all bond
+        critical points are integrated together (see `trace_gradient_paths`).
+
+        Parameters
+        ----------
+        displacement : float, optional
+            Distance of the starting points of the paths from the bond critical point.
+        step : float, optional
+            Initial step size of the paths.
+        tol : float, optional
+            Tolerance of the local error of each step.
+        radius : float, optional
+            Distance from an attractor within which a path is considered to reach it.
+        max_length : float, optional
+            Maximum length of each half of the bond paths.
+
+        Returns
+        -------
+        connectivity : np.ndarray(B, 2)
+            Indices of the attractors (`nna`) connected by each bond critical point, or -1 if the
+            path did not reach an attractor.
+
+        """
+        if not self.bcp:
+            self._bond_paths = []
+            self._bond_connectivity = np.zeros((0, 2), dtype=int)
+            return self._bond_connectivity
+        centers = np.array([cp.coordinate for cp in self.bcp])
+        # eigenvalues are sorted in ascending order, so the last eigenvector has positive curvature
+        vectors = np.array([cp.eigenvectors[:, -1] for cp in self.bcp])
+        seeds = np.vstack((centers + displacement * vectors, centers - displacement * vectors))
+        attractors = np.array([cp.coordinate for cp in self.nna]).reshape(-1, 3)
+        paths, ends = trace_gradient_paths(self.grad, seeds, attractors, direction=1, step=step,
+                                           tol=tol, radius=radius, max_length=max_length)
+        nbcp = len(self.bcp)
+        self._bond_paths = [np.vstack((paths[index][::-1], centers[index], paths[nbcp + index]))
+                            for index in range(nbcp)]
+        self._bond_connectivity = np.vstack((ends[:nbcp], ends[nbcp:])).T
+        return self._bond_connectivity
+
     def _root_vector_func(self, guess, maxiter=5000):
         """Find root of a multivariate function using Newton-Raphson method.
 
@@ -194,3 +329,22 @@ class Topology(object):
         else:
             raise NotImplementedError("Number of vertices {} is not supported".format(n_vertices))
         return coords
+
+
+def _is_new(coord, cps):
+    """Return True if the coordinate is not (close to) the coordinate of the critical points."""
+    return not np.any([np.linalg.norm(coord - cp.coordinate) < 1.e-3 for cp in cps])
+
+
+# state of worker processes used in Topology.find_critical_points
+_WORKER_STATE = {}
+
+
+def _init_worker_refine(topology):
+    """Store the topology instance (and so its functions) in the worker process."""
+    _WORKER_STATE["topology"] = topology
+
+
+def _refine_worker(candidates):
+    """Refine one shard of candidates & return the (index, CriticalPoint) of the new ones."""
+    return _WORKER_STATE["topology"]._refine_candidates(candidates)
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+r"""Functionality for tracing gradient paths of any scalar function."""
+
+
+import numpy as np
+
+
+__all__ = ["trace_gradient_paths"]
+
+
+# Dormand-Prince coefficients of the embedded Runge-Kutta 5(4) method
+_RK_C = np.array([0., 1. / 5., 3. / 10., 4. / 5., 8. / 9., 1., 1.])
+_RK_A = [np.array([]),
+         np.array([1. / 5.]),
+         np.array([3. / 40., 9. / 40.]),
+         np.array([44. / 45., -56. / 15., 32. / 9.]),
+         np.array([19372. / 6561., -25360. / 2187., 64448. / 6561., -212. / 729.]),
+         np.array([9017. / 3168., -355. / 33., 46732. / 5247., 49. / 176., -5103. / 18656.]),
+         np.array([35. / 384., 0., 500. / 1113., 125. / 192., -2187. / 6784., 11. / 84.])]
+# weights of the 5th order solution (same as the last row of A) & the 4th order error estimate
+_RK_B = np.array([35. / 384., 0., 500. / 1113., 125. / 192., -2187. / 6784., 11. / 84., 0.])
+_RK_E = _RK_B - np.array([5179. / 57600., 0., 7571. / 16695., 393. / 640., -92097. / 339200.,
+                          187. / 2100., 1. / 40.])
+
+
+def _direction(func_grad, points, sign, gtol):
+    """Return the normalized (signed) gradient directions & a mask of the stalled points."""
+    grad = func_grad(points)
+    norm = np.linalg.norm(grad, axis=-1)
+    stalled = norm < gtol
+    norm[stalled] = 1.
+    return sign * grad / norm[:, np.newaxis], stalled
+
+
+def trace_gradient_paths(func_grad, points, attractors=None, direction=1, step=0.1, tol=1.e-5,
+                         min_step=1.e-4, max_step=0.5, radius=0.1, max_length=20.,
+                         gtol=1.e-8, maxiter=5000):
+    r"""Trace gradient paths of a scalar function starting from the given points.
+
+    The paths are solutions of :math:`d\mathbf{r}/ds = \pm \nabla f / |\nabla f|`, i.e. they are
+    parametrized by their arc length :math:`s`, and are integrated with the adaptive Dormand-Prince
+    Runge-Kutta 5(4) method. All paths are advanced in lock-step, so each stage of the method
+    evaluates the gradient of all unfinished paths in one call to `func_grad`.
+
+    A path terminates when it gets within `radius` of an attractor (which is then appended to the
+    path), when the gradient vanishes (i.e. the path reaches another critical point), when its
+    length exceeds `max_length` (i.e. the path escapes to infinity), or after `maxiter` steps. A
+    path whose direction is reversed in one step has stepped over a critical point, so it is
+    terminated (before that step) as well.
+
+    Parameters
+    ----------
+    func_grad : callable[np.ndarray(N, 3) -> np.ndarray(N, 3)]
+        Method for computing the gradient vector of scalar function at the given points.
+    points : np.ndarray(M, 3)
+        Cartesian coordinates of :math:`M` starting points of the paths.
+    attractors : np.ndarray(A, 3), optional
+        Cartesian coordinates of the critical points at which the paths terminate.
+    direction : int, optional
+        Direction of the paths; 1 follows the gradient (ascending paths) and -1 follows the
+        negative gradient (descending paths).
+    step : float, optional
+        Initial step size (arc length).
+    tol : float, optional
+        Tolerance of the local error of each step.
+    min_step : float, optional
+        Minimum step size; steps of this size are accepted regardless of their error.
+    max_step : float, optional
+        Maximum step size.
+    radius : float, optional
+        Distance from an attractor within which a path is considered to reach it.
+    max_length : float, optional
+        Maximum length of the paths.
+    gtol : float, optional
+        Gradient norm below which a path is considered to reach a critical point.
+    maxiter : int, optional
+        Maximum number of steps.
+
+    Returns
+    -------
+    paths : list of np.ndarray(K_i, 3)
+        Cartesian coordinates of the points of each path, starting with the given point.
+    ends : np.ndarray(M,)
+        Index of the attractor reached by each path, or -1 if it did not reach an attractor.
+
+    """
+    points = np.asarray(points, dtype=float)
+    if points.ndim != 2 or points.shape[1] != 3:
+        raise ValueError("Argument points should be a 2D-array with 3 columns.")
+    if attractors is None:
+        attractors = np.zeros((0, 3))
+    attractors = np.asarray(attractors, dtype=float)
+    if attractors.ndim != 2 or attractors.shape[1] != 3:
+        raise ValueError("Argument attractors should be a 2D-array with 3 columns.")
+    if direction not in [1, -1]:
+        raise ValueError("Argument direction should be either 1 or -1.")
+    if not 0. < min_step <= step <= max_step:
+        raise ValueError("Step sizes should satisfy 0 < min_step <= step <= max_step.")
+
+    npath = points.shape[0]
+    paths = [[point] for point in points]
+    ends = np.full(npath, -1, dtype=int)
+    # state of the unfinished paths
+    active = np.arange(npath)
+    coords = points.copy()
+    steps = np.full(npath, float(step))
+    lengths = np.zeros(npath)
+    # first stage of the first step (reused from the last stage of the previous steps)
+    k_first, stalled = _direction(func_grad, coords, direction, gtol)
+
+    for _ in range(maxiter):
+        # terminate the paths that reached an attractor, a critical point or are too long
+        done = stalled | (lengths > max_length)
+        dist = np.full(active.size, np.inf)
+        if attractors.shape[0] > 0:
+            dists = np.linalg.norm(coords[:, np.newaxis] - attractors[np.newaxis], axis=-1)
+            nearest = np.argmin(dists, axis=1)
+            dist = dists[np.arange(active.size), nearest]
+            reached = dist < radius
+            for index in np.where(reached)[0]:
+                if dist[index] > 0.:
+                    paths[active[index]].append(attractors[nearest[index]])
+                ends[active[index]] = nearest[index]
+            done |= reached
+        if np.all(done):
+            break
+        keep = ~done
+        active, coords, steps, lengths = active[keep], coords[keep], steps[keep], lengths[keep]
+        k_first, dist = k_first[keep], dist[keep]
+        # do not step over the nearest attractor
+        steps = np.clip(np.minimum(steps, dist), min_step, max_step)
+
+        # compute the stages of all paths in lock-step
+        stages = [k_first]
+        for a_row in _RK_A[1:]:
+            trial = coords + steps[:, np.newaxis] * np.einsum("i,ijk->jk", a_row, stages)
+            k_stage, k_stalled = _direction(func_grad, trial, direction, gtol)
+            stages.append(k_stage)
+        stages = np.array(stages)
+        new_coords = coords + steps[:, np.newaxis] * np.einsum("i,ijk->jk", _RK_B, stages)
+        error = steps * np.linalg.norm(np.einsum("i,ijk->jk", _RK_E, stages), axis=-1)
+
+        # accept steps within tolerance (or of minimum size) & update the step sizes
+        accept = (error <= tol) | (steps <= min_step)
+        factor = 0.9 * (tol / np.maximum(error, 1.e-16)) ** 0.2
+        new_steps = np.clip(steps * np.clip(factor, 0.2, 5.), min_step, max_step)
+        # a path reversing its direction has stepped over a critical point, so it is terminated
+        # at its last point, i.e. without the point beyond the critical point
+        reversed_ = np.sum(stages[-1] * k_first, axis=-1) < 0.
+        move = accept & ~reversed_
+        for index in np.where(move)[0]:
+            paths[active[index]].append(new_coords[index])
+        coords[move] = new_coords[move]
+        lengths[move] += steps[move]
+        steps = new_steps
+        stalled = (move & k_stalled) | (accept & reversed_)
+        # the last stage is evaluated at the new coordinates, so it is reused as the first stage
+        # of the next step of the moved paths
+        k_first = np.where(move[:, np.newaxis], stages[-1], k_first)
+    return [np.array(path) for path in paths], ends
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.topology.basin."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal, assert_almost_equal
+
+from chemtools.topology.basin import assign_basins, integrate_basins
+from chemtools.utils.cube import UniformGrid
+from chemtools.wrappers.molecule import Molecule
+
+try:
+    from importlib_resources import path
+except ImportError:
+    from importlib.resources import path
+
+
+def make_gaussians(grid, centers, alphas):
+    """Return the sum of normalized gaussians evaluated on the grid points."""
+    dist = grid.points[:, np.newaxis, :] - centers
+    return np.sum((alphas / np.pi)**1.5 * np.exp(-alphas * np.sum(dist**2, axis=-1)), axis=-1)
+
+
+def test_assign_basins_gaussians():
+    centers = np.array([[0., 0., -1.6], [0., 0., 1.6], [1.6, 0.4, 0.]])
+    alphas = np.array([3., 3., 3.])
+    grid = UniformGrid(np.array([1, 1, 1]), np.array([1., 1., 1.]), centers,
+                       np.array([-4., -4., -4.]), np.identity(3) * 0.2, np.array([41, 41, 41]))
+    dens = make_gaussians(grid, centers, alphas)
+    labels, maxima = assign_basins(grid, dens)
+    assert_equal(labels.shape, (grid.npoints,))
+    assert_equal(len(maxima), 3)
+    assert np.all(labels >= 0)
+    # maxima of the basins are the grid points at the centers of the gaussians
+    assert np.allclose(np.sort(grid.points[maxima], axis=0), np.sort(centers, axis=0))
+    # each gaussian is (almost) all in its own basin
+    populations = integrate_basins(grid, labels, dens)
+    assert_almost_equal(populations, np.ones(3), decimal=3)
+    # points closer to a center than the others are in its basin
+    dist = np.linalg.norm(grid.points[:, np.newaxis, :] - grid.points[maxima], axis=-1)
+    closest = np.argmin(dist, axis=1)
+    near = np.sort(dist, axis=1)[:, 1] - np.min(dist, axis=1) > 0.5
+    assert_equal(labels[near], closest[near])
+    # integrate volume & multiple properties
+    volumes = integrate_basins(grid, labels, np.ones(grid.npoints))
+    assert_almost_equal(np.sum(volumes), np.sum(grid.weights(method="R0")))
+    values = integrate_basins(grid, labels, np.array([dens, 2 * dens]).T, method="R")
+    assert_equal(values.shape, (3, 2))
+    assert_almost_equal(values[:, 1], 2 * values[:, 0])
+    # threshold removes points (but not basins)
+    labels_cut, maxima_cut = assign_basins(grid, dens, threshold=1.e-4)
+    assert_equal(maxima_cut, maxima)
+    assert_equal(labels_cut[dens < 1.e-4], -1)
+    assert_equal(labels_cut[dens >= 1.e-4], labels[dens >= 1.e-4])
+    assert np.all(integrate_basins(grid, labels_cut, dens) <= populations)
+    # threshold removes basins with smaller maxima
+    labels_cut, maxima_cut = assign_basins(grid, dens, threshold=dens[maxima[0]] + 1.)
+    assert_equal(len(maxima_cut), 0)
+    assert np.all(labels_cut == -1)
+    assert_equal(integrate_basins(grid, labels_cut, dens).shape, (0,))
+
+
+def test_assign_basins_raises():
+    grid = UniformGrid(np.array([1]), np.array([1.]), np.zeros((1, 3)), np.zeros(3),
+                       np.identity(3), np.array([3, 4, 5]))
+    assert_raises(ValueError, assign_basins, grid, np.ones(59))
+    assert_raises(ValueError, assign_basins, grid, np.ones((60, 1)))
+    assert_raises(ValueError, integrate_basins, grid, np.zeros(59, int), np.ones(60))
+    assert_raises(ValueError, integrate_basins, grid, np.zeros(60, int), np.ones(59))
+
+
+def test_assign_basins_h2o():
+    with path("chemtools.data", "h2o_q+0_ub3lyp_ccpvtz.fchk") as fname:
+        mol = Molecule.from_file(str(fname))
+    grid = UniformGrid.from_molecule(mol, spacing=0.1, extension=4.0)
+    dens = mol.compute_density(grid.points)
+    labels, maxima = assign_basins(grid, dens, threshold=1.e-5)
+    assert_equal(len(maxima), 3)
+    # each basin belongs to an atom
+    dist = np.linalg.norm(grid.points[maxima][:, np.newaxis] - mol.coordinates, axis=-1)
+    assert np.all(np.min(dist, axis=1) < 0.15)
+    atoms = np.argmin(dist, axis=1)
+    charges = mol.numbers[atoms] - integrate_basins(grid, labels, dens)
+    assert_almost_equal(np.sum(charges), 0., decimal=1)
+    # oxygen is negative & hydrogens are positive
+    assert np.all((charges < 0) == (mol.numbers[atoms] == 8))
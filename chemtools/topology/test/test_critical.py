@@ -180,3 +180,66 @@ class TestCriticalPoints(TestCase):
         assert len(tp_ins._nna) == 0
         assert len(tp_ins._ccp) == 0
 """
+
+
+import numpy as np
+from numpy.testing import assert_raises
+
+from chemtools.topology.critical import Topology
+
+
+# three spherical gaussians at the vertices of an equilateral triangle in the xy-plane
+centers = np.array([[1., 0., 0.], [-0.5, np.sqrt(3) / 2, 0.], [-0.5, -np.sqrt(3) / 2, 0.]])
+
+
+def func(points):
+    dist = points[..., np.newaxis, :] - centers
+    return np.sum(np.exp(-2 * np.sum(dist**2, axis=-1)), axis=-1)
+
+
+def func_grad(points):
+    dist = points[..., np.newaxis, :] - centers
+    dens = np.exp(-2 * np.sum(dist**2, axis=-1))
+    return np.sum(-4 * dist * dens[..., np.newaxis], axis=-2)
+
+
+def func_hess(point):
+    dist = point - centers
+    dens = np.exp(-2 * np.sum(dist**2, axis=-1))
+    hess = 16 * dist[:, :, np.newaxis] * dist[:, np.newaxis, :] - 4 * np.identity(3)
+    return np.sum(hess * dens[:, np.newaxis, np.newaxis], axis=0)
+
+
+def make_topology():
+    axis = np.linspace(-1.5, 1.5, 21)
+    points = np.array(np.meshgrid(axis, axis, [-0.15, 0., 0.15])).reshape(3, -1).T
+    return Topology(func, func_grad, func_hess, points, centers)
+
+
+def test_find_critical_points_triangle():
+    topo = make_topology()
+    topo.find_critical_points()
+    assert len(topo.nna) == 3
+    assert len(topo.bcp) == 3
+    assert len(topo.rcp) == 1
+    assert len(topo.ccp) == 0
+    assert topo.poincare_hopf_equation
+    assert np.allclose(topo.rcp[0].coordinate, 0., atol=1.e-6)
+    assert_raises(ValueError, topo.find_critical_points, 0)
+    assert_raises(ValueError, topo.find_critical_points, 2.)
+
+
+def test_find_critical_points_parallel():
+    serial = make_topology()
+    serial.find_critical_points()
+    parallel = make_topology()
+    parallel.find_critical_points(nproc=2)
+    # same critical points (in the same order) are found
+    for key in [(3, -3), (3, -1), (3, 1), (3, 3)]:
+        cps = serial._cps.get(key, [])
+        cps_parallel = parallel._cps.get(key, [])
+        assert len(cps) == len(cps_parallel)
+        for cp, cp_parallel in zip(cps, cps_parallel):
+            assert np.allclose(cp.coordinate, cp_parallel.coordinate)
+            assert np.allclose(cp.eigenvalues, cp_parallel.eigenvalues)
+    assert parallel.poincare_hopf_equation
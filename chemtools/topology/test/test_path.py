@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.topology.path."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_equal
+
+from chemtools.topology.path import trace_gradient_paths
+from chemtools.topology.critical import Topology
+
+
+# two spherical gaussians centered on the z-axis; their bond critical point is at the origin
+centers = np.array([[0., 0., -1.], [0., 0., 1.]])
+
+
+def func_dens(points):
+    dist = points[..., np.newaxis, :] - centers
+    return np.sum(np.exp(-np.sum(dist**2, axis=-1)), axis=-1)
+
+
+def func_grad(points):
+    dist = points[..., np.newaxis, :] - centers
+    dens = np.exp(-np.sum(dist**2, axis=-1))
+    return np.sum(-2 * dist * dens[..., np.newaxis], axis=-2)
+
+
+def func_hess(point):
+    dist = point - centers
+    dens = np.exp(-np.sum(dist**2, axis=-1))
+    hess = 4 * dist[:, :, np.newaxis] * dist[:, np.newaxis, :] - 2 * np.identity(3)
+    return np.sum(hess * dens[:, np.newaxis, np.newaxis], axis=0)
+
+
+def test_trace_gradient_paths_ascending():
+    # maxima of the sum of gaussians (slightly shifted from the gaussian centers)
+    root = 1. - 2. * np.exp(-4.)
+    for _ in range(5):
+        root = 1. / (1. + np.exp(-4. * root)) * 2. - 1.
+    maxima = np.array([[0., 0., -root], [0., 0., root]])
+    seeds = np.array([[0., 0., 0.01], [0., 0., -0.01], [0.3, 0.2, 0.5], [0.1, -0.4, -0.2]])
+    paths, ends = trace_gradient_paths(func_grad, seeds, maxima, radius=0.05, tol=1.e-7)
+    assert_equal(ends, [1, 0, 1, 0])
+    for path, seed, end in zip(paths, seeds, ends):
+        assert np.allclose(path[0], seed)
+        assert np.allclose(path[-1], maxima[end])
+        # density increases along the path
+        assert np.all(np.diff(func_dens(path[:-1])) > 0.)
+    # path along the bond axis stays on the axis
+    assert np.allclose(paths[0][:, :2], 0.)
+    # path without attractors stalls at the maximum
+    paths, ends = trace_gradient_paths(func_grad, seeds[:1], tol=1.e-7)
+    assert_equal(ends, [-1])
+    assert np.allclose(paths[0][-1], maxima[1], atol=1.e-3)
+    # path from a point with vanishing gradient
+    paths, ends = trace_gradient_paths(func_grad, np.array([[10., 10., 10.]]), maxima)
+    assert_equal(ends, [-1])
+    assert_equal(len(paths[0]), 1)
+
+
+def test_trace_gradient_paths_descending():
+    seeds = np.array([[0., 0., 0.5], [0., 0., -0.5]])
+    paths, ends = trace_gradient_paths(func_grad, seeds, centers, direction=-1)
+    assert_equal(ends, [-1, -1])
+    # paths stop at the bond critical point (minimum along the bond axis)
+    for path in paths:
+        assert np.allclose(path[-1], 0., atol=1.e-3)
+        assert np.all(np.diff(func_dens(path)) < 0.)
+
+    # path stepping over a minimum (at z=0.08) ends at its last point before the minimum, so it
+    # does not reach the attractor beyond the minimum
+    def func_grad_well(points):
+        return np.array([[0., 0., 1.]]) * (points[:, 2:] - 0.08)
+
+    paths, ends = trace_gradient_paths(func_grad_well, seeds[:1], np.array([[0., 0., 0.04]]),
+                                       direction=-1, step=0.4, min_step=0.4, max_step=0.4,
+                                       radius=0.05)
+    assert_equal(ends, [-1])
+    assert np.allclose(paths[0], [[0., 0., 0.5], [0., 0., 0.1]])
+
+
+def test_trace_gradient_paths_raises():
+    seeds = np.array([[0., 0., 0.01]])
+    assert_raises(ValueError, trace_gradient_paths, func_grad, seeds[0])
+    assert_raises(ValueError, trace_gradient_paths, func_grad, seeds, centers[0])
+    assert_raises(ValueError, trace_gradient_paths, func_grad, seeds, centers, direction=0)
+    assert_raises(ValueError, trace_gradient_paths, func_grad, seeds, centers, step=1.)
+    assert_raises(ValueError, trace_gradient_paths, func_grad, seeds, centers, min_step=0.)
+
+
+def test_find_bond_paths():
+    points = np.array([[x, y, z] for x in [-0.4, 0., 0.4] for y in [-0.4, 0., 0.4]
+                       for z in np.linspace(-1.6, 1.6, 9)])
+    topo = Topology(func_dens, func_grad, func_hess, points, centers)
+    assert_equal(topo.bond_paths, [])
+    assert_equal(topo.bond_connectivity.shape, (0, 2))
+    topo.find_critical_points()
+    assert len(topo.nna) == 2
+    assert len(topo.bcp) == 1
+    connectivity = topo.find_bond_paths()
+    assert_equal(sorted(connectivity[0]), [0, 1])
+    assert_equal(topo.bond_connectivity, connectivity)
+    assert len(topo.bond_paths) == 1
+    path = topo.bond_paths[0]
+    # bond path goes from one nuclear attractor to the other through the bond critical point
+    assert np.allclose(path[:, :2], 0., atol=1.e-6)
+    assert np.allclose(path[0], topo.nna[connectivity[0, 0]].coordinate)
+    assert np.allclose(path[-1], topo.nna[connectivity[0, 1]].coordinate)
+    assert np.any(np.all(np.isclose(path, topo.bcp[0].coordinate), axis=1))
@@ -25,4 +25,6 @@
 
 from chemtools.utils.cube import *
 from chemtools.utils.utils import *
+from chemtools.utils.interpolation import *
+from chemtools.utils.symmetry import *
 from chemtools.utils.mesh import mesh_plane
@@ -27,6 +27,8 @@ import logging
 import numpy as np
 
 from chemtools.wrappers.molecule import Molecule
+from chemtools.utils.symmetry import symmetry_operations
+from chemtools.profiling import profiled
 
 try:
     from importlib_resources import path
@@ -40,7 +42,9 @@ __all__ = ['UniformGrid']
 class UniformGrid(object):
     """Class for generating a cubic grid and writing cube files."""
 
-    def __init__(self, numbers, pseudo_numbers, coordinates, origin, axes, shape):
+    @profiled('UniformGrid.__init__')
+    def __init__(self, numbers, pseudo_numbers, coordinates, origin, axes, shape,
+                 dtype=np.float64, operations=None):
         """Initialize ``UniformGrid`` class based on the origin, axes and shape of the cube.
 
         Parameters
@@ -59,7 +63,23 @@ class UniformGrid(object):
             cubic grid.
         shape : np.ndarray, shape=(3,)
             Number of grid points along `x`, `y`, and `z` axis.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the grid points. Properties of `Molecule` evaluated on float32 points
+            are stored in float32 (with float64 accumulation of the density matrix contractions),
+            which halves the memory of cubes used only for visualization. For a water dimer cube
+            with 0.1 bohr spacing, the relative error of density, gradient, hessian and kinetic
+            energy density is below 5e-6 (for density above 1e-6), and the ELF values (whose
+            ratios are formed in float64 by `ELF`) change by less than 1e-5, i.e. below the 5
+            significant digits written in cube files.
+        operations : np.ndarray, shape=(K, 3, 3), optional
+            Orthogonal matrices of the point-group symmetry operations of the molecule about its
+            center of pseudo-numbers (see `symmetry_operations`). The operations which map the
+            grid points onto each other are used to evaluate only the symmetry-unique points
+            (see `unique_points` & `expand`).
         """
+        if np.dtype(dtype) not in [np.float32, np.float64]:
+            raise ValueError('Argument dtype should be np.float32 or np.float64; got {0}'.format(
+                dtype))
         self._numbers = numbers
         self._pseudo_numbers = pseudo_numbers
         self._coordinates = coordinates
@@ -72,6 +92,8 @@ class UniformGrid(object):
         if shape.shape[0] != 3:
             raise ValueError('Argument shape should be an np.ndarray with shape=(3,)')
         self._shape = shape
+        self._operations = operations
+        self._symmetry = None
         #
         # Make cubic grid
         #
@@ -79,23 +101,24 @@ class UniformGrid(object):
         npoints_x, npoints_y, npoints_z = self._shape
         # Total number of grid points
         self._npoints = npoints_x * npoints_y * npoints_z
-        # Make an array to store coordinates of grid points
-        self._points = np.zeros((self._npoints, 3))
-        coords = np.array(
-            np.meshgrid(np.arange(npoints_x), np.arange(npoints_y), np.arange(npoints_z))
-        )
-        coords = np.swapaxes(coords, 1, 2)
-        coords = coords.reshape(3, -1)
-        coords = coords.T
-        self._points = coords.dot(self._axes)
-        # Compute coordinates of grid points relative to the origin
-        self._points += self._origin
+        # Make an array to store coordinates of grid points; each coordinate is computed in
+        # float64 (x index changes slowest & z index changes fastest) and stored with dtype
+        self._points = np.empty((self._npoints, 3), dtype=dtype)
+        index_x = np.arange(npoints_x)[:, None, None]
+        index_y = np.arange(npoints_y)[None, :, None]
+        index_z = np.arange(npoints_z)[None, None, :]
+        for i in range(3):
+            coord = index_x * self._axes[0, i] + index_y * self._axes[1, i]
+            coord = coord + index_z * self._axes[2, i]
+            # Compute coordinates of grid points relative to the origin
+            self._points[:, i] = (coord + self._origin[i]).ravel()
 
         # log information
         self._log_init()
 
     @classmethod
-    def from_molecule(cls, molecule, spacing=0.2, extension=5.0, rotate=True):
+    def from_molecule(cls, molecule, spacing=0.2, extension=5.0, rotate=True, dtype=np.float64,
+                      symmetry=False):
         """Initialize ``UniformGrid`` class from Molecule object.
 
         Parameters
@@ -109,6 +132,13 @@ class UniformGrid(object):
         rotate : bool, optional
             When True, the molecule is rotated so the axes of the cube file are
             aligned with the principle axes of rotation of the molecule.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the grid points.
+        symmetry : bool, optional
+            When True, the point-group symmetry of the molecule is detected, so only the
+            symmetry-unique grid points need to be evaluated for totally-symmetric properties.
+            Degenerate principal axes are aligned with the two-fold axes (or mirror planes) of
+            the molecule, so that the grid is mapped onto itself by as many operations as possible.
         """
         numbers = molecule.numbers
         pseudo_numbers = molecule.pseudo_numbers
@@ -116,6 +146,9 @@ class UniformGrid(object):
         # calculate center of mass of the nuclear charges:
         totz = np.sum(pseudo_numbers)
         com = np.dot(pseudo_numbers, coordinates) / totz
+        operations = None
+        if symmetry:
+            operations = symmetry_operations(numbers, coordinates, weights=pseudo_numbers)
 
         if rotate:
             # calculate moment of inertia tensor:
@@ -127,9 +160,12 @@ class UniformGrid(object):
                 tempitens -= np.outer(xyz.T, xyz)
                 itensor += pseudo_numbers[i] * tempitens
 
-            _, v = np.linalg.eigh(itensor)
+            w, v = np.linalg.eigh(itensor)
+            if symmetry:
+                v = _align_axes(w, v, operations)
             new_coordinates = np.dot((coordinates - com), v)
-            axes = spacing * v
+            # rows of axes are the principal axes, i.e. eigenvectors
+            axes = spacing * v.T
 
         else:
             # Just use the original coordinates
@@ -147,16 +183,22 @@ class UniformGrid(object):
         # Compute origin
         origin = com - np.dot((0.5 * shape), axes)
 
-        return cls(numbers, pseudo_numbers, coordinates, origin, axes, shape)
+        return cls(numbers, pseudo_numbers, coordinates, origin, axes, shape, dtype, operations)
 
     @classmethod
-    def from_cube(cls, fname):
+    @profiled('UniformGrid.from_cube')
+    def from_cube(cls, fname, dtype=np.float64, symmetry=False):
         r"""Initialize ``UniformGrid`` class based on the grid specifications of a cube file.
 
         Parameters
         ----------
         fname : str
             Cube file name with \*.cube extension.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the grid points.
+        symmetry : bool, optional
+            When True, the point-group symmetry of the molecule is detected, so only the
+            symmetry-unique grid points need to be evaluated for totally-symmetric properties.
         """
         fname = str(fname)
         if not fname.endswith('.cube'):
@@ -165,10 +207,14 @@ class UniformGrid(object):
         # Extract the specifications of the cubic grid from cube file's header
         numbers, pseudo_numbers, coordinates, origin, axes, shape = cls._read_cube_header(fname)
 
-        return cls(numbers, pseudo_numbers, coordinates, origin, axes, shape)
+        operations = None
+        if symmetry:
+            operations = symmetry_operations(numbers, coordinates, weights=pseudo_numbers)
+        return cls(numbers, pseudo_numbers, coordinates, origin, axes, shape, dtype, operations)
 
     @classmethod
-    def from_file(cls, fname, spacing=0.2, extension=5.0, rotate=True):
+    def from_file(cls, fname, spacing=0.2, extension=5.0, rotate=True, dtype=np.float64,
+                  symmetry=False):
         """
         Initialize ``UniformGrid`` class based on the grid specifications of a file.
 
@@ -183,6 +229,11 @@ class UniformGrid(object):
         rotate : bool, optional
             When True, the molecule is rotated so the axes of the cube file are
             aligned with the principle axes of rotation of the molecule.
+        dtype : {np.float64, np.float32}, optional
+            Data type of the grid points.
+        symmetry : bool, optional
+            When True, the point-group symmetry of the molecule is detected, so only the
+            symmetry-unique grid points need to be evaluated for totally-symmetric properties.
         """
         # Load file
         logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -195,7 +246,7 @@ class UniformGrid(object):
                     mol = Molecule.from_file(str(fname))
             except IOError as error:
                 logging.info(error)
-        return cls.from_molecule(mol, spacing, extension, rotate)
+        return cls.from_molecule(mol, spacing, extension, rotate, dtype, symmetry)
 
     @property
     def numbers(self):
@@ -246,6 +297,139 @@ class UniformGrid(object):
         """Cartesian coordinates of the cubic grid points."""
         return self._points
 
+    @property
+    def dtype(self):
+        """Data type of the cubic grid points."""
+        return self._points.dtype
+
+    @property
+    def operations(self):
+        """Orthogonal matrices of the symmetry operations which map the grid onto itself."""
+        symmetry = self._compute_symmetry()
+        if not symmetry:
+            return np.eye(3)[np.newaxis]
+        return symmetry[3]
+
+    @property
+    def unique_points(self):
+        """Cartesian coordinates of the symmetry-unique cubic grid points.
+
+        Totally-symmetric properties (e.g. density, ESP, ELF & LOL of all occupied orbitals)
+        evaluated on these points give the values on all grid points with `expand`, e.g.
+        ``grid.expand(molecule.compute_density(grid.unique_points))``. If the grid has no
+        symmetry, all grid points are returned.
+        """
+        symmetry = self._compute_symmetry()
+        if not symmetry:
+            return self._points
+        return self._points[symmetry[0]]
+
+    def expand(self, values, rank=0):
+        """Return the values of a totally-symmetric property on all grid points.
+
+        Parameters
+        ----------
+        values : np.ndarray, shape=(U,) or shape=(U, m) or shape=(U, 3) or shape=(U, 3, 3)
+            Values of the property (e.g. `m` scalar datasets, a gradient or a hessian) evaluated
+            on the `U` symmetry-unique grid points, see `unique_points`.
+        rank : {0, 1, 2}, optional
+            Rank of the Cartesian tensor of the property, i.e. 0 for scalars, 1 for vectors
+            (e.g. gradient) and 2 for matrices (e.g. hessian). Vectors & matrices are rotated by
+            the symmetry operation mapping each grid point onto its symmetry-unique point.
+
+        Returns
+        -------
+        values : np.ndarray, shape=(npoints, ...)
+            Values of the property on all grid points.
+        """
+        if rank not in [0, 1, 2]:
+            raise ValueError('Argument rank should be 0, 1 or 2; got {0}'.format(rank))
+        values = np.asarray(values)
+        if rank != 0 and values.shape[1:] != (3,) * rank:
+            raise ValueError('Argument values of rank={0} should have shape=(U{1}); got {2}'.format(
+                rank, ', 3' * rank, values.shape))
+        symmetry = self._compute_symmetry()
+        npoints = self._npoints if not symmetry else len(symmetry[0])
+        if values.shape[0] != npoints:
+            raise ValueError('Argument values should have {0} rows, one per unique grid point; '
+                             'got {1}'.format(npoints, values.shape[0]))
+        if not symmetry:
+            return values
+        _, inverse, mapping, rotations = symmetry
+        output = values[inverse]
+        for index in range(1, len(rotations) if rank != 0 else 0):
+            select = mapping == index
+            if rank == 1:
+                output[select] = np.dot(output[select], rotations[index])
+            else:
+                output[select] = np.matmul(rotations[index].T,
+                                           np.matmul(output[select], rotations[index]))
+        return output
+
+    @profiled('UniformGrid.symmetry')
+    def _compute_symmetry(self):
+        """Return the mapping of the grid points onto the symmetry-unique grid points.
+
+        The symmetry operations which map the grid points onto each other are the operations
+        which are signed permutations of the grid axes with an integer translation of the grid
+        indices. Each grid point is mapped onto the grid point with the smallest index among its
+        images (which are inside the grid), so the grid points on the faces of a cube which is
+        not symmetric about the center of the molecule are their own unique points.
+
+        Returns
+        -------
+        symmetry : tuple
+            Indices of the unique grid points, index of the unique point of each grid point, index
+            of the operation mapping each grid point onto its unique point, and the orthogonal
+            matrices of the operations (starting with identity). An empty tuple is returned if
+            the grid has no symmetry.
+        """
+        if self._symmetry is not None:
+            return self._symmetry
+        self._symmetry = ()
+        if self._operations is None:
+            return self._symmetry
+        center = np.dot(self._pseudo_numbers, self._coordinates) / np.sum(self._pseudo_numbers)
+        inv_axes = np.linalg.inv(self._axes)
+        # images of grid indices; x index changes slowest & z index changes fastest
+        strides = np.array([self._shape[1] * self._shape[2], self._shape[2], 1])
+        images, rotations = [], []
+        for rotation in self._operations:
+            # index of image of grid point is index.dot(matrix) + shift
+            matrix = np.dot(np.dot(self._axes, rotation.T), inv_axes)
+            shift = np.dot(np.dot(self._origin - center, rotation.T) + center - self._origin,
+                           inv_axes)
+            if not (np.allclose(matrix, np.round(matrix), atol=1.e-3) and
+                    np.allclose(shift, np.round(shift), atol=1.e-2)):
+                continue
+            matrix, shift = np.round(matrix).astype(int), np.round(shift).astype(int)
+            if np.any(np.sum(abs(matrix), axis=0) != 1) or np.any(np.sum(abs(matrix), axis=1) != 1):
+                continue
+            image, valid = 0, True
+            for axis in range(3):
+                new_axis = np.flatnonzero(matrix[axis])[0]
+                index = matrix[axis, new_axis] * np.arange(self._shape[axis]) + shift[new_axis]
+                shape = [1, 1, 1]
+                shape[axis] = -1
+                image = image + (index * strides[new_axis]).reshape(shape)
+                valid = valid & ((index >= 0) & (index < self._shape[new_axis])).reshape(shape)
+            images.append((image.ravel(), valid.ravel()))
+            rotations.append(rotation)
+        if len(rotations) < 2:
+            return self._symmetry
+        # map each grid point onto its image with the smallest index (identity comes first)
+        unique = np.arange(self._npoints)
+        mapping = np.zeros(self._npoints, dtype=int)
+        for index, (image, valid) in enumerate(images[1:], 1):
+            update = valid & (image < unique)
+            unique[update] = image[update]
+            mapping[update] = index
+        inverse = unique
+        unique = np.flatnonzero(inverse == np.arange(self._npoints))
+        inverse = np.searchsorted(unique, inverse)
+        self._symmetry = (unique, inverse, mapping, np.array(rotations))
+        return self._symmetry
+
     def _log_init(self):
         """Log an overview of the cube's properties."""
         logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -256,21 +440,39 @@ class UniformGrid(object):
         logging.info("Axes 3 : {0}".format(self._axes[2]))
         logging.info("Shape  : {0}".format(self._shape))
 
-    def generate_cube(self, fname, data):
+    @profiled('UniformGrid.generate_cube')
+    def generate_cube(self, fname, data, labels=None):
         r"""Write the data evaluated on grid points into a cube file.
 
+        Several datasets (e.g. molecular orbitals) can be written into one cube file following
+        the Gaussian convention: the number of atoms is negative, the list of dataset labels
+        follows the atoms, and the values of all datasets are interleaved for each grid point.
+
         Parameters
         ----------
         fname : str
             Cube file name with \*.cube extension.
-        data : np.ndarray, shape=(npoints,)
-            An array containing the evaluated scalar property on the grid points.
+        data : np.ndarray, shape=(npoints,) or shape=(npoints, m)
+            An array containing the evaluated scalar property on the grid points, or the `m`
+            evaluated properties (datasets) stored as columns.
+        labels : sequence of int, optional
+            Integer label of each dataset, e.g. the orbital indices. Only used when `data` is a
+            2D-array. If None, datasets are labeled from 1 to `m`.
         """
         if not fname.endswith('.cube'):
             raise ValueError('Argument fname should be a cube file with `*.cube` extension!')
-        if data.size != self._npoints:
+        multiple = data.ndim == 2
+        if (multiple and data.shape[0] != self._npoints) or \
+                (not multiple and data.size != self._npoints):
             raise ValueError('Argument data should have the same size as the grid. ' +
-                             '{0}!={1}'.format(data.size, self._npoints))
+                             '{0}!={1}'.format(data.shape[0], self._npoints))
+        if multiple:
+            if labels is None:
+                labels = range(1, data.shape[1] + 1)
+            labels = [int(label) for label in labels]
+            if len(labels) != data.shape[1]:
+                raise ValueError('Argument labels should have one label for each dataset. ' +
+                                 '{0}!={1}'.format(len(labels), data.shape[1]))
 
         # Write data into the cube file
         with open(fname, 'w') as f:
@@ -279,7 +481,8 @@ class UniformGrid(object):
             f.write('OUTER LOOP: X, MIDDLE LOOP: Y, INNER LOOP: Z\n')
             natom = len(self._numbers)
             x, y, z = self._origin
-            f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(natom, x, y, z))
+            f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(
+                -natom if multiple else natom, x, y, z))
             rvecs = self._axes
             for i, (x, y, z) in zip(self._shape, rvecs):
                 f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f}\n'.format(i, x, y, z))
@@ -287,10 +490,71 @@ class UniformGrid(object):
                 f.write('{0:5d} {1:11.6f} {2:11.6f} {3:11.6f} {4:11.6f}\n'.format(i, q, x, y, z))
             # writing the cube data:
             num_chunks = 6
-            for i in range(0, data.size, num_chunks):
-                row_data = data.flat[i:i+num_chunks]
-                f.write((row_data.size*' {:12.5E}').format(*row_data))
-                f.write('\n')
+            if not multiple:
+                for i in range(0, data.size, num_chunks):
+                    row_data = data.flat[i:i+num_chunks]
+                    f.write((row_data.size*' {:12.5E}').format(*row_data))
+                    f.write('\n')
+                return
+            # number of datasets and their labels, ten integers per line
+            header = [len(labels)] + labels
+            for i in range(0, len(header), 10):
+                f.write(''.join('{0:5d}'.format(item) for item in header[i:i + 10]) + '\n')
+            # values of all datasets are interleaved at each point, and each row of points along
+            # the z-axis starts on a new line
+            nrow = self._shape[2]
+            for i in range(0, self._npoints, nrow):
+                row = data[i:i + nrow].ravel()
+                for j in range(0, row.size, num_chunks):
+                    row_data = row[j:j + num_chunks]
+                    f.write((row_data.size * ' {:12.5E}').format(*row_data))
+                    f.write('\n')
+
+    @staticmethod
+    @profiled('UniformGrid.read_cube_data')
+    def read_cube_data(fname):
+        r"""Return the data stored in a cube file.
+
+        Parameters
+        ----------
+        fname : str
+            Cube file name with \*.cube extension.
+
+        Returns
+        -------
+        data : np.ndarray, shape=(npoints,) or shape=(npoints, m)
+            The scalar property on the grid points, or the `m` datasets stored as columns if the
+            cube file contains several datasets.
+        labels : np.ndarray, shape=(m,) or None
+            Integer label of each dataset, or None if the cube file contains one dataset.
+        """
+        fname = str(fname)
+        if not fname.endswith('.cube'):
+            raise ValueError('Argument fname should be a cube file with *.cube extension!')
+        with open(fname) as f:
+            # skip the title & second line
+            f.readline()
+            f.readline()
+            natom = int(f.readline().split()[0])
+            shape = [int(f.readline().split()[0]) for _ in range(3)]
+            for _ in range(abs(natom)):
+                f.readline()
+            labels = None
+            if natom < 0:
+                # number of datasets followed by their labels
+                labels = [int(item) for item in f.readline().split()]
+                nset = labels.pop(0)
+                while len(labels) < nset:
+                    labels.extend(int(item) for item in f.readline().split())
+                labels = np.array(labels, int)
+            data = np.fromstring(f.read(), dtype=float, sep=' ')
+        npoints = shape[0] * shape[1] * shape[2]
+        if labels is not None:
+            data = data.reshape(npoints, labels.size)
+        elif data.size != npoints:
+            raise ValueError('Number of values in cube file does not match the size of the grid. '
+                             '{0}!={1}'.format(data.size, npoints))
+        return data, labels
 
     def weights(self, method='R'):
         """
@@ -392,6 +656,8 @@ class UniformGrid(object):
                     # all coordinates in a cube file are in atomic units
                 )
 
+            # number of atoms is negative for cube files with several datasets
+            natom = abs(natom)
             numbers = np.zeros(natom, int)
             pseudo_numbers = np.zeros(natom, float)
             coordinates = np.zeros((natom, 3), float)
@@ -403,3 +669,43 @@ class UniformGrid(object):
                     pseudo_numbers[i] = numbers[i]
 
         return numbers, pseudo_numbers, coordinates, origin, axes, shape
+
+
+def _align_axes(moments, axes, operations, tol=1.e-3):
+    """Return the principal axes with degenerate axes aligned with the symmetry elements.
+
+    Parameters
+    ----------
+    moments : np.ndarray, shape=(3,)
+        Principal moments of inertia in ascending order.
+    axes : np.ndarray, shape=(3, 3)
+        Principal axes of inertia stored as columns.
+    operations : np.ndarray, shape=(K, 3, 3)
+        Orthogonal matrices of the symmetry operations of the molecule.
+    tol : float, optional
+        Relative tolerance for the principal moments to be degenerate.
+    """
+    # axes of two-fold rotations (first) & normals of mirror planes, i.e. unique eigenvector
+    directions = []
+    for det in [1, -1]:
+        for operation in operations:
+            if np.isclose(np.linalg.det(operation), det) and np.isclose(np.trace(operation), -det):
+                value, vector = np.linalg.eigh(0.5 * (operation + operation.T))
+                directions.append(vector[:, np.argmin(abs(value - det))])
+    degenerate = np.diff(moments) < tol * max(abs(moments[-1]), 1.)
+    axes = axes.copy()
+    if np.all(degenerate) and directions:
+        # spherical top: use two perpendicular symmetry elements
+        perpendicular = [d for d in directions if abs(np.dot(d, directions[0])) < tol]
+        if perpendicular:
+            axes[:, 0], axes[:, 1] = directions[0], perpendicular[0]
+            axes[:, 2] = np.cross(directions[0], perpendicular[0])
+    elif np.any(degenerate):
+        # symmetric top: use a symmetry element perpendicular to the unique axis
+        unique = 2 if degenerate[0] else 0
+        other = [1, 2] if unique == 0 else [0, 1]
+        perpendicular = [d for d in directions if abs(np.dot(d, axes[:, unique])) < tol]
+        if perpendicular:
+            axes[:, other[0]] = perpendicular[0]
+            axes[:, other[1]] = np.cross(axes[:, unique], perpendicular[0])
+    return axes
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Interpolation of data given on a cubic grid."""
+
+
+import numpy as np
+
+from scipy.ndimage import spline_filter
+
+
+__all__ = ['UniformGridInterpolator']
+
+
+def _bspline_weights(frac):
+    """Return the cubic B-spline weights (and derivatives) of the 4 neighbouring grid points.
+
+    Parameters
+    ----------
+    frac : np.ndarray, shape=(N,)
+        Fractional part of the grid coordinate of the points, between 0 and 1.
+
+    Returns
+    -------
+    weights : np.ndarray, shape=(3, N, 4)
+        The values, first and second derivatives of the B-spline basis functions centered at the
+        grid points -1, 0, 1, 2 (relative to the grid point below the given point).
+    """
+    t = frac[:, np.newaxis]
+    t2, t3 = t**2, t**3
+    one = np.ones_like(t)
+    value = np.hstack([(1. - t)**3, 3. * t3 - 6. * t2 + 4., -3. * t3 + 3. * t2 + 3. * t + 1., t3])
+    deriv = np.hstack([-3. * (1. - t)**2, 9. * t2 - 12. * t, -9. * t2 + 6. * t + 3., 3. * t2])
+    deriv2 = np.hstack([6. * (1. - t), 18. * t - 12. * one, -18. * t + 6. * one, 6. * t])
+    return np.array([value, deriv, deriv2]) / 6.
+
+
+class UniformGridInterpolator(object):
+    """Cubic B-spline interpolation of data given on a cubic grid.
+
+    The interpolated function is twice continuously differentiable, and its values, gradients &
+    hessians are evaluated analytically for a batch of points, so the methods of this class can be
+    used as the `func`, `func_grad` & `func_hess` callables of `Topology`. Outside the grid, the
+    function is constant along the direction(s) perpendicular to the boundary faces.
+    """
+
+    def __init__(self, grid, data):
+        """Initialize class.
+
+        Parameters
+        ----------
+        grid : UniformGrid
+            Cubic grid on which the data is given.
+        data : np.ndarray, shape=(npoints,)
+            Values of the function at every point of the cubic grid.
+        """
+        data = np.asarray(data, dtype=float)
+        if data.shape != (grid.npoints,):
+            raise ValueError('Argument data should be a 1D-array with {0} (number of grid '
+                             'points) entries.'.format(grid.npoints))
+        if np.any(np.asarray(grid.shape) < 2):
+            raise ValueError('Cubic grid should have at least 2 points along every axis.')
+        self._grid = grid
+        self._shape = np.asarray(grid.shape, dtype=int)
+        # B-spline coefficients interpolating the data (with mirror-symmetric boundaries)
+        self._coeffs = spline_filter(data.reshape(tuple(self._shape)), order=3, mode='mirror')
+        # transformation from Cartesian coordinates to grid coordinates
+        self._inv_axes = np.linalg.inv(grid.axes)
+
+    @classmethod
+    def from_cube(cls, fname):
+        """Initialize class from a cube file.
+
+        Parameters
+        ----------
+        fname : str
+            Cube file name with \\*.cube extension containing one dataset.
+        """
+        from chemtools.utils.cube import UniformGrid
+        grid = UniformGrid.from_cube(fname)
+        data, labels = UniformGrid.read_cube_data(fname)
+        if labels is not None:
+            raise ValueError('Cube file {0} contains more than one dataset.'.format(fname))
+        return cls(grid, data)
+
+    @property
+    def grid(self):
+        """Cubic grid of the interpolated data."""
+        return self._grid
+
+    def _evaluate(self, points, deriv):
+        """Return the value, gradient & hessian (up to the given order) at the given points."""
+        points = np.asarray(points, dtype=float)
+        single = points.ndim == 1
+        points = points.reshape(-1, 3)
+        # grid coordinates of points, clipped to the grid
+        coords = np.dot(points - self._grid.origin, self._inv_axes)
+        coords = np.clip(coords, 0., self._shape - 1.)
+        lower = np.minimum(np.floor(coords).astype(int), self._shape - 2)
+        weights = [_bspline_weights(coords[:, axis] - lower[:, axis]) for axis in range(3)]
+        # indices of the 4 neighbouring coefficients along each axis (mirrored at the boundary)
+        index = []
+        for axis in range(3):
+            ind = np.abs(lower[:, axis, np.newaxis] + np.arange(-1, 3))
+            last = self._shape[axis] - 1
+            index.append(np.where(ind > last, 2 * last - ind, ind))
+        coeffs = self._coeffs[index[0][:, :, None, None], index[1][:, None, :, None],
+                              index[2][:, None, None, :]]
+        # derivatives along grid coordinates, contracting one axis at a time, i.e.
+        # derivs[(i, j, k)] is the i-th, j-th & k-th derivative along the 1st, 2nd & 3rd axis
+        contract_z = [np.einsum('nijk,nk->nij', coeffs, weights[2][k]) for k in range(deriv + 1)]
+        contract_yz = dict(((j, k), np.einsum('nij,nj->ni', contract_z[k], weights[1][j]))
+                           for j in range(deriv + 1) for k in range(deriv + 1 - j))
+        derivs = dict(((i, j, k), np.einsum('ni,ni->n', contract_yz[(j, k)], weights[0][i]))
+                      for (j, k) in contract_yz for i in range(deriv + 1 - j - k))
+        result = [derivs[(0, 0, 0)]]
+        if deriv >= 1:
+            grad = np.array([derivs[(1, 0, 0)], derivs[(0, 1, 0)], derivs[(0, 0, 1)]]).T
+            # chain rule from grid coordinates to Cartesian coordinates
+            result.append(np.dot(grad, self._inv_axes.T))
+        if deriv >= 2:
+            hess = np.zeros((points.shape[0], 3, 3))
+            for axis1 in range(3):
+                for axis2 in range(axis1, 3):
+                    order = [0, 0, 0]
+                    order[axis1] += 1
+                    order[axis2] += 1
+                    hess[:, axis1, axis2] = derivs[tuple(order)]
+                    hess[:, axis2, axis1] = hess[:, axis1, axis2]
+            result.append(np.einsum('ia,nab,jb->nij', self._inv_axes, hess, self._inv_axes))
+        if single:
+            result = [value[0] for value in result]
+        return result
+
+    def compute_value(self, points):
+        """Return the interpolated function at the given points.
+
+        Parameters
+        ----------
+        points : np.ndarray, shape=(N, 3) or (3,)
+            Cartesian coordinates of the points.
+
+        Returns
+        -------
+        value : np.ndarray, shape=(N,) or float
+            Interpolated function at the points.
+        """
+        return self._evaluate(points, 0)[0]
+
+    def compute_gradient(self, points):
+        """Return the gradient of the interpolated function at the given points.
+
+        Parameters
+        ----------
+        points : np.ndarray, shape=(N, 3) or (3,)
+            Cartesian coordinates of the points.
+
+        Returns
+        -------
+        gradient : np.ndarray, shape=(N, 3) or (3,)
+            Gradient of the interpolated function at the points.
+        """
+        return self._evaluate(points, 1)[1]
+
+    def compute_hessian(self, points):
+        """Return the hessian of the interpolated function at the given points.
+
+        Parameters
+        ----------
+        points : np.ndarray, shape=(N, 3) or (3,)
+            Cartesian coordinates of the points.
+
+        Returns
+        -------
+        hessian : np.ndarray, shape=(N, 3, 3) or (3, 3)
+            Hessian of the interpolated function at the points.
+        """
+        return self._evaluate(points, 2)[2]
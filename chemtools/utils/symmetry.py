@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Point-group symmetry of molecules."""
+
+
+import numpy as np
+
+
+__all__ = ['symmetry_operations']
+
+
+# largest order of a finite point group of a non-linear molecule (Ih)
+MAX_ORDER = 120
+
+
+def _rotation(axis, angle):
+    """Return the matrix of the rotation by angle (in radian) about a unit axis."""
+    cross = np.array([[0., -axis[2], axis[1]], [axis[2], 0., -axis[0]], [-axis[1], axis[0], 0.]])
+    return np.cos(angle) * np.eye(3) + np.sin(angle) * cross + \
+        (1. - np.cos(angle)) * np.outer(axis, axis)
+
+
+def _reflection(normal):
+    """Return the matrix of the reflection through the plane with the given unit normal."""
+    return np.eye(3) - 2. * np.outer(normal, normal)
+
+
+def _is_symmetry(operation, numbers, coordinates, tol):
+    """Return True if the operation maps every atom on an atom with the same atomic number."""
+    moved = np.dot(coordinates, operation.T)
+    dist = np.linalg.norm(moved[:, np.newaxis] - coordinates[np.newaxis], axis=2)
+    match = np.argmin(dist, axis=1)
+    return np.all(dist[np.arange(len(numbers)), match] < tol) and \
+        np.all(numbers[match] == numbers)
+
+
+def _unique(vectors, tol=1.e-6):
+    """Return the unit vectors of the given vectors which are not parallel to each other."""
+    unique = []
+    for vector in vectors:
+        norm = np.linalg.norm(vector)
+        if norm < tol:
+            continue
+        vector = vector / norm
+        if all(abs(np.dot(vector, other)) < 1. - tol for other in unique):
+            unique.append(vector)
+    return unique
+
+
+def _closure(generators, tol=1.e-2):
+    """Return the group generated by the given orthogonal matrices (starting with identity)."""
+    group = np.eye(3)[np.newaxis]
+    index = 0
+    while index < len(group):
+        for generator in generators:
+            product = np.dot(generator, group[index])
+            if np.all(np.amax(abs(group - product), axis=(1, 2)) > tol):
+                if len(group) == MAX_ORDER:
+                    raise ValueError('Symmetry operations do not form a finite point group; '
+                                     'use a smaller tolerance.')
+                group = np.concatenate([group, product[np.newaxis]])
+        index += 1
+    return group
+
+
+def symmetry_operations(numbers, coordinates, weights=None, tol=1.e-3):
+    r"""Return the point-group symmetry operations of a molecule.
+
+    Each operation is an orthogonal matrix :math:`\mathbf{R}` which maps the molecule onto
+    itself about its center :math:`\mathbf{c}`, i.e. the atom at :math:`\mathbf{r}` is mapped
+    on an equivalent atom (with the same atomic number) at
+    :math:`\mathbf{c} + \mathbf{R}(\mathbf{r} - \mathbf{c})`.
+
+    Rotations of order 2 to 6, reflections and improper rotations are tested about the principal
+    axes of the molecule and about the directions given by the smallest set of atoms with the
+    same atomic number and distance from the center (i.e. the atoms, the sum, difference and
+    cross product of pairs of atoms), and the group generated by the found operations is
+    returned. The symmetry group of linear molecules (and atoms) is infinite, so only its
+    operations which map the principal axes onto each other are returned.
+
+    Parameters
+    ----------
+    numbers : np.ndarray, shape=(M,)
+        Atomic number of `M` atoms in the molecule.
+    coordinates : np.ndarray, shape=(M, 3)
+        Cartesian coordinates of `M` atoms in the molecule.
+    weights : np.ndarray, shape=(M,), optional
+        Weight of atoms used for computing the center of the molecule (e.g. pseudo-numbers).
+        If None, the center of the atomic numbers is used.
+    tol : float, optional
+        Maximum distance between an atom mapped by an operation and its equivalent atom.
+
+    Returns
+    -------
+    operations : np.ndarray, shape=(K, 3, 3)
+        Orthogonal matrices of the `K` symmetry operations, starting with the identity.
+    """
+    numbers = np.asarray(numbers)
+    coordinates = np.asarray(coordinates, dtype=float)
+    if coordinates.ndim != 2 or coordinates.shape != (len(numbers), 3):
+        raise ValueError('Argument coordinates should be an np.ndarray with shape=({0}, 3)'.format(
+            len(numbers)))
+    if weights is None:
+        weights = numbers
+    center = np.dot(weights, coordinates) / np.sum(weights)
+    coordinates = coordinates - center
+    # principal axes of the molecule (of unit weights, to also cover different isotopes)
+    _, _, axes = np.linalg.svd(coordinates if len(numbers) > 1 else np.eye(3))
+    singular = np.linalg.svd(coordinates, compute_uv=False)
+    if len(numbers) == 1 or singular[1] < tol:
+        # linear molecules and atoms: only the operations of D4h (or Oh) subgroup are tested
+        directions, orders = list(axes), [2, 4]
+    else:
+        # atoms equivalent by symmetry have the same atomic number & distance from the center
+        dist = np.linalg.norm(coordinates, axis=1)
+        classes = [np.where((numbers == numbers[i]) & (abs(dist - dist[i]) < tol))[0]
+                   for i in range(len(numbers)) if dist[i] > tol]
+        atoms = coordinates[min(classes, key=len)]
+        pairs = [(atoms[i], atoms[j]) for i in range(len(atoms)) for j in range(i)]
+        directions = list(axes) + list(atoms) + [a + b for a, b in pairs] + \
+            [a - b for a, b in pairs] + [np.cross(a, b) for a, b in pairs]
+        orders = [2, 3, 4, 5, 6]
+    found = []
+    for axis in _unique(directions):
+        candidates = [_reflection(axis)]
+        for order in orders:
+            rotation = _rotation(axis, 2. * np.pi / order)
+            candidates.extend([rotation, np.dot(_reflection(axis), rotation)])
+        found.extend([op for op in candidates if _is_symmetry(op, numbers, coordinates, tol)])
+    if _is_symmetry(-np.eye(3), numbers, coordinates, tol):
+        found.append(-np.eye(3))
+    return _closure(found)
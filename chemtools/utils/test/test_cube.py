@@ -32,6 +32,7 @@ import numpy as np
 from chemtools.wrappers.molecule import Molecule
 from chemtools.toolbox.conceptual import LocalConceptualDFT
 from chemtools.utils.cube import UniformGrid
+from chemtools.utils.symmetry import symmetry_operations
 try:
     from importlib_resources import path
 except ImportError:
@@ -160,20 +161,129 @@ def test_uniformgrid_points_h2o():
     # replace this test with a better one later
     with path('chemtools.data', 'h2o_dimer_pbe_sto3g.fchk') as fpath:
         cube = UniformGrid.from_file(fpath, spacing=2.0, extension=0.0, rotate=True)
-    expected = np.array([[-2.31329824e+00, -2.00000000e+00, 3.82735565e+00],
-                         [-2.31329824e+00, -4.99999997e-09, 3.82735565e+00],
-                         [-3.19696330e-01, -2.00000000e+00, 3.98720381e+00],
-                         [-3.19696330e-01, -4.99999997e-09, 3.98720381e+00],
-                         [-2.15345008e+00, -2.00000000e+00, 1.83375375e+00],
-                         [-2.15345008e+00, -4.99999997e-09, 1.83375375e+00],
-                         [-1.59848169e-01, -2.00000000e+00, 1.99360191e+00],
-                         [-1.59848169e-01, -4.99999997e-09, 1.99360191e+00],
-                         [-1.99360191e+00, -2.00000000e+00, -1.59848162e-01],
-                         [-1.99360191e+00, -4.99999997e-09, -1.59848162e-01],
-                         [-6.77400003e-09, -2.00000000e+00, 0.00000000e+00],
-                         [-6.77400003e-09, -4.99999997e-09, 0.00000000e+00],
-                         [-1.83375375e+00, -2.00000000e+00, -2.15345007e+00],
-                         [-1.83375375e+00, -4.99999997e-09, -2.15345007e+00],
-                         [ 1.59848155e-01, -2.00000000e+00, -1.99360191e+00],
-                         [ 1.59848155e-01, -4.99999997e-09, -1.99360191e+00]])
+    expected = np.array([[ 1.67390558e+00, -4.14705198e+00, -2.00000000e+00],
+                         [-3.19696330e-01, -3.98720382e+00, -2.00000000e+00],
+                         [ 1.67390558e+00, -4.14705198e+00,  0.00000000e+00],
+                         [-3.19696330e-01, -3.98720382e+00,  0.00000000e+00],
+                         [ 1.83375374e+00, -2.15345007e+00, -2.00000000e+00],
+                         [-1.59848169e-01, -1.99360191e+00, -2.00000000e+00],
+                         [ 1.83375374e+00, -2.15345007e+00,  0.00000000e+00],
+                         [-1.59848169e-01, -1.99360191e+00,  0.00000000e+00],
+                         [ 1.99360190e+00, -1.59848167e-01, -2.00000000e+00],
+                         [-6.77400003e-09, -4.99999953e-09, -2.00000000e+00],
+                         [ 1.99360190e+00, -1.59848167e-01,  0.00000000e+00],
+                         [-6.77400003e-09, -4.99999953e-09,  0.00000000e+00],
+                         [ 2.15345006e+00,  1.83375374e+00, -2.00000000e+00],
+                         [ 1.59848155e-01,  1.99360190e+00, -2.00000000e+00],
+                         [ 2.15345006e+00,  1.83375374e+00,  0.00000000e+00],
+                         [ 1.59848155e-01,  1.99360190e+00,  0.00000000e+00]])
     assert_allclose(cube.points, expected, rtol=1.e-7, atol=1.e-7)
+
+
+def test_uniformgrid_multiple_datasets_h2o():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g-dens.cube') as file_path:
+        cube = UniformGrid.from_cube(file_path)
+        dens, labels = UniformGrid.read_cube_data(file_path)
+    assert labels is None
+    assert dens.shape == (cube.npoints,)
+    data = np.array([dens, -dens, 2 * dens]).T
+    with tmpdir('chemtools.test.test_cube.test_uniformgrid_multiple_datasets_h2o') as dn:
+        fname = '%s/%s' % (dn, 'multiple.cube')
+        cube.generate_cube(fname, data, labels=[3, 5, 12])
+        result, labels = UniformGrid.read_cube_data(fname)
+        np.testing.assert_equal(labels, [3, 5, 12])
+        assert_allclose(result, data, rtol=1.e-5, atol=1.e-10)
+        # grid specifications are read from the header of files with multiple datasets
+        cube2 = UniformGrid.from_cube(fname)
+        assert_allclose(cube2.points, cube.points, atol=1.e-6)
+        np.testing.assert_equal(cube2.numbers, cube.numbers)
+        # default labels
+        cube.generate_cube(fname, data[:, :2])
+        result, labels = UniformGrid.read_cube_data(fname)
+        np.testing.assert_equal(labels, [1, 2])
+        # check raises
+        assert_raises(ValueError, cube.generate_cube, fname, data[:-1])
+        assert_raises(ValueError, cube.generate_cube, fname, data, labels=[1, 2])
+        assert_raises(ValueError, UniformGrid.read_cube_data, '%s/%s' % (dn, 'multiple.vmd'))
+
+
+def test_uniformgrid_float32_h2o():
+    with path('chemtools.data', 'h2o_dimer_pbe_sto3g-dens.cube') as file_path:
+        cube = UniformGrid.from_cube(file_path)
+        cube32 = UniformGrid.from_cube(file_path, dtype=np.float32)
+        dens, _ = UniformGrid.read_cube_data(file_path)
+    assert cube.dtype == np.float64 and cube32.dtype == np.float32
+    assert cube32.points.dtype == np.float32 and cube32.points.shape == cube.points.shape
+    assert_allclose(cube32.points, cube.points, rtol=0., atol=1.e-5)
+    # float32 data is written with the same significant digits
+    with tmpdir('chemtools.test.test_cube.test_uniformgrid_float32_h2o') as dn:
+        fname = '%s/%s' % (dn, 'dens32.cube')
+        cube32.generate_cube(fname, dens.astype(np.float32))
+        result, _ = UniformGrid.read_cube_data(fname)
+        assert_allclose(result, dens, rtol=1.e-5, atol=1.e-10)
+    assert_raises(ValueError, UniformGrid, cube.numbers, cube.pseudo_numbers, cube.coordinates,
+                  cube.origin, cube.axes, cube.shape, np.int64)
+
+
+def test_uniformgrid_symmetry_benzene():
+    # D6h molecule in standard orientation; operations of D2h subgroup map the grid onto itself
+    angles = np.arange(6) * np.pi / 3.
+    ring = np.array([np.cos(angles), np.sin(angles), np.zeros(6)]).T
+    coordinates = np.vstack([2.64 * ring, 4.69 * ring]) + np.array([1., 2., 3.])
+    numbers = np.array([6] * 6 + [1] * 6)
+    pseudo_numbers = numbers.astype(float)
+    operations = symmetry_operations(numbers, coordinates)
+    assert len(operations) == 24
+    axes, shape = np.diag([0.2, 0.25, 0.3]), np.array([60, 51, 20])
+    origin = np.array([1., 2., 3.]) - 0.5 * np.dot(shape, axes)
+    cube = UniformGrid(numbers, pseudo_numbers, coordinates, origin, axes, shape,
+                       operations=operations)
+    assert len(cube.operations) == 8
+    assert 8 * len(cube.unique_points) < 1.2 * cube.npoints
+
+    # totally-symmetric function, its gradient & hessian
+    def compute(points):
+        dist = points[:, np.newaxis] - coordinates
+        value = np.exp(-0.2 * numbers * np.sum(dist**2, axis=-1))
+        grad = -0.4 * numbers[:, np.newaxis] * dist * value[..., np.newaxis]
+        hess = 0.16 * (numbers**2)[:, np.newaxis, np.newaxis] * dist[..., np.newaxis] * \
+            dist[..., np.newaxis, :] - 0.4 * numbers[:, np.newaxis, np.newaxis] * np.identity(3)
+        hess = hess * value[..., np.newaxis, np.newaxis]
+        return np.sum(value, axis=1), np.sum(grad, axis=1), np.sum(hess, axis=1)
+
+    value, grad, hess = compute(cube.unique_points)
+    expected = compute(cube.points)
+    assert_allclose(cube.expand(value), expected[0], rtol=1.e-10, atol=1.e-12)
+    assert_allclose(cube.expand(grad, rank=1), expected[1], rtol=1.e-10, atol=1.e-12)
+    assert_allclose(cube.expand(hess, rank=2), expected[2], rtol=1.e-10, atol=1.e-12)
+    assert_allclose(cube.expand(np.array([value, 2 * value]).T),
+                    np.array([expected[0], 2 * expected[0]]).T, rtol=1.e-10, atol=1.e-12)
+    # check raises
+    assert_raises(ValueError, cube.expand, value[1:])
+    assert_raises(ValueError, cube.expand, grad, rank=2)
+    assert_raises(ValueError, cube.expand, value, rank=3)
+    # grid without symmetry
+    cube = UniformGrid(numbers, pseudo_numbers, coordinates, origin + 0.05, axes, shape,
+                       operations=operations)
+    assert len(cube.operations) == 1
+    assert cube.unique_points is cube.points
+    assert_allclose(cube.expand(compute(cube.points)[0]), compute(cube.points)[0])
+
+
+def test_uniformgrid_symmetry_ch4():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fpath:
+        mol = Molecule.from_file(str(fpath))
+    cube = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0, symmetry=True)
+    # degenerate principal axes are aligned with the S4 axes, so all Td operations are used
+    assert len(cube.operations) == 24
+    assert 15 * len(cube.unique_points) < cube.npoints
+    dens = cube.expand(mol.compute_density(cube.unique_points))
+    assert_allclose(dens, mol.compute_density(cube.points), rtol=1.e-3, atol=1.e-8)
+    esp = cube.expand(mol.compute_esp(cube.unique_points))
+    assert_allclose(esp, mol.compute_esp(cube.points), rtol=1.e-3, atol=1.e-8)
+    # rotated grid is the same grid as the grid without symmetry, if axes are not degenerate
+    with path('chemtools.data', 'water_b3lyp_sto3g.fchk') as fpath:
+        mol = Molecule.from_file(str(fpath))
+    cube = UniformGrid.from_molecule(mol, spacing=0.3, extension=2.0, symmetry=True)
+    assert len(cube.operations) == 4
+    assert_allclose(cube.points, UniformGrid.from_molecule(mol, 0.3, 2.0).points)
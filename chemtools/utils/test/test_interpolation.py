@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.interpolation."""
+
+
+import os
+import shutil
+import tempfile
+import numpy as np
+from numpy.testing import assert_raises, assert_allclose
+
+from chemtools.utils.cube import UniformGrid
+from chemtools.utils.interpolation import UniformGridInterpolator
+from chemtools.topology.critical import Topology
+
+
+centers = np.array([[0., 0., -0.9], [0., 0., 0.9]])
+
+
+def func(points):
+    dist = points[..., np.newaxis, :] - centers
+    return np.sum(np.exp(-np.sum(dist**2, axis=-1)), axis=-1)
+
+
+def func_grad(points):
+    dist = points[..., np.newaxis, :] - centers
+    dens = np.exp(-np.sum(dist**2, axis=-1))
+    return np.sum(-2 * dist * dens[..., np.newaxis], axis=-2)
+
+
+def func_hess(points):
+    dist = points[..., np.newaxis, :] - centers
+    dens = np.exp(-np.sum(dist**2, axis=-1))
+    hess = 4 * dist[..., :, np.newaxis] * dist[..., np.newaxis, :] - 2 * np.identity(3)
+    return np.sum(hess * dens[..., np.newaxis, np.newaxis], axis=-3)
+
+
+def make_grid(axes=np.identity(3) * 0.1, shape=np.array([70, 70, 90])):
+    """Return a (possibly skewed) cubic grid around the centers."""
+    origin = -0.5 * np.dot(shape, axes)
+    return UniformGrid(np.array([1, 1]), np.array([1., 1.]), centers, origin, axes, shape)
+
+
+def test_interpolator_values_and_derivatives():
+    skewed = np.array([[0.1, 0.01, 0.], [0., 0.1, 0.02], [0.01, 0., 0.09]])
+    for axes in [np.identity(3) * 0.1, skewed]:
+        grid = make_grid(axes)
+        interp = UniformGridInterpolator(grid, func(grid.points))
+        assert interp.grid is grid
+        # interpolation reproduces data at the grid points
+        assert_allclose(interp.compute_value(grid.points[::53]), func(grid.points[::53]),
+                        rtol=0., atol=1.e-12)
+        points = np.random.RandomState(42).uniform(-1.5, 1.5, (500, 3))
+        assert_allclose(interp.compute_value(points), func(points), rtol=0., atol=1.e-4)
+        assert_allclose(interp.compute_gradient(points), func_grad(points), rtol=0., atol=1.e-3)
+        assert_allclose(interp.compute_hessian(points), func_hess(points), rtol=0., atol=2.e-2)
+        # single point
+        assert_allclose(interp.compute_value(points[0]), func(points[0]), rtol=0., atol=1.e-4)
+        assert interp.compute_gradient(points[0]).shape == (3,)
+        assert interp.compute_hessian(points[0]).shape == (3, 3)
+        # analytic derivatives of the interpolated function match its finite differences
+        eps = 1.e-6
+        for index, step in enumerate(np.identity(3) * eps):
+            grad = (interp.compute_value(points + step) - interp.compute_value(points - step))
+            assert_allclose(interp.compute_gradient(points)[:, index], grad / (2 * eps),
+                            rtol=0., atol=1.e-6)
+            hess = interp.compute_gradient(points + step)
+            hess -= interp.compute_gradient(points - step)
+            assert_allclose(interp.compute_hessian(points)[:, index], hess / (2 * eps),
+                            rtol=0., atol=1.e-4)
+
+
+def test_interpolator_topology():
+    grid = make_grid()
+    interp = UniformGridInterpolator(grid, func(grid.points))
+    seeds = np.array([[x, y, z] for x in [-0.3, 0., 0.3] for y in [-0.3, 0., 0.3]
+                      for z in np.linspace(-1.5, 1.5, 7)])
+    topo = Topology(interp.compute_value, interp.compute_gradient, interp.compute_hessian,
+                    seeds, centers)
+    topo.find_critical_points()
+    assert len(topo.nna) == 2
+    assert len(topo.bcp) == 1
+    assert_allclose(topo.bcp[0].coordinate, np.zeros(3), rtol=0., atol=1.e-4)
+
+
+def test_interpolator_from_cube():
+    grid = make_grid(np.identity(3) * 0.2, np.array([35, 35, 45]))
+    dn = tempfile.mkdtemp('chemtools.utils.test.test_interpolation')
+    try:
+        fname = os.path.join(dn, 'test.cube')
+        grid.generate_cube(fname, func(grid.points))
+        interp = UniformGridInterpolator.from_cube(fname)
+        points = np.random.RandomState(1).uniform(-1., 1., (20, 3))
+        assert_allclose(interp.compute_value(points), func(points), rtol=0., atol=1.e-3)
+        grid.generate_cube(fname, np.array([func(grid.points)] * 2).T)
+        assert_raises(ValueError, UniformGridInterpolator.from_cube, fname)
+    finally:
+        shutil.rmtree(dn)
+
+
+def test_interpolator_raises():
+    grid = make_grid()
+    assert_raises(ValueError, UniformGridInterpolator, grid, np.ones(10))
+    assert_raises(ValueError, UniformGridInterpolator, grid, np.ones((grid.npoints, 2)))
+    grid = UniformGrid(np.array([1]), np.array([1.]), np.zeros((1, 3)), np.zeros(3),
+                       np.identity(3), np.array([1, 4, 4]))
+    assert_raises(ValueError, UniformGridInterpolator, grid, np.ones(16))
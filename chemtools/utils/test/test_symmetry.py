@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.utils.symmetry."""
+
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_raises
+
+from chemtools.utils.symmetry import symmetry_operations
+
+
+def check_operations(numbers, coordinates, order):
+    operations = symmetry_operations(numbers, coordinates)
+    assert operations.shape == (order, 3, 3)
+    assert_allclose(operations[0], np.identity(3))
+    # operations are orthogonal & map each atom on an equivalent atom
+    center = np.dot(numbers, coordinates) / np.sum(numbers)
+    for operation in operations:
+        assert_allclose(np.dot(operation, operation.T), np.identity(3), atol=1.e-10)
+        moved = np.dot(coordinates - center, operation.T) + center
+        dist = np.linalg.norm(moved[:, np.newaxis] - coordinates, axis=-1)
+        assert np.all(np.min(dist, axis=1) < 1.e-6)
+        assert np.all(numbers[np.argmin(dist, axis=1)] == numbers)
+    # operations form a group
+    for operation in operations:
+        products = np.dot(operations, operation)
+        dist = np.amax(abs(products[:, np.newaxis] - operations), axis=(2, 3))
+        assert np.all(np.sum(dist < 1.e-6, axis=1) == 1)
+    return operations
+
+
+def test_symmetry_operations_ch4():
+    # Td
+    coordinates = np.array([[0., 0., 0.], [1., 1., 1.], [-1., -1., 1.], [-1., 1., -1.],
+                            [1., -1., -1.]]) * 1.18 + np.array([0.5, -1., 2.])
+    check_operations(np.array([6, 1, 1, 1, 1]), coordinates, 24)
+
+
+def test_symmetry_operations_benzene():
+    # D6h (rotated out of the standard orientation)
+    angles = np.arange(6) * np.pi / 3.
+    ring = np.array([np.cos(angles), np.sin(angles), np.zeros(6)]).T
+    coordinates = np.vstack([2.64 * ring, 4.69 * ring])
+    rotation = np.linalg.qr(np.array([[1., 2., 0.], [0.5, 1., 3.], [2., 0., 1.]]))[0]
+    numbers = np.array([6] * 6 + [1] * 6)
+    check_operations(numbers, np.dot(coordinates, rotation.T), 24)
+
+
+def test_symmetry_operations_h2o():
+    # C2v
+    coordinates = np.array([[0., 0., 0.22], [0., 1.43, -0.89], [0., -1.43, -0.89]])
+    check_operations(np.array([8, 1, 1]), coordinates, 4)
+    # Cs
+    coordinates[2, 1] = -1.5
+    check_operations(np.array([8, 1, 1]), coordinates, 2)
+
+
+def test_symmetry_operations_icosahedron():
+    # Ih
+    ratio = 0.5 * (1. + np.sqrt(5.))
+    vertices = np.array([[0., i, j * ratio] for i in [1, -1] for j in [1, -1]])
+    coordinates = np.vstack([np.roll(vertices, shift, axis=1) for shift in range(3)])
+    check_operations(np.ones(12, dtype=int), coordinates, 120)
+
+
+def test_symmetry_operations_linear():
+    # operations of D4h subgroup of D_inf_h & C4v subgroup of C_inf_v
+    coordinates = np.array([[0., 0., -1.1], [0., 0., 1.1]])
+    check_operations(np.array([7, 7]), coordinates, 16)
+    check_operations(np.array([6, 8]), coordinates, 8)
+    # operations of Oh subgroup of the full rotation group
+    check_operations(np.array([10]), np.array([[1., 2., 3.]]), 48)
+
+
+def test_symmetry_operations_no_symmetry():
+    coordinates = np.array([[0., 0., 0.], [1.1, 0.2, 0.], [0.3, 1.4, 0.1], [-0.2, 0.1, 1.6]])
+    check_operations(np.array([6, 1, 7, 8]), coordinates, 1)
+
+
+def test_symmetry_operations_tol():
+    coordinates = np.array([[0., 0., 0.22], [0., 1.43, -0.89], [0., -1.435, -0.89]])
+    assert len(symmetry_operations(np.array([8, 1, 1]), coordinates)) == 2
+    assert len(symmetry_operations(np.array([8, 1, 1]), coordinates, tol=1.e-2)) == 4
+
+
+def test_symmetry_operations_raises():
+    assert_raises(ValueError, symmetry_operations, np.array([1, 1]), np.zeros((3, 3)))
+    assert_raises(ValueError, symmetry_operations, np.array([1, 1]), np.zeros(6))
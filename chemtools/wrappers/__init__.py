@@ -24,5 +24,11 @@
 
 
 from chemtools.wrappers.molecule import *
+from chemtools.wrappers.basis import *
 from chemtools.wrappers.grid import *
 from chemtools.wrappers.part import *
+import horton
+
+
+horton.log.head_banner = ""
+horton.log.foot_banner = ""
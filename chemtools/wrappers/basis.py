@@ -0,0 +1,583 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Gaussian Basis Set Module."""
+
+
+import numpy as np
+
+from scipy.special import comb, factorial
+
+from chemtools.profiling import profiled
+
+
+__all__ = ['GaussianBasis']
+
+
+# maximum number of basis function values (times order of derivative) computed at once
+CHUNK_SIZE = 2**21
+
+# order of the unique second derivatives, i.e. xx, xy, xz, yy, yz, zz
+_HESSIAN_INDEX = [(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]
+
+
+def _double_factorial(n):
+    """Return n!! (which is 1 for n <= 0)."""
+    return float(np.prod(np.arange(n, 0, -2)))
+
+
+def _cart_powers(ang):
+    """Return powers of x, y & z of the Cartesian functions of the given angular momentum.
+
+    The functions are in HORTON2 (alphabetical) order, e.g. xx, xy, xz, yy, yz, zz.
+    """
+    return np.array([(ang - i, i - j, j) for i in range(ang + 1) for j in range(i + 1)])
+
+
+def _cart_scales(ang):
+    """Return the factors of the normalization constants depending on the Cartesian powers."""
+    dfact = np.array([np.prod([_double_factorial(2 * n - 1) for n in power])
+                      for power in _cart_powers(ang)])
+    return 1. / np.sqrt(dfact)
+
+
+_PURE_TRANSFORMS = {}
+
+
+def _pure_transform(ang):
+    """Return the transformation from normalized Cartesian to normalized pure functions.
+
+    The pure functions are the real regular solid harmonics in HORTON2 order, i.e.
+    c0, c1, s1, c2, s2, ..., obtained from the Schlegel & Frisch expansion in Cartesian powers.
+
+    Parameters
+    ----------
+    ang : int
+        Angular momentum.
+
+    Returns
+    -------
+    transform : ndarray
+        Transformation matrix given as a 2D-array with (2L + 1, (L + 1)(L + 2) / 2) shape.
+
+    """
+    if ang in _PURE_TRANSFORMS:
+        return _PURE_TRANSFORMS[ang]
+    powers = _cart_powers(ang)
+    lookup = dict((tuple(power), index) for index, power in enumerate(powers))
+    transform = np.zeros((2 * ang + 1, len(powers)))
+    for row, m in enumerate([0] + [sign * m for m in range(1, ang + 1) for sign in [1, -1]]):
+        am = abs(m)
+        norm = np.sqrt(2 * factorial(ang + am) * factorial(ang - am) / (2. if m == 0 else 1.))
+        norm /= 2**am * factorial(ang)
+        # cosine (m >= 0) & sine (m < 0) functions have even & odd powers of y
+        k0 = 0 if m >= 0 else 1
+        for t in range((ang - am) // 2 + 1):
+            for u in range(t + 1):
+                for k in range(k0, am + 1, 2):
+                    coeff = (-1)**(t + (k - k0) // 2) * 0.25**t * comb(ang, t) * \
+                        comb(ang - t, am + t) * comb(t, u) * comb(am, k)
+                    power = (2 * t + am - 2 * u - k, 2 * u + k, ang - 2 * t - am)
+                    transform[row, lookup[power]] += norm * coeff
+    # expansion in normalized Cartesian functions
+    transform /= _cart_scales(ang) * np.sqrt(_double_factorial(2 * ang - 1))
+    transform.flags.writeable = False
+    _PURE_TRANSFORMS[ang] = transform
+    return transform
+
+
+def _monomial(delta, power, deriv=(0, 0, 0)):
+    """Return derivative of the monomial x^a y^b z^c evaluated on the relative coordinates.
+
+    Parameters
+    ----------
+    delta : list of ndarray
+        Powers of x, y & z, i.e. delta[d][n] is the n-th power of the d-th coordinate.
+    power : sequence of int
+        Powers of x, y & z of the monomial.
+    deriv : sequence of int, optional
+        Order of derivative with respect to x, y & z.
+
+    """
+    value = 1.
+    for d in range(3):
+        n, k = power[d], deriv[d]
+        if n < k:
+            return 0.
+        value = value * np.prod(np.arange(n, n - k, -1)) * delta[d][n - k]
+    return value
+
+
+class GaussianBasis(object):
+    """Contracted Gaussian basis set evaluated with vectorized NumPy.
+
+    This is a drop-in replacement of the HORTON2 ``GOBasis`` for evaluating the basis functions
+    (and properties of density matrices) on points, with the same conventions for the order &
+    normalization of Cartesian and pure functions. Points are processed in chunks, and all shells
+    of the same type are evaluated together. For float32 points, the basis functions are evaluated
+    in float32 and contracted with the density matrix (or orbital coefficients) in float64.
+    """
+
+    def __init__(self, centers, shell_map, nprims, shell_types, alphas, con_coeffs):
+        """Initialize class.
+
+        Parameters
+        ----------
+        centers : ndarray
+           Cartesian coordinates of the centers given as a 2D-array with (C, 3) shape.
+        shell_map : ndarray
+           Index of the center of each shell given as a 1D-array with (S,) shape.
+        nprims : ndarray
+           Number of primitives of each shell given as a 1D-array with (S,) shape.
+        shell_types : ndarray
+           Type of each shell given as a 1D-array with (S,) shape, i.e. its angular momentum
+           with negative sign for pure shells.
+        alphas : ndarray
+           Exponents of the primitives given as a 1D-array with (P,) shape.
+        con_coeffs : ndarray
+           Contraction coefficients of the normalized primitives given as a 1D-array with (P,)
+           shape.
+
+        """
+        self._centers = np.array(centers, dtype=float, ndmin=2)
+        self._shell_map = np.array(shell_map, dtype=int, ndmin=1)
+        self._nprims = np.array(nprims, dtype=int, ndmin=1)
+        self._shell_types = np.array(shell_types, dtype=int, ndmin=1)
+        self._alphas = np.array(alphas, dtype=float, ndmin=1)
+        self._con_coeffs = np.array(con_coeffs, dtype=float, ndmin=1)
+        if self._centers.ndim != 2 or self._centers.shape[1] != 3:
+            raise ValueError("Argument centers should be a 2D-array with 3 columns.")
+        nshell = len(self._shell_map)
+        if self._nprims.shape != (nshell,) or self._shell_types.shape != (nshell,):
+            raise ValueError("Arguments shell_map, nprims & shell_types should have same shape.")
+        if np.any(self._shell_map < 0) or np.any(self._shell_map >= len(self._centers)):
+            raise ValueError("Argument shell_map has an invalid center index.")
+        if np.any(self._nprims < 1) or np.any(self._shell_types == -1):
+            raise ValueError("Every shell should have a primitive & a valid shell type.")
+        nprim = np.sum(self._nprims)
+        if self._alphas.shape != (nprim,) or self._con_coeffs.shape != (nprim,):
+            raise ValueError("Arguments alphas & con_coeffs should have {0} entries.".format(nprim))
+
+        # number of basis functions & index of the first basis function of each shell
+        ltypes = np.abs(self._shell_types)
+        self._nfns = np.where(self._shell_types < 0, 2 * ltypes + 1,
+                              (ltypes + 1) * (ltypes + 2) // 2)
+        self._offsets = np.cumsum(self._nfns) - self._nfns
+        # shells of the same type with their primitives, evaluated together
+        first = np.cumsum(self._nprims) - self._nprims
+        self._groups = []
+        for shell_type in np.unique(self._shell_types):
+            shells = np.where(self._shell_types == shell_type)[0]
+            prims = np.concatenate([np.arange(first[s], first[s] + self._nprims[s])
+                                    for s in shells])
+            ang = abs(shell_type)
+            alphas = self._alphas[prims]
+            # contraction coefficients times normalization of primitives (except _cart_scales)
+            weights = np.sqrt((2 * alphas / np.pi)**1.5 * (4 * alphas)**ang)
+            weights *= self._con_coeffs[prims]
+            self._groups.append({
+                'type': shell_type, 'ang': ang, 'shells': shells, 'alphas': alphas,
+                'weights': weights, 'shell_of_prim': np.repeat(np.arange(len(shells)),
+                                                               self._nprims[shells]),
+                'starts': np.cumsum(self._nprims[shells]) - self._nprims[shells],
+                'index': (self._offsets[shells][:, None]
+                          + np.arange(self._nfns[shells[0]])[None, :]).ravel()})
+        # basis functions are evaluated grouped by shell type, i.e. in this order
+        self._order = np.concatenate([group['index'] for group in self._groups])
+        bounds = np.cumsum([0] + [len(group['index']) for group in self._groups])
+        for group, start, end in zip(self._groups, bounds[:-1], bounds[1:]):
+            group['slice'] = slice(start, end)
+
+    @classmethod
+    def from_horton(cls, obasis):
+        """Initialize class given an instance of HORTON2 ``GOBasis``.
+
+        Parameters
+        ----------
+        obasis : horton.GOBasis
+            An instance of HORTON2 Gaussian orbital basis set.
+
+        """
+        return cls(obasis.centers, obasis.shell_map, obasis.nprims, obasis.shell_types,
+                   obasis.alphas, obasis.con_coeffs)
+
+    @property
+    def centers(self):
+        """ndarray : Cartesian coordinates of the centers."""
+        return self._centers
+
+    @property
+    def shell_map(self):
+        """ndarray : index of the center of each shell."""
+        return self._shell_map
+
+    @property
+    def nprims(self):
+        """ndarray : number of primitives of each shell."""
+        return self._nprims
+
+    @property
+    def shell_types(self):
+        """ndarray : type of each shell (negative for pure shells)."""
+        return self._shell_types
+
+    @property
+    def alphas(self):
+        """ndarray : exponents of the primitives."""
+        return self._alphas
+
+    @property
+    def con_coeffs(self):
+        """ndarray : contraction coefficients of the primitives."""
+        return self._con_coeffs
+
+    @property
+    def nshell(self):
+        """int : number of shells."""
+        return len(self._shell_map)
+
+    @property
+    def nbasis(self):
+        """int : number of basis functions."""
+        return int(np.sum(self._nfns))
+
+    @property
+    def basis_offsets(self):
+        """ndarray : index of the first basis function of each shell."""
+        return self._offsets
+
+    def get_subset(self, ishells):
+        """Return the basis set of a subset of shells.
+
+        Parameters
+        ----------
+        ishells : sequence of int
+            Indices of the shells.
+
+        Returns
+        -------
+        basis : GaussianBasis
+            Basis set of the given shells (sharing the centers of this basis set).
+        ibasis : ndarray
+            Indices of the basis functions of the given shells in this basis set.
+
+        """
+        ishells = np.asarray(ishells, dtype=int)
+        first = np.cumsum(self._nprims) - self._nprims
+        prims = np.concatenate([np.arange(first[s], first[s] + self._nprims[s]) for s in ishells])
+        ibasis = np.concatenate([np.arange(self._offsets[s], self._offsets[s] + self._nfns[s])
+                                 for s in ishells])
+        basis = GaussianBasis(self._centers, self._shell_map[ishells], self._nprims[ishells],
+                              self._shell_types[ishells], self._alphas[prims],
+                              self._con_coeffs[prims])
+        return basis, ibasis
+
+    def _chunks(self, npoints, deriv):
+        """Yield slices of points evaluated at once."""
+        size = max(1, CHUNK_SIZE // (self.nbasis * (1 + 3 * deriv)))
+        for start in range(0, npoints, size):
+            yield slice(start, min(start + size, npoints))
+
+    def compute_basis(self, points, deriv=0):
+        """Return basis functions and their derivatives evaluated on a set of points.
+
+        Parameters
+        ----------
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        deriv : int, optional
+           Order of derivative, i.e. 0, 1 or 2.
+
+        Returns
+        -------
+        output : list of ndarray
+           Values of B basis functions given as a 2D-array with (N, B) shape, followed by their
+           gradient with (N, B, 3) shape (if deriv >= 1) and the unique elements of their hessian
+           in xx, xy, xz, yy, yz, zz order with (N, B, 6) shape (if deriv == 2).
+
+        """
+        if deriv not in [0, 1, 2]:
+            raise ValueError("Argument deriv should be 0, 1 or 2; got {0}".format(deriv))
+        points = np.asarray(points)
+        if points.dtype != np.float32:
+            points = points.astype(np.float64)
+        output = []
+        for value in self._compute_basis(points, deriv):
+            out = np.empty(value.shape, value.dtype)
+            out[..., self._order] = value
+            output.append(np.moveaxis(out, 0, -1) if out.ndim == 3 else out)
+        return output
+
+    def _compute_basis(self, points, deriv):
+        """Return basis functions & derivatives grouped by shell type.
+
+        The basis functions are in the order of ``self._order``. The values have (N, B) shape,
+        and the gradient & hessian have (3, N, B) and (6, N, B) shapes, so that each component
+        is contiguous. All arrays have the data type of the points (float64 or float32).
+        """
+        npoints, nbasis, dtype = len(points), self.nbasis, points.dtype
+        output = [np.empty((npoints, nbasis), dtype), np.empty((3, npoints, nbasis), dtype),
+                  np.empty((6, npoints, nbasis), dtype)][:deriv + 1]
+        for group in self._groups:
+            values = self._compute_group(group, points, deriv)
+            for out, value in zip(output, values):
+                # (F, ..., N, S) values of each function to (..., N, S * F) basis functions
+                value = np.moveaxis(value, 0, -1)
+                out[..., group['slice']] = value.reshape(value.shape[:-2] + (-1,))
+        return output
+
+    def _grouped(self, dm):
+        """Return the density matrix in the order of basis functions grouped by shell type."""
+        return dm._array[np.ix_(self._order, self._order)]
+
+    def _compute_group(self, group, points, deriv):
+        """Return functions & derivatives of the shells of the same type on the points.
+
+        The values have (F, N, S) shape, and the gradient & hessian have (F, 3, N, S) and
+        (F, 6, N, S) shapes, where F is the number of functions of each shell.
+        """
+        ang, dtype = group['ang'], points.dtype
+        npoints, nshell = len(points), len(group['shells'])
+        # coordinates relative to the centers & their powers, each with (N, S) shape
+        centers = self._centers[self._shell_map[group['shells']]].astype(dtype)
+        rel = [points[:, d][:, None] - centers[:, d][None, :] for d in range(3)]
+        delta = [[np.ones((npoints, nshell), dtype)] for _ in range(3)]
+        for d in range(3):
+            for _ in range(ang + deriv):
+                delta[d].append(delta[d][-1] * rel[d])
+        # contracted radial parts & their derivatives with respect to r^2 (scaled by 2^k)
+        rsq = rel[0]**2 + rel[1]**2 + rel[2]**2
+        alphas = group['alphas'].astype(dtype)
+        expo = np.exp(-alphas * rsq[:, group['shell_of_prim']]) * group['weights'].astype(dtype)
+        radial = [np.add.reduceat(expo, group['starts'], axis=1)]
+        for _ in range(deriv):
+            expo = expo * (-2 * alphas)
+            radial.append(np.add.reduceat(expo, group['starts'], axis=1))
+
+        powers = _cart_powers(ang)
+        values = [np.empty((len(powers), npoints, nshell), dtype),
+                  np.empty((len(powers), 3, npoints, nshell), dtype),
+                  np.empty((len(powers), 6, npoints, nshell), dtype)][:deriv + 1]
+        unit = np.identity(3, dtype=int)
+        for index, power in enumerate(powers):
+            poly = _monomial(delta, power)
+            values[0][index] = poly * radial[0]
+            if deriv == 0:
+                continue
+            # d(P R)/dx_i = dP/dx_i R + P x_i R'
+            dpoly = [_monomial(delta, power, unit[i]) for i in range(3)]
+            for i in range(3):
+                values[1][index, i] = dpoly[i] * radial[0] + poly * rel[i] * radial[1]
+            if deriv == 1:
+                continue
+            # d2(P R)/dx_i dx_j = d2P R + (dP_i x_j + dP_j x_i + P delta_ij) R' + P x_i x_j R''
+            for col, (i, j) in enumerate(_HESSIAN_INDEX):
+                value = _monomial(delta, power, unit[i] + unit[j]) * radial[0]
+                value = value + (dpoly[i] * rel[j] + dpoly[j] * rel[i]) * radial[1]
+                value = value + poly * rel[i] * rel[j] * radial[2]
+                if i == j:
+                    value = value + poly * radial[1]
+                values[2][index, col] = value
+        # normalize Cartesian functions & transform to pure functions
+        scales = _cart_scales(ang).astype(dtype)
+        for k, value in enumerate(values):
+            value *= scales.reshape((-1,) + (1,) * (value.ndim - 1))
+            if group['type'] < 0:
+                transform = _pure_transform(ang).astype(dtype)
+                values[k] = np.tensordot(transform, value, axes=([1], [0]))
+        return values
+
+    def compute_grid_orbitals_exp(self, exp, points, iorbs):
+        """Return orbitals evaluated on a set of points.
+
+        Parameters
+        ----------
+        exp : object
+           Orbital expansion with coefficients given as a 2D-array with (B, M) shape in the
+           ``coeffs`` attribute.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        iorbs : ndarray
+           Indices of the orbitals (starting from 0).
+
+        """
+        coeffs = np.asarray(exp.coeffs)[self._order][:, iorbs]
+        output = np.zeros((len(points), coeffs.shape[1]), dtype=points.dtype)
+        for chunk in self._chunks(len(points), 0):
+            output[chunk] = self._compute_basis(points[chunk], 0)[0].dot(coeffs)
+        return output
+
+    @profiled("GaussianBasis.compute_grid_density_dm")
+    def compute_grid_density_dm(self, dm, points):
+        """Return density of the density matrix evaluated on a set of points.
+
+        Parameters
+        ----------
+        dm : object
+           Density matrix of B basis functions given as a 2D-array with (B, B) shape in the
+           ``_array`` attribute.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+
+        """
+        output = np.zeros(len(points), dtype=points.dtype)
+        dm = self._grouped(dm)
+        for chunk in self._chunks(len(points), 0):
+            phi = self._compute_basis(points[chunk], 0)[0]
+            output[chunk] = np.sum(phi.dot(dm) * phi, axis=1)
+        return output
+
+    @profiled("GaussianBasis.compute_grid_gradient_dm")
+    def compute_grid_gradient_dm(self, dm, points):
+        """Return gradient of the density of the density matrix evaluated on a set of points.
+
+        Parameters
+        ----------
+        dm : object
+           Density matrix of B basis functions given as a 2D-array with (B, B) shape in the
+           ``_array`` attribute.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+
+        """
+        output = np.zeros((len(points), 3), dtype=points.dtype)
+        dm = self._grouped(dm)
+        for chunk in self._chunks(len(points), 1):
+            phi, dphi = self._compute_basis(points[chunk], 1)
+            output[chunk] = 2 * np.sum(phi.dot(dm) * dphi, axis=2).T
+        return output
+
+    @profiled("GaussianBasis.compute_grid_hessian_dm")
+    def compute_grid_hessian_dm(self, dm, points):
+        """Return hessian of the density of the density matrix evaluated on a set of points.
+
+        Parameters
+        ----------
+        dm : object
+           Density matrix of B basis functions given as a 2D-array with (B, B) shape in the
+           ``_array`` attribute.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+
+        Returns
+        -------
+        hessian : ndarray
+           Unique elements of hessian in xx, xy, xz, yy, yz, zz order with (N, 6) shape.
+
+        """
+        output = np.zeros((len(points), 6), dtype=points.dtype)
+        dm = self._grouped(dm)
+        for chunk in self._chunks(len(points), 2):
+            phi, dphi, ddphi = self._compute_basis(points[chunk], 2)
+            dm_dphi = [dphi[i].dot(dm) for i in range(3)]
+            value = np.sum(phi.dot(dm) * ddphi, axis=2).T
+            for col, (i, j) in enumerate(_HESSIAN_INDEX):
+                value[:, col] += np.sum(dm_dphi[i] * dphi[j], axis=1)
+            output[chunk] = 2 * value
+        return output
+
+    @profiled("GaussianBasis.compute_grid_kinetic_dm")
+    def compute_grid_kinetic_dm(self, dm, points):
+        """Return positive definite kinetic energy density of the density matrix on points.
+
+        Parameters
+        ----------
+        dm : object
+           Density matrix of B basis functions given as a 2D-array with (B, B) shape in the
+           ``_array`` attribute.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+
+        """
+        output = np.zeros(len(points), dtype=points.dtype)
+        dm = self._grouped(dm)
+        for chunk in self._chunks(len(points), 1):
+            dphi = self._compute_basis(points[chunk], 1)[1]
+            for i in range(3):
+                output[chunk] += 0.5 * np.sum(dphi[i].dot(dm) * dphi[i], axis=1)
+        return output
+
+    def compute_overlap(self, lf=None):
+        """Return the overlap matrix of the basis functions.
+
+        The integrals of primitives are computed with the Obara-Saika recurrence relations,
+        for all primitive pairs of two shell types at once.
+
+        Parameters
+        ----------
+        lf : object, optional
+            Ignored; accepted for compatibility with HORTON2 ``GOBasis.compute_overlap``.
+
+        Returns
+        -------
+        overlap : ndarray
+           Overlap matrix given as a 2D-array with (B, B) shape.
+
+        """
+        overlap = np.zeros((self.nbasis, self.nbasis))
+        for group_a in self._groups:
+            for group_b in self._groups:
+                olp = self._compute_overlap_group(group_a, group_b)
+                overlap[np.ix_(group_a['index'], group_b['index'])] = olp
+        return overlap
+
+    def _compute_overlap_group(self, group_a, group_b):
+        """Return overlap of the functions of the shells of two types."""
+        la, lb = group_a['ang'], group_b['ang']
+        alpha_a, alpha_b = group_a['alphas'][:, None], group_b['alphas'][None, :]
+        center_a = self._centers[self._shell_map[group_a['shells']]][group_a['shell_of_prim']]
+        center_b = self._centers[self._shell_map[group_b['shells']]][group_b['shell_of_prim']]
+        # Gaussian product of all primitive pairs, each with (Pa, Pb) shape
+        p = alpha_a + alpha_b
+        dist = center_a[:, None, :] - center_b[None, :, :]
+        table = []
+        for d in range(3):
+            pa, pb = -alpha_b / p * dist[:, :, d], alpha_a / p * dist[:, :, d]
+            # 1D overlap of x^i & x^j primitives, s[i][j]
+            s = [[np.sqrt(np.pi / p) * np.exp(-alpha_a * alpha_b / p * dist[:, :, d]**2)]]
+            for i in range(1, la + 1):
+                s.append([pa * s[i - 1][0] + (i - 1) / (2 * p) * (s[i - 2][0] if i > 1 else 0.)])
+            for j in range(1, lb + 1):
+                for i in range(la + 1):
+                    value = pb * s[i][j - 1] + (j - 1) / (2 * p) * (s[i][j - 2] if j > 1 else 0.)
+                    if i > 0:
+                        value = value + i / (2 * p) * s[i - 1][j - 1]
+                    s[i].append(value)
+            table.append(s)
+        weights = group_a['weights'][:, None] * group_b['weights'][None, :]
+        powers_a, powers_b = _cart_powers(la), _cart_powers(lb)
+        olp = np.empty((len(group_a['shells']), len(powers_a), len(group_b['shells']),
+                        len(powers_b)))
+        for ia, power_a in enumerate(powers_a):
+            for ib, power_b in enumerate(powers_b):
+                value = weights * table[0][power_a[0]][power_b[0]] * \
+                    table[1][power_a[1]][power_b[1]] * table[2][power_a[2]][power_b[2]]
+                # contract primitive pairs to shell pairs
+                value = np.add.reduceat(value, group_a['starts'], axis=0)
+                olp[:, ia, :, ib] = np.add.reduceat(value, group_b['starts'], axis=1)
+        # normalize Cartesian functions & transform to pure functions
+        olp *= _cart_scales(la)[:, None, None] * _cart_scales(lb)
+        if group_a['type'] < 0:
+            olp = np.einsum('pa,sarb->sprb', _pure_transform(la), olp)
+        if group_b['type'] < 0:
+            olp = np.einsum('qb,sarb->sarq', _pure_transform(lb), olp)
+        return olp.reshape(len(group_a['index']), len(group_b['index']))
@@ -23,16 +23,116 @@
 """Grid Wrapper Module."""
 
 
-from horton import BeckeMolGrid
+import os
+import hashlib
+
+from collections import OrderedDict
+
+import numpy as np
+
+from horton import BeckeMolGrid, AtomicGrid, AtomicGridSpec, IntGrid
 from chemtools.wrappers.molecule import Molecule
+from chemtools.profiling import profiled
+
+
+__all__ = ['MolecularGrid', 'set_grid_cache', 'clear_grid_cache']
+
+
+# cache of Becke-Lebedev grids (least recently used grid is dropped first)
+_GRID_CACHE = OrderedDict()
+_GRID_CACHE_SETTINGS = {'maxsize': 8, 'directory': None}
+
+
+def set_grid_cache(maxsize=8, directory=None):
+    """Set the size of in-memory cache & directory of on-disk cache of molecular grids.
+
+    Molecular grids are cached by atomic numbers, coordinates (rounded to 6 decimals),
+    specification & order of switching function, so constructing a grid for the same geometry
+    again skips the expensive computation of Becke weights. Randomly rotated grids are not
+    cached, because each of them should have its own random rotation.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of grids kept in memory. If 0, grids are not cached in memory.
+    directory : str, optional
+        Directory for storing serialized grids. If None, grids are not cached on disk.
 
+    """
+    if not isinstance(maxsize, int) or maxsize < 0:
+        raise ValueError('Argument maxsize should be a non-negative integer.')
+    if directory is not None and not os.path.isdir(directory):
+        os.makedirs(directory)
+    _GRID_CACHE_SETTINGS['maxsize'] = maxsize
+    _GRID_CACHE_SETTINGS['directory'] = directory
+    while len(_GRID_CACHE) > maxsize:
+        _GRID_CACHE.popitem(last=False)
 
-__all__ = ['MolecularGrid']
+
+def clear_grid_cache():
+    """Remove all molecular grids from the in-memory cache."""
+    _GRID_CACHE.clear()
+
+
+class _CachedBeckeMolGrid(BeckeMolGrid):
+    """Becke-Lebedev molecular grid restored from the on-disk cache of molecular grids.
+
+    The stored points, weights, Becke weights & atomic grids are used as they are, so the
+    Becke weights are not recomputed.
+    """
+
+    def __init__(self, centers, numbers, pseudo_numbers, agspec, k, points, weights,
+                 becke_weights, atgrids):
+        self._cached = {'centers': centers, 'numbers': numbers, 'k': k,
+                        'pseudo_numbers': pseudo_numbers, 'agspec': AtomicGridSpec(agspec),
+                        'becke_weights': becke_weights}
+        IntGrid.__init__(self, points, weights, atgrids)
+
+    @property
+    def centers(self):
+        """Cartesian coordinates of atomic centers."""
+        return self._cached['centers']
+
+    @property
+    def numbers(self):
+        """Atomic number of atomic centers."""
+        return self._cached['numbers']
+
+    @property
+    def pseudo_numbers(self):
+        """Pseudo atomic number of atomic centers."""
+        return self._cached['pseudo_numbers']
+
+    @property
+    def agspec(self):
+        """Specification of atomic grids."""
+        return self._cached['agspec']
+
+    @property
+    def k(self):
+        """Order of the switching function in Becke's weighting scheme."""
+        return self._cached['k']
+
+    @property
+    def random_rotate(self):
+        """Whether spherical grids are randomly rotated."""
+        return False
+
+    @property
+    def mode(self):
+        """Atomic grids & Becke weights are kept."""
+        return 'keep'
+
+    @property
+    def becke_weights(self):
+        """Becke weight of grid points."""
+        return self._cached['becke_weights']
 
 
 class MolecularGrid(object):
     """Becke-Lebedev molecular grid for numerical integrations."""
 
+    @profiled('MolecularGrid.__init__')
     def __init__(self, coordinates, numbers, pseudo_numbers, specification='medium', k=3, rotate=False):
         """Initialize class.
 
@@ -66,9 +166,67 @@ class MolecularGrid(object):
         self._rotate = rotate
         self.specification = specification
 
-        self._grid = BeckeMolGrid(self.coordinates, self.numbers, self.pseudo_numbers,
-                                  agspec=self.specification, k=k,
-                                  random_rotate=rotate, mode='keep')
+        self._grid = self._get_grid()
+
+    def _get_key(self):
+        """Return the key identifying the molecular grid in the cache."""
+        return (tuple(np.asarray(self.numbers, dtype=int).tolist()),
+                tuple(np.round(np.ravel(self.coordinates), 6).tolist()),
+                self.specification, self._k)
+
+    def _get_grid(self):
+        """Return the Becke-Lebedev grid from the cache or construct (and cache) it."""
+        if self._rotate:
+            # randomly rotated grids are not reused
+            return BeckeMolGrid(self.coordinates, self.numbers, self.pseudo_numbers,
+                                agspec=self.specification, k=self._k, random_rotate=True,
+                                mode='keep')
+        key = self._get_key()
+        # look for grid in memory
+        if key in _GRID_CACHE:
+            _GRID_CACHE[key] = _GRID_CACHE.pop(key)
+            return _GRID_CACHE[key]
+        # look for grid on disk
+        fname = None
+        if _GRID_CACHE_SETTINGS['directory'] is not None:
+            name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+            fname = os.path.join(_GRID_CACHE_SETTINGS['directory'], name + '.npz')
+        if fname is not None and os.path.isfile(fname):
+            grid = self._load_grid(fname)
+        else:
+            grid = BeckeMolGrid(self.coordinates, self.numbers, self.pseudo_numbers,
+                                agspec=self.specification, k=self._k, random_rotate=False,
+                                mode='keep')
+            if fname is not None:
+                self._save_grid(grid, fname)
+        # store grid in memory
+        if _GRID_CACHE_SETTINGS['maxsize'] > 0:
+            _GRID_CACHE[key] = grid
+            while len(_GRID_CACHE) > _GRID_CACHE_SETTINGS['maxsize']:
+                _GRID_CACHE.popitem(last=False)
+        return grid
+
+    def _save_grid(self, grid, fname):
+        """Serialize points, (Becke) weights & atomic grid slices of the grid into a npz file."""
+        sizes = [atgrid.size for atgrid in grid.subgrids]
+        np.savez(fname, key=repr(self._get_key()), points=grid.points, weights=grid.weights,
+                 becke_weights=grid.becke_weights, indices=np.cumsum([0] + sizes))
+
+    def _load_grid(self, fname):
+        """Return the grid stored in a npz file; atomic grids are rebuilt without Becke weights."""
+        data = np.load(fname)
+        if str(data['key']) != repr(self._get_key()):
+            raise ValueError('Grid stored in {0} does not match the molecule!'.format(fname))
+        indices, points = data['indices'], data['points']
+        atgrids = []
+        for index in range(len(self.numbers)):
+            # atomic grid points are views of the molecular grid points, like in BeckeMolGrid
+            atgrids.append(AtomicGrid(self.numbers[index], self.pseudo_numbers[index],
+                                      self.coordinates[index], self.specification, False,
+                                      points[indices[index]: indices[index + 1]]))
+        return _CachedBeckeMolGrid(self.coordinates, self.numbers, self.pseudo_numbers,
+                                   self.specification, self._k, points, data['weights'],
+                                   data['becke_weights'], atgrids)
 
     @classmethod
     def from_molecule(cls, molecule, specification='medium', k=3, rotate=False):
@@ -175,7 +333,9 @@ class MolecularGrid(object):
     def compute_spherical_average(self, value):
         """Compute spherical average of given value evaluated on the grid points.
 
-        Note: This method only works for atomic systems with one nuclear center.
+        Note: This method only works for atomic systems with one nuclear center. The average is
+        computed by the atomic grid of that center, because the molecular grid has no spherical
+        average; the points of the atomic & molecular grid are the same for one atom.
 
         Parameters
         ----------
@@ -189,4 +349,4 @@ class MolecularGrid(object):
             raise ValueError('Argument value should be a 1D array.')
         if value.shape != (self.npoints,):
             raise ValueError('Argument value should have ({0},) shape!'.format(self.npoints))
-        return self._grid.get_spherical_average(value)
+        return self._grid.subgrids[0].get_spherical_average(value)
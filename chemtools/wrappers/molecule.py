@@ -24,8 +24,13 @@
 
 
 import logging
+from functools import partial
+
 import numpy as np
 from horton import IOData, DenseLinalgFactory
+from chemtools.orbstools.orthogonalization import eigh
+from chemtools.wrappers.basis import GaussianBasis
+from chemtools.profiling import profiled, count
 try:
     from importlib_resources import path
 except ImportError:
@@ -35,10 +40,14 @@ except ImportError:
 __all__ = ["Molecule"]
 
 
+# number of float32 points converted to float64 at once for evaluation by HORTON2
+CHUNK_SIZE = 2**16
+
+
 class Molecule(object):
     """Molecule class from HORTON package."""
 
-    def __init__(self, iodata):
+    def __init__(self, iodata, backend="horton"):
         """
         Initialize class.
 
@@ -46,10 +55,13 @@ class Molecule(object):
         ----------
         iodata : horton.IOData
            An instance of horton.IOData object.
+        backend : str, optional
+           Backend evaluating the basis functions, either "horton" or "numpy" (see
+           :class:`AtomicOrbitals`).
         """
         self._iodata = iodata
         if hasattr(self._iodata, "obasis"):
-            self._ao = AtomicOrbitals.from_molecule(self)
+            self._ao = AtomicOrbitals.from_molecule(self, backend)
         else:
             self._ao = None
 
@@ -96,13 +108,16 @@ class Molecule(object):
             pass
 
     @classmethod
-    def from_file(cls, fname):
+    @profiled("Molecule.from_file")
+    def from_file(cls, fname, backend="horton"):
         """Initialize class given a file.
 
         Parameters
         ----------
         fname : str
             Path to molecule"s files.
+        backend : str, optional
+            Backend evaluating the basis functions, either "horton" or "numpy".
 
         """
         # load molecule
@@ -116,7 +131,7 @@ class Molecule(object):
                     iodata = IOData.from_file(str(fname))
             except IOError as error:
                 logging.info(error)
-        return cls(iodata)
+        return cls(iodata, backend)
 
     def __getattr__(self, attr):
         """Return attribute.
@@ -165,6 +180,7 @@ class Molecule(object):
         """
         return self.mo.compute_dm(spin, index=index)._array
 
+    @profiled("Molecule.compute_molecular_orbital")
     def compute_molecular_orbital(self, points, spin="ab", index=None):
         """Return molecular orbitals.
 
@@ -201,7 +217,8 @@ class Molecule(object):
             exp = getattr(self._iodata, "exp_" + {'a': 'alpha', 'b': 'beta'}[spin])
         return self._ao.compute_orbitals(exp, points, index)
 
-    def compute_density(self, points, spin="ab", index=None):
+    @profiled("Molecule.compute_density")
+    def compute_density(self, points, spin="ab", index=None, screen=None):
         r"""Return electron density.
 
         Parameters
@@ -214,19 +231,23 @@ class Molecule(object):
         index : sequence of int, optional
            Sequence of integers representing the occupied spin orbitals which are indexed
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`AtomicOrbitals.compute_shell_radii`). If ``None``,
+           all shells are evaluated on all points. Only used when `index` is ``None``.
 
         """
         self._check_argument(points)
 
         # allocate output array
-        output = np.zeros((points.shape[0],), float)
+        output = np.zeros((points.shape[0],), dtype=points.dtype)
 
         # compute density
         if index is None:
             # get density matrix corresponding to the specified spin
             dm = self.mo.compute_dm(spin)
             # include all orbitals
-            output = self._ao.compute_density(dm, points)
+            output = self._ao.compute_density(dm, points, screen=screen)
         else:
             # include subset of molecular orbitals
             if spin == "ab":
@@ -234,16 +255,17 @@ class Molecule(object):
                 mo_a = self.compute_molecular_orbital(points, "a", index)
                 mo_b = self.compute_molecular_orbital(points, "b", index)
                 # add density of alpha & beta molecular orbitals
-                np.sum(mo_a**2, axis=1, out=output)
-                output += np.sum(mo_b**2, axis=1)
+                output[:] = np.sum(mo_a**2, axis=1, dtype=np.float64)
+                output += np.sum(mo_b**2, axis=1, dtype=np.float64)
             else:
                 # compute mo expression of specified molecular orbitals
                 mo = self.compute_molecular_orbital(points, spin, index)
                 # add density of specified molecular orbitals
-                np.sum(mo**2, axis=1, out=output)
+                output[:] = np.sum(mo**2, axis=1, dtype=np.float64)
         return output
 
-    def compute_gradient(self, points, spin="ab", index=None):
+    @profiled("Molecule.compute_gradient")
+    def compute_gradient(self, points, spin="ab", index=None, screen=None):
         r"""Return gradient of the electron density.
 
         Parameters
@@ -256,12 +278,18 @@ class Molecule(object):
         index : sequence of int, optional
            Sequence of integers representing the occupied spin orbitals which are indexed
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`AtomicOrbitals.compute_shell_radii`). If ``None``,
+           all shells are evaluated on all points.
 
         """
         self._check_argument(points)
-        return self._ao.compute_gradient(self.mo.compute_dm(spin, index=index), points)
+        dm = self.mo.compute_dm(spin, index=index)
+        return self._ao.compute_gradient(dm, points, screen=screen)
 
-    def compute_hessian(self, points, spin="ab", index=None):
+    @profiled("Molecule.compute_hessian")
+    def compute_hessian(self, points, spin="ab", index=None, screen=None):
         r"""Return hessian of the electron density.
 
         Parameters
@@ -274,12 +302,18 @@ class Molecule(object):
         index : sequence of int, optional
            Sequence of integers representing the occupied spin orbitals which are indexed
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`AtomicOrbitals.compute_shell_radii`). If ``None``,
+           all shells are evaluated on all points.
 
         """
         self._check_argument(points)
-        return self._ao.compute_hessian(self.mo.compute_dm(spin, index=index), points)
+        dm = self.mo.compute_dm(spin, index=index)
+        return self._ao.compute_hessian(dm, points, screen=screen)
 
-    def compute_laplacian(self, points, spin="ab", index=None):
+    @profiled("Molecule.compute_laplacian")
+    def compute_laplacian(self, points, spin="ab", index=None, screen=None):
         r"""Return Laplacian of the electron density.
 
         Parameters
@@ -292,11 +326,16 @@ class Molecule(object):
         index : sequence of int, optional
            Sequence of integers representing the occupied spin orbitals which are indexed
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`AtomicOrbitals.compute_shell_radii`). If ``None``,
+           all shells are evaluated on all points.
 
         """
-        hess = self.compute_hessian(points, spin, index)
+        hess = self.compute_hessian(points, spin, index, screen)
         return np.trace(hess, axis1=1, axis2=2)
 
+    @profiled("Molecule.compute_esp")
     def compute_esp(self, points, spin="ab", index=None, charges=None):
         r"""Return molecular electrostatic potential.
 
@@ -334,7 +373,8 @@ class Molecule(object):
         dm = self.mo.compute_dm(spin, index=index)
         return self._ao.compute_esp(dm, points, self.coordinates, charges)
 
-    def compute_ked(self, points, spin="ab", index=None):
+    @profiled("Molecule.compute_ked")
+    def compute_ked(self, points, spin="ab", index=None, screen=None):
         r"""Return positive definite or Lagrangian kinetic energy density.
 
         .. math::
@@ -351,10 +391,15 @@ class Molecule(object):
         index : sequence of int, optional
            Sequence of integers representing the occupied spin orbitals which are indexed
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`AtomicOrbitals.compute_shell_radii`). If ``None``,
+           all shells are evaluated on all points.
 
         """
         self._check_argument(points)
-        return self._ao.compute_ked(self.mo.compute_dm(spin, index=index), points)
+        dm = self.mo.compute_dm(spin, index=index)
+        return self._ao.compute_ked(dm, points, screen=screen)
 
     def _check_argument(self, points):
         """Check given arguments.
@@ -367,12 +412,13 @@ class Molecule(object):
         """
         if not isinstance(points, np.ndarray) or points.ndim != 2 or points.shape[1] != 3:
             raise ValueError("Argument points should be a 2D-array with 3 columns.")
-        if not np.issubdtype(points.dtype, np.float64):
-            raise ValueError("Argument points should be a 2D-array of floats!")
+        if points.dtype not in [np.float64, np.float32]:
+            raise ValueError("Argument points should be a 2D-array of float64 or float32!")
         if self._ao is None:
             raise AttributeError("Atomic Orbitals information is needed!")
         if self._mo is None:
             raise AttributeError("Molecular Orbitals information is needed!")
+        count("Molecule.points", points.shape[0])
 
 
 class MolecularOrbitals(object):
@@ -507,35 +553,55 @@ class MolecularOrbitals(object):
 
 
 class AtomicOrbitals(object):
-    """Gaussian Basis Set."""
+    """Gaussian Basis Set.
 
-    def __init__(self, basis):
+    The basis functions are evaluated by a backend, which is either the HORTON2 ``GOBasis`` or
+    the vectorized NumPy :class:`GaussianBasis` (that has the same interface, except for the
+    electrostatic potential). The electrostatic potential is always computed by HORTON2.
+    """
+
+    def __init__(self, basis, obasis=None):
         self._basis = basis
+        # HORTON2 basis computing the electrostatic potential integrals
+        self._obasis = basis if obasis is None else obasis
+        # overlap matrix & its eigendecomposition are computed once & cached
+        self._overlap = None
+        self._overlap_eigh = None
+        # cutoff radii of the shells are computed once per tolerance & order of derivative
+        self._shell_radii = {}
 
     @classmethod
-    def from_molecule(cls, mol):
+    def from_molecule(cls, mol, backend="horton"):
         """Initialize class given an instance of `Molecule`.
 
         Parameters
         ----------
         mol : Molecule
             An instance of `Molecule` class.
+        backend : str, optional
+            Backend evaluating the basis functions, either "horton" or "numpy".
 
         """
-        basis = mol._iodata.obasis
-        return cls(basis)
+        obasis = mol._iodata.obasis
+        if backend == "numpy":
+            return cls(GaussianBasis.from_horton(obasis), obasis)
+        elif backend != "horton":
+            raise ValueError("Argument backend={0} is not recognized!".format(backend))
+        return cls(obasis)
 
     @classmethod
-    def from_file(cls, fname):
+    def from_file(cls, fname, backend="horton"):
         """Initialize class given a file.
 
         Parameters
         ----------
         fname : str
             Path to molecule"s files.
+        backend : str, optional
+            Backend evaluating the basis functions, either "horton" or "numpy".
 
         """
-        return cls.from_molecule(Molecule.from_file(fname))
+        return cls.from_molecule(Molecule.from_file(fname), backend)
 
     @property
     def nbasis(self):
@@ -543,12 +609,192 @@ class AtomicOrbitals(object):
         return self._basis.nbasis
 
     def compute_overlap(self):
-        """Return the overlap matrix of molecular orbitals."""
-        # make linear algebra factory
-        lf = DenseLinalgFactory(self.nbasis)
-        # compute overlap matrix
-        arr = self._basis.compute_overlap(lf)._array
-        return arr
+        """Return the overlap matrix of molecular orbitals.
+
+        The overlap matrix is computed once and cached; a copy of the cached matrix is returned,
+        so modifying it does not affect the cache.
+        """
+        if self._overlap is None:
+            # make linear algebra factory
+            lf = DenseLinalgFactory(self.nbasis)
+            # compute overlap matrix (HORTON2 returns a DenseTwoIndex)
+            self._overlap = self._basis.compute_overlap(lf)
+            self._overlap = getattr(self._overlap, "_array", self._overlap)
+            self._overlap.flags.writeable = False
+        return self._overlap.copy()
+
+    def compute_overlap_power(self, k, threshold=1e-9):
+        """Return the overlap matrix raised to the kth power.
+
+        The eigendecomposition of the overlap matrix is computed once and cached, so any power
+        is obtained with one matrix multiplication.
+
+        Parameters
+        ----------
+        k : {int, float}
+            Power of the overlap matrix, e.g. -1 for the inverse and -0.5 for the symmetric
+            orthogonalization (Lowdin) transformation.
+        threshold : float, optional
+            Eigenvalues (and corresponding eigenvectors) below this threshold are discarded.
+
+        Returns
+        -------
+        olp_power : np.ndarray(K, K)
+            Overlap matrix raised to the kth power.
+
+        """
+        if self._overlap_eigh is None or self._overlap_eigh[0] != threshold:
+            eigval, eigvec = eigh(self.compute_overlap(), threshold=threshold)
+            self._overlap_eigh = (threshold, eigval, eigvec)
+        _, eigval, eigvec = self._overlap_eigh
+        return (eigvec * eigval ** k).dot(eigvec.T)
+
+    def compute_shell_radii(self, tol, nderiv=0):
+        r"""Return the radii beyond which the contracted shells are numerically zero.
+
+        The radius of a shell is the largest radius :math:`r` of its primitives for which
+
+        .. math::
+           \lvert c \rvert N (2 \alpha)^k r^{l + k} e^{-\alpha r^2} = \epsilon
+
+        where :math:`c` and :math:`N` are the contraction coefficient and normalization constant
+        of the primitive with exponent :math:`\alpha` and angular momentum :math:`l`, :math:`k`
+        is the order of derivative and :math:`\epsilon` is the tolerance. The radii are cached.
+
+        Parameters
+        ----------
+        tol : float
+           Tolerance on the value of the basis functions (or their derivatives).
+        nderiv : int, optional
+           Order of derivative of the basis functions.
+
+        Returns
+        -------
+        radii : ndarray
+           Cutoff radius of each shell given as a 1D-array with (S,) shape.
+
+        """
+        if (tol, nderiv) not in self._shell_radii:
+            radii = _shell_radii(self._basis.shell_types, self._basis.nprims,
+                                 self._basis.alphas, self._basis.con_coeffs, tol, nderiv)
+            radii.flags.writeable = False
+            self._shell_radii[(tol, nderiv)] = radii
+        return self._shell_radii[(tol, nderiv)]
+
+    def _compute_screened(self, name, dm, points, screen, nderiv, shape=(), cell=2.0):
+        """Return a property of the density matrix evaluated only with the significant shells.
+
+        The points are binned into cubic cells, and for each cell only the shells whose cutoff
+        radius reaches the cell are evaluated with the corresponding block of the density matrix.
+        Cells with the same significant shells are evaluated together.
+
+        Parameters
+        ----------
+        name : str
+           Name of the HORTON2 method of the basis set, e.g. "compute_grid_density_dm".
+        dm : DenseTwoIndex
+           First order reduced density matrix of B basis sets.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        screen : float
+           Tolerance on the value of the basis functions. If ``None``, all shells are evaluated.
+        nderiv : int
+           Order of derivative of the basis functions needed for the property.
+        shape : tuple, optional
+           Shape of the property at each point.
+        cell : float, optional
+           Length of the cubic cells.
+
+        """
+        if screen is None:
+            return self._evaluate(partial(getattr(self._basis, name), dm), points, shape)
+
+        # temporary class because of HORTON2
+        class DM(object):
+            def __init__(self, arr):
+                self._array = arr
+
+        radii = self.compute_shell_radii(screen, nderiv)
+        centers = self._basis.centers[self._basis.shell_map]
+        # bin points into cells & find shells reaching each cell (from its center)
+        origin = np.min(points, axis=0)
+        cells, inverse = np.unique(np.floor((points - origin) / cell).astype(int), axis=0,
+                                   return_inverse=True)
+        dist = np.linalg.norm(origin + (cells[:, None, :] + 0.5) * cell - centers, axis=2)
+        significant = dist <= radii + 0.5 * np.sqrt(3.) * cell
+        # group points of cells with the same significant shells
+        masks, group = np.unique(significant, axis=0, return_inverse=True)
+        group = group.ravel()[inverse.ravel()]
+        order = np.argsort(group, kind="mergesort")
+        bounds = np.searchsorted(group[order], np.arange(len(masks) + 1))
+
+        output = np.zeros((len(points),) + shape, dtype=points.dtype)
+        for mask, start, end in zip(masks, bounds[:-1], bounds[1:]):
+            if not np.any(mask):
+                continue
+            index = order[start:end]
+            if np.all(mask):
+                basis, sub_dm = self._basis, dm
+            else:
+                basis, ibasis = self._basis.get_subset(np.where(mask)[0])
+                sub_dm = DM(dm._array[np.ix_(ibasis, ibasis)])
+            output[index] = self._evaluate(partial(getattr(basis, name), sub_dm), points[index],
+                                           shape)
+        return output
+
+    def _evaluate(self, func, points, shape=(), basis=None):
+        """Return a function of float64 points evaluated on float64 or float32 points.
+
+        HORTON2 only evaluates float64 points, so float32 points are converted in chunks and
+        the output is stored in float32. The NumPy backend evaluates float32 points directly.
+
+        Parameters
+        ----------
+        func : callable
+           Function of float64 points returning an array of (N,) + `shape` shape.
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        shape : tuple, optional
+           Shape of the function value at each point.
+        basis : GOBasis or GaussianBasis, optional
+           Basis evaluating the function. If ``None``, the basis of the backend is used.
+
+        """
+        if basis is None:
+            basis = self._basis
+        if points.dtype == np.float64 or isinstance(basis, GaussianBasis):
+            return func(points)
+        output = np.empty((len(points),) + shape, dtype=points.dtype)
+        for start in range(0, len(points), CHUNK_SIZE):
+            chunk = slice(start, start + CHUNK_SIZE)
+            output[chunk] = func(points[chunk].astype(np.float64))
+        return output
+
+    def compute_basis(self, points):
+        """Return basis functions evaluated on a set of points.
+
+        Parameters
+        ----------
+        points : ndarray
+           Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+
+        Returns
+        -------
+        basis : ndarray
+           Values of B basis functions given as a 2D-array with (N, B) shape.
+
+        """
+        # temporary class because of HORTON2; orbitals with identity expansion coefficients
+        # are the basis functions themselves
+        class Orbitals(object):
+            def __init__(self, nbasis):
+                self.nbasis, self.nfn = nbasis, nbasis
+                self.coeffs = np.identity(nbasis)
+
+        index = np.arange(self.nbasis)
+        exp = Orbitals(self.nbasis)
+        return self._evaluate(lambda pts: self._basis.compute_grid_orbitals_exp(exp, pts, index),
+                              points, (self.nbasis,))
 
     def compute_orbitals(self, dm, points, index):
         """
@@ -564,9 +810,10 @@ class AtomicOrbitals(object):
            from 1 to :attr:`nbasis`. If ``None``, all orbitals of the given spin(s) are included.
 
         """
-        return self._basis.compute_grid_orbitals_exp(dm, points, index)
+        return self._evaluate(lambda pts: self._basis.compute_grid_orbitals_exp(dm, pts, index),
+                              points, (len(index),))
 
-    def compute_density(self, dm, points):
+    def compute_density(self, dm, points, screen=None):
         """Return electron density evaluated on the a set of points.
 
         Parameters
@@ -575,11 +822,15 @@ class AtomicOrbitals(object):
            First order reduced density matrix of B basis sets given as a 2D array of (B, B) shape.
         points : ndarray
            Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`compute_shell_radii`). If ``None``, all shells
+           are evaluated on all points.
 
         """
-        return self._basis.compute_grid_density_dm(dm, points)
+        return self._compute_screened("compute_grid_density_dm", dm, points, screen, 0)
 
-    def compute_gradient(self, dm, points):
+    def compute_gradient(self, dm, points, screen=None):
         """Return gradient of the electron density evaluated on the a set of points.
 
         Parameters
@@ -588,11 +839,15 @@ class AtomicOrbitals(object):
            First order reduced density matrix of B basis sets given as a 2D array of (B, B) shape.
         points : ndarray
            Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`compute_shell_radii`). If ``None``, all shells
+           are evaluated on all points.
 
         """
-        return self._basis.compute_grid_gradient_dm(dm, points)
+        return self._compute_screened("compute_grid_gradient_dm", dm, points, screen, 1, shape=(3,))
 
-    def compute_hessian(self, dm, points):
+    def compute_hessian(self, dm, points, screen=None):
         """Return hessian of the electron density evaluated on the a set of points.
 
         Parameters
@@ -601,20 +856,18 @@ class AtomicOrbitals(object):
            First order reduced density matrix of B basis sets given as a 2D array of (B, B) shape.
         points : ndarray
            Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`compute_shell_radii`). If ``None``, all shells
+           are evaluated on all points.
 
         """
         # compute upper triangular elements
-        output = self._basis.compute_grid_hessian_dm(dm, points)
-        # convert the (n, 6) shape to (n, 3, 3)
-        hess = np.zeros((len(points), 9))
-        # NOTE: hard coded in the indices of the upper triangular matrix in the flattened form
-        # in C ordering. Maybe there is a numpy function that does this. This might fail if the
-        # hessian is not in c-ordering
-        hess[:, [0, 1, 2, 4, 5, 8]] = output
-        hess = hess.reshape(len(points), 3, 3)
-        hess += np.transpose(hess, axes=(0, 2, 1))
-        for index in range(len(points)):
-            hess[index][np.diag_indices(3)] /= 2.
+        output = self._compute_screened("compute_grid_hessian_dm", dm, points, screen, 2, (6,))
+        # convert the (n, 6) shape of xx, xy, xz, yy, yz, zz elements to (n, 3, 3)
+        hess = np.empty((len(points), 3, 3), dtype=output.dtype)
+        for col, (i, j) in enumerate([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]):
+            hess[:, i, j] = hess[:, j, i] = output[:, col]
         return hess
 
     def compute_esp(self, dm, points, coordinates, charges):
@@ -628,9 +881,11 @@ class AtomicOrbitals(object):
            Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
 
         """
-        return self._basis.compute_grid_esp_dm(dm, coordinates, charges, points)
+        return self._evaluate(
+            lambda pts: self._obasis.compute_grid_esp_dm(dm, coordinates, charges, pts), points,
+            basis=self._obasis)
 
-    def compute_ked(self, dm, points):
+    def compute_ked(self, dm, points, screen=None):
         """Return positive definite kinetic energy density evaluated on the a set of points.
 
         Parameters
@@ -639,6 +894,49 @@ class AtomicOrbitals(object):
            First order reduced density matrix of B basis sets given as a 2D array of (B, B) shape.
         points : ndarray
            Cartesian coordinates of N points given as a 2D-array with (N, 3) shape.
+        screen : float, optional
+           Tolerance on the value of the basis functions used to skip the shells that are
+           negligible on the points (see :meth:`compute_shell_radii`). If ``None``, all shells
+           are evaluated on all points.
 
         """
-        return self._basis.compute_grid_kinetic_dm(dm, points)
+        return self._compute_screened("compute_grid_kinetic_dm", dm, points, screen, 1)
+
+
+def _shell_radii(shell_types, nprims, alphas, con_coeffs, tol, nderiv=0):
+    """Return the radii beyond which the contracted shells are below the given tolerance.
+
+    Parameters
+    ----------
+    shell_types : ndarray
+       HORTON2 type of each shell, i.e. its angular momentum with a negative sign for pure shells.
+    nprims : ndarray
+       Number of primitives in each shell.
+    alphas : ndarray
+       Exponents of the primitives.
+    con_coeffs : ndarray
+       Contraction coefficients of the (normalized) primitives.
+    tol : float
+       Tolerance on the value of the basis functions (or their derivatives).
+    nderiv : int, optional
+       Order of derivative of the basis functions.
+
+    """
+    nprims = np.asarray(nprims)
+    alphas = np.asarray(alphas, dtype=float)
+    angmom = np.repeat(np.abs(shell_types), nprims)
+    # normalization of the x^l exp(-alpha r^2) primitives
+    dfact = np.array([np.prod(np.arange(2 * ang - 1, 0, -2)) for ang in angmom], float)
+    norm = np.sqrt((2 * alphas / np.pi)**1.5 * (4 * alphas)**angmom / dfact)
+    # solve log(c N (2 alpha)^k / tol) + (l + k) log(r) = alpha r^2 beyond the maximum at r0
+    power = angmom + nderiv
+    logc = np.log(np.abs(con_coeffs) * norm * (2 * alphas)**nderiv / tol)
+    r0 = np.sqrt(power / (2 * alphas))
+    radii = np.maximum(r0, np.sqrt(np.clip(logc, 0., None) / alphas))
+    for _ in range(50):
+        radii = np.sqrt(np.clip(logc + power * np.log(radii + (radii == 0)), 0., None) / alphas)
+        radii = np.maximum(radii, r0)
+    # primitives that are below the tolerance at their maximum are negligible everywhere
+    peak = logc + power * np.log(r0 + (r0 == 0)) - alphas * r0**2
+    radii[peak <= 0] = 0.
+    return np.maximum.reduceat(radii, np.cumsum(nprims) - nprims)
@@ -25,10 +25,13 @@
 
 import numpy as np
 
-from horton import BeckeMolGrid, ProAtomDB
+from scipy.sparse import csr_matrix
+from horton import ProAtomDB
 from horton.scripts.wpart import wpart_schemes
 
 from chemtools.wrappers.molecule import Molecule
+from chemtools.wrappers.grid import MolecularGrid
+from chemtools.profiling import profiled
 
 
 __all__ = ['DensPart']
@@ -36,6 +39,7 @@ __all__ = ['DensPart']
 
 class DensPart(object):
 
+    @profiled("DensPart.__init__")
     def __init__(self, coordinates, numbers, pseudo_numbers, density, grid, scheme="h", **kwargs):
 
         wpart = wpart_schemes[scheme]
@@ -54,12 +58,13 @@ class DensPart(object):
         self.numbers = numbers
         self.pseudo_numbers = pseudo_numbers
         self.charges = self.part['charges']
+        self._condense_matrix = None
 
     @classmethod
     def from_molecule(cls, mol, scheme=None, grid=None, spin="ab", **kwargs):
         if grid is None:
-            grid = BeckeMolGrid(mol.coordinates, mol.numbers, mol.pseudo_numbers,
-                                agspec="fine", random_rotate=False, mode='keep')
+            # grid is reused from cache, if the same geometry has been partitioned before
+            grid = MolecularGrid.from_molecule(mol, specification="fine", rotate=False)
         else:
             check_molecule_grid(mol, grid)
         # compute molecular electron density
@@ -90,15 +95,64 @@ class DensPart(object):
         print('MOL = ', mol)
         return cls.from_molecule(mol, scheme=scheme, grid=grid, spin=spin, **kwargs)
 
+    @property
+    def condense_matrix(self):
+        """Sparse matrix of shape (natom, npoint) condensing local properties into atoms."""
+        if self._condense_matrix is None:
+            self._condense_matrix = get_condense_matrix(self.part)
+        return self._condense_matrix
+
     def condense_to_atoms(self, property):
-        condensed = np.zeros(self.part.natom)
-        for index in range(self.part.natom):
-            at_grid = self.part.get_grid(index)
-            at_weight = self.part.cache.load("at_weights", index)
-            wcor = self.part.get_wcor(index)
-            local_prop = self.part.to_atomic_grid(index, property)
-            condensed[index] = at_grid.integrate(at_weight, local_prop, wcor)
-        return condensed
+        """Return condensed values of property evaluated on grid points.
+
+        Parameters
+        ----------
+        property : np.ndarray
+            Local property evaluated on grid points given as a 1D-array of shape (npoint,), or
+            several local properties given as a 2D-array of shape (npoint, nprop).
+
+        """
+        if property.ndim not in [1, 2] or property.shape[0] != self.condense_matrix.shape[1]:
+            raise ValueError("Argument property should be an array with {0} rows! "
+                             "shape={1}".format(self.condense_matrix.shape[1], property.shape))
+        return self.condense_matrix.dot(property)
+
+
+def get_condense_matrix(part):
+    r"""Return the sparse matrix which condenses local properties into atomic contributions.
+
+    The element :math:`(A, k)` of the matrix is the integration weight of grid point
+    :math:`\mathbf{r}_k` for atom :math:`A`, i.e. the product of atomic grid weight, atomic
+    weight function :math:`\omega_A\left(\mathbf{r}_k\right)` and the weight correction
+    (if any) of the partitioning scheme. Only the grid points belonging to the atomic grid of
+    atom :math:`A` are stored.
+
+    Parameters
+    ----------
+    part : part instance
+        Instance of `HORTON` partitioning class.
+
+    Returns
+    -------
+    matrix : scipy.sparse.csr_matrix
+        Condensing matrix of shape (natom, npoint), where npoint is the number of molecular
+        grid points.
+    """
+    npoint = part.grid.size
+    rows, cols, values = [], [], []
+    for index in range(part.natom):
+        at_grid = part.get_grid(index)
+        weight = at_grid.weights * part.cache.load("at_weights", index)
+        wcor = part.get_wcor(index)
+        if wcor is not None:
+            weight = weight * wcor
+        # map points of atomic grid to points of molecular grid
+        col = part.to_atomic_grid(index, np.arange(npoint))
+        rows.append(np.full(col.shape, index, dtype=int))
+        cols.append(col)
+        values.append(weight)
+    rows, cols, values = np.concatenate(rows), np.concatenate(cols), np.concatenate(values)
+    return csr_matrix((values, (rows, cols)), shape=(part.natom, npoint))
 
 
 def check_molecule_grid(molecule, grid):
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# ChemTools is a collection of interpretive chemical tools for
+# analyzing outputs of the quantum chemistry calculations.
+#
+# Copyright (C) 2016-2019 The ChemTools Development Team
+#
+# This file is part of ChemTools.
+#
+# ChemTools is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# ChemTools is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+"""Test chemtools.wrappers.basis."""
+
+
+import numpy as np
+from numpy.testing import assert_raises, assert_almost_equal
+from chemtools.wrappers.basis import GaussianBasis, _pure_transform
+from chemtools.wrappers.molecule import Molecule
+
+try:
+    from importlib_resources import path
+except ImportError:
+    from importlib.resources import path
+
+
+def make_basis():
+    """Return a basis set with Cartesian & pure shells up to f functions on 3 centers."""
+    rng = np.random.RandomState(1)
+    return GaussianBasis(rng.uniform(-1., 1., (3, 3)), [0, 1, 2, 0, 1, 2, 0],
+                         [2, 1, 3, 1, 2, 1, 1], [0, 1, -2, 2, -3, 3, -4],
+                         rng.uniform(0.5, 2., 11), rng.uniform(-1., 1., 11))
+
+
+def test_gaussian_basis_raises():
+    # check invalid arguments
+    assert_raises(ValueError, GaussianBasis, [[0., 0.]], [0], [1], [0], [1.], [1.])
+    assert_raises(ValueError, GaussianBasis, [[0., 0., 0.]], [1], [1], [0], [1.], [1.])
+    assert_raises(ValueError, GaussianBasis, [[0., 0., 0.]], [0], [1, 1], [0], [1.], [1.])
+    assert_raises(ValueError, GaussianBasis, [[0., 0., 0.]], [0], [1], [-1], [1.], [1.])
+    assert_raises(ValueError, GaussianBasis, [[0., 0., 0.]], [0], [2], [0], [1.], [1.])
+    assert_raises(ValueError, make_basis().compute_basis, np.zeros((1, 3)), 3)
+
+
+def test_gaussian_basis_pure_transform():
+    # HORTON2 transformation of normalized Cartesian d functions to c0, c1, s1, c2, s2
+    root = 0.5 * np.sqrt(3)
+    expected = np.array([[-0.5, 0., 0., -0.5, 0., 1.], [0., 0., 1., 0., 0., 0.],
+                         [0., 0., 0., 0., 1., 0.], [root, 0., 0., -root, 0., 0.],
+                         [0., 1., 0., 0., 0., 0.]])
+    assert_almost_equal(_pure_transform(2), expected, decimal=10)
+    assert_almost_equal(_pure_transform(3)[0, [2, 7, 9]], [-0.67082039, -0.67082039, 1.], decimal=8)
+    # pure functions of a primitive shell are orthonormal & Cartesian functions are normalized
+    for shell_type in [0, 1, 2, -2, 3, -3, 4, -4, -5]:
+        basis = GaussianBasis([[0.1, 0.2, -0.3]], [0], [1], [shell_type], [0.7], [1.])
+        overlap = basis.compute_overlap()
+        assert_almost_equal(np.diag(overlap), np.ones(basis.nbasis), decimal=10)
+        if shell_type < 2:
+            assert_almost_equal(overlap, np.identity(basis.nbasis), decimal=10)
+
+
+def test_gaussian_basis_values():
+    basis = make_basis()
+    assert basis.nshell == 7
+    assert basis.nbasis == 1 + 3 + 5 + 6 + 7 + 10 + 9
+    assert np.all(basis.basis_offsets == [0, 1, 4, 9, 15, 22, 32])
+    # s function is (2 alpha / pi)^(3/4) exp(-alpha r^2) times contraction coefficient
+    single = GaussianBasis([[0., 0., 1.]], [0], [1], [0], [1.5], [0.5])
+    points = np.array([[0., 0., 0.], [1., 2., 3.], [-0.5, 0., 0.5]])
+    expected = 0.5 * (3. / np.pi)**0.75 * np.exp(-1.5 * np.array([1., 9., 0.5]))
+    assert_almost_equal(single.compute_basis(points)[0][:, 0], expected, decimal=10)
+    # derivatives against finite differences
+    points = np.random.RandomState(2).uniform(-2., 2., (20, 3))
+    value, grad, hess = basis.compute_basis(points, deriv=2)
+    assert value.shape == (20, basis.nbasis) and hess.shape == (20, basis.nbasis, 6)
+    step = np.identity(3) * 1.e-5
+    for i in range(3):
+        val_p, grad_p = basis.compute_basis(points + step[i], deriv=1)
+        val_m, grad_m = basis.compute_basis(points - step[i], deriv=1)
+        assert_almost_equal((val_p - val_m) / 2.e-5, grad[:, :, i], decimal=6)
+        fd_hess = (grad_p - grad_m) / 2.e-5
+        for col, (j, k) in enumerate([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]):
+            if k == i:
+                assert_almost_equal(fd_hess[:, :, j], hess[:, :, col], decimal=6)
+    # subset of shells
+    subset, ibasis = basis.get_subset([1, 4])
+    assert np.all(ibasis == [1, 2, 3, 15, 16, 17, 18, 19, 20, 21])
+    assert_almost_equal(subset.compute_basis(points)[0], value[:, ibasis], decimal=10)
+
+
+def test_gaussian_basis_overlap_quadrature():
+    basis = make_basis()
+    # overlap against numerical integration on a cubic grid
+    axis = np.linspace(-8., 8., 81)
+    points = np.array(np.meshgrid(axis, axis, axis, indexing="ij")).reshape(3, -1).T
+    values = basis.compute_basis(points)[0]
+    overlap = values.T.dot(values) * (axis[1] - axis[0])**3
+    assert_almost_equal(basis.compute_overlap(), overlap, decimal=6)
+
+
+def test_gaussian_basis_properties_dm():
+    class DM(object):
+        def __init__(self, arr):
+            self._array = arr
+
+    basis = make_basis()
+    rng = np.random.RandomState(3)
+    dm = rng.uniform(-1., 1., (basis.nbasis, basis.nbasis))
+    dm = DM(dm + dm.T)
+    points = rng.uniform(-2., 2., (30, 3))
+    value, grad, hess = basis.compute_basis(points, deriv=2)
+    dens = np.einsum("pi,ij,pj->p", value, dm._array, value)
+    assert_almost_equal(basis.compute_grid_density_dm(dm, points), dens, decimal=10)
+    expected = 2 * np.einsum("pi,ij,pjk->pk", value, dm._array, grad)
+    assert_almost_equal(basis.compute_grid_gradient_dm(dm, points), expected, decimal=10)
+    expected = 0.5 * np.einsum("pik,ij,pjk->p", grad, dm._array, grad)
+    assert_almost_equal(basis.compute_grid_kinetic_dm(dm, points), expected, decimal=10)
+    expected = 2 * np.einsum("pi,ij,pjk->pk", value, dm._array, hess)
+    for col, (j, k) in enumerate([(0, 0), (0, 1), (0, 2), (1, 1), (1, 2), (2, 2)]):
+        expected[:, col] += 2 * np.einsum("pi,ij,pj->p", grad[:, :, j], dm._array, grad[:, :, k])
+    assert_almost_equal(basis.compute_grid_hessian_dm(dm, points), expected, decimal=10)
+
+
+def test_gaussian_basis_float32():
+    class DM(object):
+        def __init__(self, arr):
+            self._array = arr
+
+    basis = make_basis()
+    rng = np.random.RandomState(5)
+    coeffs = rng.uniform(-1., 1., (basis.nbasis, 4))
+    dm = DM(coeffs.dot(coeffs.T))
+    points = rng.uniform(-2., 2., (50, 3))
+    points32 = points.astype(np.float32)
+    for value, value32 in zip(basis.compute_basis(points, 2), basis.compute_basis(points32, 2)):
+        assert value32.dtype == np.float32
+        assert np.allclose(value32, value, rtol=1.e-4, atol=1.e-5)
+    for name in ["compute_grid_density_dm", "compute_grid_gradient_dm",
+                 "compute_grid_hessian_dm", "compute_grid_kinetic_dm"]:
+        value, value32 = getattr(basis, name)(dm, points), getattr(basis, name)(dm, points32)
+        assert value32.dtype == np.float32
+        assert np.allclose(value32, value, rtol=1.e-4, atol=1.e-5)
+
+
+def check_gaussian_basis_horton(fname):
+    """Check NumPy backend against HORTON2 backend."""
+    with path("chemtools.data", fname) as fname:
+        mol = Molecule.from_file(fname)
+        mol_np = Molecule.from_file(fname, backend="numpy")
+    assert isinstance(mol_np.ao._basis, GaussianBasis)
+    points = np.random.RandomState(4).uniform(-3., 3., (100, 3))
+    assert_almost_equal(mol_np.ao.compute_overlap(), mol.ao.compute_overlap(), decimal=8)
+    assert_almost_equal(mol_np.ao.compute_basis(points), mol.ao.compute_basis(points), decimal=8)
+    assert_almost_equal(mol_np.compute_molecular_orbital(points, "a"),
+                        mol.compute_molecular_orbital(points, "a"), decimal=8)
+    for spin in ["a", "b", "ab"]:
+        assert_almost_equal(mol_np.compute_density(points, spin),
+                            mol.compute_density(points, spin), decimal=8)
+        assert_almost_equal(mol_np.compute_gradient(points, spin),
+                            mol.compute_gradient(points, spin), decimal=8)
+        assert_almost_equal(mol_np.compute_hessian(points, spin),
+                            mol.compute_hessian(points, spin), decimal=7)
+        assert_almost_equal(mol_np.compute_ked(points, spin),
+                            mol.compute_ked(points, spin), decimal=8)
+    # electrostatic potential is computed by HORTON2 with both backends
+    assert_almost_equal(mol_np.compute_esp(points), mol.compute_esp(points), decimal=8)
+    # screening works with both backends
+    assert_almost_equal(mol_np.compute_density(points, screen=1.e-12),
+                        mol.compute_density(points), decimal=8)
+
+
+def test_gaussian_basis_horton_fchk_uhf_ch4():
+    check_gaussian_basis_horton("ch4_uhf_ccpvdz.fchk")
+
+
+def test_gaussian_basis_horton_fchk_h2o_ccpvtz():
+    check_gaussian_basis_horton("h2o_q+0_ub3lyp_ccpvtz.fchk")
+
+
+def test_gaussian_basis_horton_fchk_c3h2o_augccpvdz():
+    check_gaussian_basis_horton("c3h2o_q+0_ub3lyp_augccpvdz.fchk")
+
+
+def test_molecule_backend_raises():
+    with path("chemtools.data", "ch4_uhf_ccpvdz.fchk") as fname:
+        assert_raises(ValueError, Molecule.from_file, fname, backend="fortran")
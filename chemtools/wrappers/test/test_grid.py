@@ -23,6 +23,10 @@
 """Test chemtools.wrappers.grid."""
 
 
+import os
+import shutil
+import tempfile
+
 import numpy as np
 try:
     from importlib_resources import path
@@ -31,7 +35,9 @@ except ImportError:
 
 from numpy.testing import assert_raises, assert_allclose
 
-from chemtools.wrappers.grid import MolecularGrid
+from horton import BeckeMolGrid
+
+from chemtools.wrappers.grid import MolecularGrid, set_grid_cache, clear_grid_cache
 from chemtools.wrappers.molecule import Molecule
 
 
@@ -64,6 +70,14 @@ def test_wrapper_grid_ch4():
     assert_allclose(10., grid.integrate(mol.compute_density(grid.points)), rtol=0., atol=1.e-4)
 
 
+def test_wrapper_grid_spherical_average():
+    grid = MolecularGrid(np.zeros((1, 3)), np.array([8]), np.array([8.]), 'exp:1e-5:25:80:110')
+    value = np.exp(-np.linalg.norm(grid.points, axis=1))
+    average = grid.compute_spherical_average(value)
+    assert_allclose(average, np.exp(-grid.subgrids[0].rgrid.radii), rtol=0., atol=1.e-8)
+    assert_raises(ValueError, grid.compute_spherical_average, value[:-1])
+
+
 def test_wrapper_grid_from_file_o2():
     with path('chemtools.data', 'o2_uhf.wfn') as fpath:
         grid = MolecularGrid.from_file(fpath, 'veryfine')
@@ -73,3 +87,50 @@ def test_wrapper_grid_from_file_o2():
     assert grid.points.shape == (grid.npoints, 3)
     # check integrate
     assert_allclose(16., grid.integrate(mol.compute_density(grid.points)), rtol=0., atol=1.e-4)
+
+
+def test_wrapper_grid_cache_ch4():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fpath:
+        mol = Molecule.from_file(fpath)
+    dens = mol.compute_density
+    # grid of the same geometry & specification is reused from memory
+    grid1 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110')
+    grid2 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110')
+    assert grid1._grid is grid2._grid
+    grid3 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110', k=2)
+    assert grid1._grid is not grid3._grid
+    # randomly rotated grids are not reused
+    grid4 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110', rotate=True)
+    grid5 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110', rotate=True)
+    assert grid4._grid is not grid5._grid
+    assert not np.allclose(grid4.points, grid5.points)
+    assert_raises(ValueError, set_grid_cache, -1)
+    # grid is serialized to & loaded from disk
+    dirname = tempfile.mkdtemp('grid_cache')
+    try:
+        set_grid_cache(maxsize=8, directory=dirname)
+        clear_grid_cache()
+        grid1 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110')
+        MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110', rotate=True)
+        assert len(os.listdir(dirname)) == 1
+        clear_grid_cache()
+        grid2 = MolecularGrid.from_molecule(mol, 'exp:1e-5:25:80:110')
+        assert grid1._grid is not grid2._grid
+        # loaded grid is a Becke-Lebedev grid
+        assert isinstance(grid2._grid, BeckeMolGrid)
+        assert_allclose(grid2.centers, mol.coordinates, rtol=0., atol=1.e-12)
+        assert_allclose(grid2.numbers, mol.numbers, rtol=0., atol=1.e-12)
+        assert grid2.k == 3 and not grid2.random_rotate
+        assert_allclose(grid1.becke_weights, grid2.becke_weights, rtol=0., atol=1.e-12)
+        assert_allclose(grid1.points, grid2.points, rtol=0., atol=1.e-12)
+        assert_allclose(grid1.weights, grid2.weights, rtol=0., atol=1.e-12)
+        assert len(grid1.subgrids) == len(grid2.subgrids) == 5
+        for atgrid1, atgrid2 in zip(grid1.subgrids, grid2.subgrids):
+            assert_allclose(atgrid1.points, atgrid2.points, rtol=0., atol=1.e-12)
+            assert_allclose(atgrid1.weights, atgrid2.weights, rtol=0., atol=1.e-12)
+        assert_allclose(grid1.integrate(dens(grid1.points)), grid2.integrate(dens(grid2.points)),
+                        rtol=0., atol=1.e-10)
+    finally:
+        set_grid_cache()
+        clear_grid_cache()
+        shutil.rmtree(dirname)
@@ -26,6 +26,7 @@
 import numpy as np
 from numpy.testing import assert_raises, assert_equal, assert_almost_equal
 from chemtools.wrappers import Molecule
+from chemtools.wrappers.molecule import _shell_radii
 
 try:
     from importlib_resources import path
@@ -444,3 +445,90 @@ def test_molecule_horton_ch4():
     assert np.allclose(mol.compute_hessian(data["points"]), data["hess"], rtol=0., atol=1.e-6)
     assert np.allclose(mol.compute_ked(data["points"]), data["ked_pd"], rtol=0., atol=1.e-6)
     assert np.allclose(mol.compute_esp(data["points"]), data["esp"], rtol=0., atol=1.e-6)
+
+
+def test_molecule_basis_fchk_uhf_ch4():
+    with path("chemtools.data", "ch4_uhf_ccpvdz.fchk") as fname:
+        mol = Molecule.from_file(fname)
+    points = np.array([[0., 0., 0.], [0.5, -0.2, 0.1], [-1., 1., 2.]])
+    basis = mol.ao.compute_basis(points)
+    assert basis.shape == (3, mol.ao.nbasis)
+    # contracting basis functions with coefficients gives molecular orbitals
+    index = np.array([1, 4, 10])
+    orbs = mol.compute_molecular_orbital(points, "a", index)
+    assert_almost_equal(np.dot(basis, mol.mo.coefficient[0][:, index - 1]), orbs, decimal=8)
+
+
+def test_molecule_overlap_power_fchk_uhf_ch4():
+    with path("chemtools.data", "ch4_uhf_ccpvdz.fchk") as fname:
+        mol = Molecule.from_file(fname)
+    olp = mol.ao.compute_overlap()
+    # overlap is cached, but a copy is returned
+    olp[0, 0] = 2.
+    assert_almost_equal(mol.ao.compute_overlap()[0, 0], 1., decimal=8)
+    olp = mol.ao.compute_overlap()
+    assert olp is not mol.ao.compute_overlap()
+    # powers of overlap matrix
+    olp_inv = mol.ao.compute_overlap_power(-1)
+    olp_sqrt = mol.ao.compute_overlap_power(0.5)
+    olp_inv_sqrt = mol.ao.compute_overlap_power(-0.5)
+    assert_almost_equal(mol.ao.compute_overlap_power(1), olp, decimal=8)
+    assert_almost_equal(olp_inv.dot(olp), np.identity(mol.ao.nbasis), decimal=6)
+    assert_almost_equal(olp_sqrt.dot(olp_sqrt), olp, decimal=8)
+    assert_almost_equal(olp_inv_sqrt.dot(olp).dot(olp_inv_sqrt), np.identity(mol.ao.nbasis),
+                        decimal=6)
+
+
+def test_molecule_shell_radii():
+    # s-shell with normalized primitive; (2 alpha / pi)^(3/4) exp(-alpha r^2) = tol
+    radii = _shell_radii(np.array([0]), np.array([1]), np.array([1.]), np.array([1.]), 1.e-10)
+    assert_almost_equal(radii, [np.sqrt(np.log((2 / np.pi)**0.75 / 1.e-10))], decimal=8)
+    # contracted p-shell & d-shell, derivatives extend the radii
+    shell_types, nprims = np.array([1, -2]), np.array([2, 1])
+    alphas, coeffs = np.array([3., 0.2, 0.5]), np.array([0.6, 0.5, 1.])
+    radii = [_shell_radii(shell_types, nprims, alphas, coeffs, 1.e-10, k) for k in range(3)]
+    assert np.all(radii[0] < radii[1]) and np.all(radii[1] < radii[2])
+    # value of the most diffuse primitive of the p-shell at its radius equals the tolerance
+    norm = np.sqrt((2 * 0.2 / np.pi)**1.5 * 4 * 0.2)
+    assert_almost_equal(0.5 * norm * radii[0][0] * np.exp(-0.2 * radii[0][0]**2) / 1.e-10, 1.)
+    # negligible primitives have zero radius
+    radii = _shell_radii(np.array([0]), np.array([1]), np.array([1.]), np.array([1.e-12]), 1.e-10)
+    assert_equal(radii, [0.])
+
+
+def test_molecule_screen_fchk_uhf_ch4():
+    with path("chemtools.data", "ch4_uhf_ccpvdz.fchk") as fname:
+        mol = Molecule.from_file(fname)
+    # points near & far from the molecule spanning many cells
+    points = np.random.RandomState(42).uniform(-8., 8., (2000, 3))
+    radii = mol.ao.compute_shell_radii(1.e-12)
+    assert radii.shape == (len(mol._iodata.obasis.shell_types),)
+    assert radii is mol.ao.compute_shell_radii(1.e-12)
+    assert_almost_equal(mol.compute_density(points, screen=1.e-12), mol.compute_density(points),
+                        decimal=8)
+    assert_almost_equal(mol.compute_gradient(points, screen=1.e-12),
+                        mol.compute_gradient(points), decimal=8)
+    assert_almost_equal(mol.compute_hessian(points, screen=1.e-12),
+                        mol.compute_hessian(points), decimal=8)
+    assert_almost_equal(mol.compute_ked(points, spin="a", screen=1.e-12),
+                        mol.compute_ked(points, spin="a"), decimal=8)
+
+
+def test_molecule_float32_fchk_uhf_ch4():
+    with path("chemtools.data", "ch4_uhf_ccpvdz.fchk") as fname:
+        mol = Molecule.from_file(fname)
+    points = np.random.RandomState(7).uniform(-3., 3., (500, 3))
+    points32 = points.astype(np.float32)
+    for name in ["compute_density", "compute_gradient", "compute_hessian", "compute_ked",
+                 "compute_esp"]:
+        value, value32 = getattr(mol, name)(points), getattr(mol, name)(points32)
+        assert value32.dtype == np.float32 and value32.shape == value.shape
+        assert np.allclose(value32, value, rtol=1.e-4, atol=1.e-5)
+    mo = mol.compute_molecular_orbital(points, "a")
+    mo32 = mol.compute_molecular_orbital(points32, "a")
+    assert mo32.dtype == np.float32
+    assert np.allclose(mo32, mo, rtol=1.e-4, atol=1.e-5)
+    dens32 = mol.compute_density(points32, "ab", index=[1, 2])
+    assert dens32.dtype == np.float32
+    assert np.allclose(dens32, mol.compute_density(points, "ab", index=[1, 2]), rtol=1.e-5,
+                       atol=1.e-6)
@@ -22,6 +22,7 @@
 # --
 
 import numpy as np
+from numpy.testing import assert_raises
 
 from chemtools.wrappers.molecule import Molecule
 from chemtools.wrappers.part import DensPart
@@ -63,3 +64,25 @@ def test_condense_quadratic_from_molecule_fmr_mbis_ch4():
     computed = part.numbers - part.charges
     assert np.all(abs(expected - computed) < 1.e-2)
     assert np.all(abs(part.condense_to_atoms(part.density) - computed) < 1.e-2)
+
+
+def test_condense_matrix_h_ch4_fchk():
+    with path('chemtools.data', 'ch4_uhf_ccpvdz.fchk') as fname:
+        part = DensPart.from_file(fname, scheme='h')
+    # condense with per-atom integration
+    expected = np.zeros(part.part.natom)
+    for index in range(part.part.natom):
+        at_grid = part.part.get_grid(index)
+        at_weight = part.part.cache.load("at_weights", index)
+        local_prop = part.part.to_atomic_grid(index, part.density)
+        expected[index] = at_grid.integrate(at_weight, local_prop, part.part.get_wcor(index))
+    assert part.condense_matrix.shape == (part.part.natom, part.grid.size)
+    assert np.allclose(part.condense_to_atoms(part.density), expected, rtol=0., atol=1.e-10)
+    # condense several properties at once
+    props = np.array([part.density, 2 * part.density, part.density**2]).T
+    condensed = part.condense_to_atoms(props)
+    assert condensed.shape == (part.part.natom, 3)
+    assert np.allclose(condensed[:, 0], expected, rtol=0., atol=1.e-10)
+    assert np.allclose(condensed[:, 1], 2 * expected, rtol=0., atol=1.e-10)
+    assert np.allclose(condensed[:, 2], part.condense_to_atoms(part.density**2), atol=1.e-10)
+    assert_raises(ValueError, part.condense_to_atoms, part.density[:-1])